@@ -0,0 +1,304 @@
+import heapq
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from answer_log import (
+    ANSWER_CHUNK_ROWS,
+    ANSWER_LOG_DIR,
+    AnswerBatch,
+    AnswerLogWriter,
+    chunk_path,
+    iter_chunk_paths,
+    question_id,
+    read_columns,
+    write_chunk,
+)
+from game_utils import LAND_INDEX, LANDS, load_json, save_json, utc_day_number
+
+ANALYTICS_PATH = Path("analytics_rollups.json")
+ANALYTICS_VERSION = 1
+
+MIXED_LAND = "Mixed"
+MASTERY_MIN_ATTEMPTS = 5
+MASTERY_LEVELS = ((0.9, "Mastered"), (0.7, "Practicing"), (0.0, "Learning"))
+
+ROLLUP_COLUMNS = ("slot", "land", "question_id", "correct", "hint_used", "latency_ms", "timestamp_ms")
+
+
+class Tally:
+    __slots__ = ("attempts", "correct", "hints", "latency_ms")
+
+    def __init__(self, attempts: int = 0, correct: int = 0, hints: int = 0, latency_ms: int = 0) -> None:
+        self.attempts = attempts
+        self.correct = correct
+        self.hints = hints
+        self.latency_ms = latency_ms
+
+    def add(self, correct: bool, hint_used: bool, latency_ms: int) -> None:
+        self.attempts += 1
+        self.correct += 1 if correct else 0
+        self.hints += 1 if hint_used else 0
+        self.latency_ms += latency_ms
+
+    def merge(self, other: "Tally") -> None:
+        self.attempts += other.attempts
+        self.correct += other.correct
+        self.hints += other.hints
+        self.latency_ms += other.latency_ms
+
+    @property
+    def misses(self) -> int:
+        return self.attempts - self.correct
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.attempts if self.attempts else 0.0
+
+    @property
+    def hint_rate(self) -> float:
+        return self.hints / self.attempts if self.attempts else 0.0
+
+    @property
+    def average_seconds(self) -> float:
+        return self.latency_ms / self.attempts / 1000 if self.attempts else 0.0
+
+    def to_list(self) -> List[int]:
+        return [self.attempts, self.correct, self.hints, self.latency_ms]
+
+    @classmethod
+    def from_list(cls, values: Iterable[int]) -> "Tally":
+        return cls(*(int(value) for value in values))
+
+
+class SlotRollup:
+    __slots__ = ("lands", "questions", "days")
+
+    def __init__(self) -> None:
+        self.lands: Dict[str, Tally] = {}
+        self.questions: Dict[Tuple[str, int], Tally] = {}
+        self.days: Dict[int, Tally] = {}
+
+
+def _bump(table: Dict, key, correct: bool, hint_used: bool, latency_ms: int) -> None:
+    tally = table.get(key)
+    if tally is None:
+        tally = table[key] = Tally()
+    tally.add(correct, hint_used, latency_ms)
+
+
+def mastery_level(tally: Tally | None) -> str:
+    if tally is None or tally.attempts < MASTERY_MIN_ATTEMPTS:
+        return "—"
+    for threshold, label in MASTERY_LEVELS:
+        if tally.accuracy >= threshold:
+            return label
+    return MASTERY_LEVELS[-1][1]
+
+
+class AnalyticsRollups:
+    # Running totals keyed by slot x land, slot x question and slot x UTC day,
+    # plus class-wide totals per land, question and day. Every answer bumps a
+    # handful of counters, so dashboard queries read these tables directly
+    # and never rescan the answer log.
+    def __init__(self) -> None:
+        self.slots: Dict[str, SlotRollup] = {}
+        self.lands: Dict[str, Tally] = {}
+        self.questions: Dict[Tuple[str, int], Tally] = {}
+        self.days: Dict[int, Tally] = {}
+        self.prompts: Dict[int, str] = {}
+        self.chunks: List[str] = []
+
+    def add(
+        self,
+        slot: str | None,
+        land: str | None,
+        qid: int,
+        correct: bool,
+        hint_used: bool,
+        latency_ms: int,
+        timestamp_ms: int,
+    ) -> None:
+        # Match what the log stores, so live totals equal a rebuild from chunks.
+        land = land if land in LAND_INDEX else MIXED_LAND
+        day = utc_day_number(timestamp_ms // 1000)
+        rollup = self.slots.get(slot or "")
+        if rollup is None:
+            rollup = self.slots[slot or ""] = SlotRollup()
+        for lands, questions, days in ((rollup.lands, rollup.questions, rollup.days), (self.lands, self.questions, self.days)):
+            _bump(lands, land, correct, hint_used, latency_ms)
+            _bump(questions, (land, qid), correct, hint_used, latency_ms)
+            _bump(days, day, correct, hint_used, latency_ms)
+
+    def apply_columns(self, columns: Dict) -> None:
+        for slot, land, qid, correct, hint_used, latency_ms, timestamp_ms in zip(
+            *(columns[name] for name in ROLLUP_COLUMNS)
+        ):
+            land_name = LANDS[land] if land < len(LANDS) else None
+            self.add(slot, land_name, qid, bool(correct), bool(hint_used), latency_ms, timestamp_ms)
+
+    def catch_up(self, directory: Path = ANSWER_LOG_DIR) -> int:
+        # Folds in chunk files written after the last saved rollup, e.g. when
+        # the process stopped between writing a chunk and saving rollups.
+        known = set(self.chunks)
+        applied = 0
+        for path in iter_chunk_paths(directory):
+            if path.name in known:
+                continue
+            self.apply_columns(read_columns(path, ROLLUP_COLUMNS))
+            self.chunks.append(path.name)
+            applied += 1
+        return applied
+
+    def top_missed_questions(self, limit: int = 10, slot: str | None = None, land: str | None = None) -> List[Dict]:
+        table = self.questions if slot is None else self.slots.get(slot, SlotRollup()).questions
+        candidates = (
+            (key, tally)
+            for key, tally in table.items()
+            if tally.misses and (land is None or key[0] == land)
+        )
+        top = heapq.nlargest(limit, candidates, key=lambda item: (item[1].misses, -item[1].accuracy))
+        return [
+            {
+                "land": key[0],
+                "question_id": key[1],
+                "prompt": self.prompts.get(key[1], f"#{key[1]:08x}"),
+                "attempts": tally.attempts,
+                "misses": tally.misses,
+                "accuracy": tally.accuracy,
+                "hint_rate": tally.hint_rate,
+                "average_seconds": tally.average_seconds,
+            }
+            for key, tally in top
+        ]
+
+    def mastery_matrix(self, slots: Iterable[str] | None = None) -> Dict[str, Dict[str, Tally]]:
+        names = sorted(self.slots) if slots is None else list(slots)
+        return {
+            slot: dict(self.slots[slot].lands) if slot in self.slots else {}
+            for slot in names
+        }
+
+    def land_summary(self, slot: str | None = None) -> Dict[str, Tally]:
+        if slot is None:
+            return dict(self.lands)
+        rollup = self.slots.get(slot)
+        return dict(rollup.lands) if rollup else {}
+
+    def daily_series(self, slot: str | None = None, days: int | None = None) -> List[Tuple[int, Tally]]:
+        table = self.days if slot is None else self.slots.get(slot, SlotRollup()).days
+        series = sorted(table.items())
+        return series[-days:] if days else series
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": ANALYTICS_VERSION,
+            "chunks": list(self.chunks),
+            "prompts": {str(qid): prompt for qid, prompt in self.prompts.items()},
+            "slots": {
+                slot: {
+                    "lands": {land: tally.to_list() for land, tally in rollup.lands.items()},
+                    "questions": [[land, qid, *tally.to_list()] for (land, qid), tally in rollup.questions.items()],
+                    "days": {str(day): tally.to_list() for day, tally in rollup.days.items()},
+                }
+                for slot, rollup in self.slots.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict | None) -> "AnalyticsRollups":
+        rollups = cls()
+        if not data or data.get("version") != ANALYTICS_VERSION:
+            return rollups
+        rollups.chunks = list(data.get("chunks", []))
+        rollups.prompts = {int(qid): prompt for qid, prompt in data.get("prompts", {}).items()}
+        # Class-wide tables are sums of the per-slot ones, so only the latter
+        # are stored and the former are rebuilt here.
+        for slot, payload in data.get("slots", {}).items():
+            rollup = rollups.slots[slot] = SlotRollup()
+            for land, values in payload.get("lands", {}).items():
+                rollup.lands[land] = Tally.from_list(values)
+                rollups.lands.setdefault(land, Tally()).merge(rollup.lands[land])
+            for land, qid, *values in payload.get("questions", []):
+                rollup.questions[(land, qid)] = Tally.from_list(values)
+                rollups.questions.setdefault((land, qid), Tally()).merge(rollup.questions[(land, qid)])
+            for day, values in payload.get("days", {}).items():
+                rollup.days[int(day)] = Tally.from_list(values)
+                rollups.days.setdefault(int(day), Tally()).merge(rollup.days[int(day)])
+        return rollups
+
+
+def load_rollups(path: Path = ANALYTICS_PATH, directory: Path = ANSWER_LOG_DIR) -> AnalyticsRollups:
+    data = load_json(path) if path.exists() else None
+    rollups = AnalyticsRollups.from_dict(data)
+    rollups.catch_up(directory)
+    return rollups
+
+
+def write_answer_chunk(chunk: Path, batch: AnswerBatch, path: Path, snapshot: Dict) -> Path:
+    # The snapshot already counts every row in ``batch`` and lists ``chunk``;
+    # it is saved only after the chunk is on disk, so a crash in between
+    # leaves an unlisted chunk that catch_up() folds in on the next load.
+    write_chunk(chunk.parent, batch, chunk)
+    save_json(path, snapshot)
+    return chunk
+
+
+class AnswerRecorder:
+    # Front door for answer events: appends to the columnar log and bumps the
+    # rollups in the same call. detach() returns the arguments for
+    # write_answer_chunk so callers can run the disk write elsewhere.
+    def __init__(
+        self,
+        directory: Path = ANSWER_LOG_DIR,
+        path: Path = ANALYTICS_PATH,
+        chunk_rows: int = ANSWER_CHUNK_ROWS,
+        autoflush: bool = True,
+        rollups: AnalyticsRollups | None = None,
+    ) -> None:
+        self.writer = AnswerLogWriter(directory, chunk_rows, autoflush=False)
+        self.path = Path(path)
+        self.autoflush = autoflush
+        self.rollups = rollups if rollups is not None else load_rollups(self.path, self.writer.directory)
+
+    @property
+    def directory(self) -> Path:
+        return self.writer.directory
+
+    @property
+    def full(self) -> bool:
+        return self.writer.full
+
+    def record(
+        self,
+        slot: str | None,
+        land: str | None,
+        question: Dict,
+        choice: str,
+        correct: bool,
+        hint_used: bool,
+        latency_ms: int,
+    ) -> None:
+        timestamp_ms = int(time.time() * 1000)
+        qid = question_id(land, question)
+        self.writer.record(slot, land, question, choice, correct, hint_used, latency_ms, timestamp_ms)
+        self.rollups.prompts.setdefault(qid, question.get("prompt", ""))
+        self.rollups.add(slot, land, qid, correct, hint_used, latency_ms, timestamp_ms)
+        if self.autoflush and self.full:
+            self.flush()
+
+    def detach(self) -> Tuple[Path, AnswerBatch, Path, Dict] | None:
+        batch = self.writer.detach()
+        if batch is None:
+            return None
+        # Naming the chunk here keeps the snapshot's chunk list in step with
+        # the rows it counts, whichever thread ends up writing it.
+        chunk = chunk_path(self.directory)
+        self.rollups.chunks.append(chunk.name)
+        return chunk, batch, self.path, self.rollups.to_dict()
+
+    def flush(self) -> Path | None:
+        pending = self.detach()
+        if pending is None:
+            return None
+        return write_answer_chunk(*pending)
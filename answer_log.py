@@ -0,0 +1,222 @@
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from itertools import count
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+
+from durable_io import atomic_write_bytes
+from game_utils import LAND_INDEX, LANDS
+
+ANSWER_LOG_DIR = Path("answer_log")
+ANSWER_CHUNK_ROWS = 4096
+
+CHUNK_MAGIC = b"MQAE"
+CHUNK_VERSION = 1
+NO_LAND = 255
+
+# name -> array typecode, or "s" for dictionary-encoded strings.
+ANSWER_COLUMNS = (
+    ("slot", "s"),
+    ("land", "B"),
+    ("question_id", "I"),
+    ("choice", "s"),
+    ("correct", "B"),
+    ("hint_used", "B"),
+    ("latency_ms", "I"),
+    ("timestamp_ms", "q"),
+)
+COLUMN_KINDS = dict(ANSWER_COLUMNS)
+
+_HEADER = struct.Struct("<4sBBIH")
+_DIRECTORY_ENTRY = struct.Struct("<QI")
+
+
+def question_id(land: str | None, question: Dict) -> int:
+    # Questions have no stored IDs; a hash of land and prompt is stable across
+    # reorderings of quiz_data.json and cheap to recompute for lookups.
+    return zlib.crc32(f"{land}\x1f{question.get('prompt', '')}".encode("utf-8"))
+
+
+class AnswerBatch:
+    __slots__ = ("columns", "rows")
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, list | array] = {
+            name: [] if kind == "s" else array(kind) for name, kind in ANSWER_COLUMNS
+        }
+        self.rows = 0
+
+
+class AnswerLogWriter:
+    # Buffers events column by column and writes a chunk file every
+    # ``chunk_rows`` events. detach() hands the buffer over without touching
+    # disk so the GUI can write chunks from its I/O executor.
+    def __init__(
+        self,
+        directory: Path = ANSWER_LOG_DIR,
+        chunk_rows: int = ANSWER_CHUNK_ROWS,
+        autoflush: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.chunk_rows = chunk_rows
+        self.autoflush = autoflush
+        self.batch = AnswerBatch()
+
+    @property
+    def pending_rows(self) -> int:
+        return self.batch.rows
+
+    @property
+    def full(self) -> bool:
+        return self.batch.rows >= self.chunk_rows
+
+    def record(
+        self,
+        slot: str,
+        land: str | None,
+        question: Dict,
+        choice: str,
+        correct: bool,
+        hint_used: bool,
+        latency_ms: int,
+        timestamp_ms: int | None = None,
+    ) -> None:
+        columns = self.batch.columns
+        columns["slot"].append(slot)
+        columns["land"].append(LAND_INDEX.get(land, NO_LAND))
+        columns["question_id"].append(question_id(land, question))
+        columns["choice"].append(choice)
+        columns["correct"].append(1 if correct else 0)
+        columns["hint_used"].append(1 if hint_used else 0)
+        columns["latency_ms"].append(max(0, min(int(latency_ms), 0xFFFFFFFF)))
+        columns["timestamp_ms"].append(int(time.time() * 1000) if timestamp_ms is None else timestamp_ms)
+        self.batch.rows += 1
+        if self.autoflush and self.full:
+            self.flush()
+
+    def detach(self) -> AnswerBatch | None:
+        if not self.batch.rows:
+            return None
+        batch, self.batch = self.batch, AnswerBatch()
+        return batch
+
+    def flush(self) -> Path | None:
+        batch = self.detach()
+        if batch is None:
+            return None
+        return write_chunk(self.directory, batch)
+
+
+_chunk_sequence = count()
+
+
+def encode_column(kind: str, values) -> bytes:
+    if kind == "s":
+        table: Dict[str, int] = {}
+        codes = array("I", (table.setdefault(value, len(table)) for value in values))
+        header = json.dumps(list(table), separators=(",", ":")).encode("utf-8")
+        payload = struct.pack("<I", len(header)) + header + codes.tobytes()
+    else:
+        payload = values.tobytes()
+    return zlib.compress(payload, 6)
+
+
+def decode_column(kind: str, blob: bytes, swap: bool) -> List | array:
+    payload = zlib.decompress(blob)
+    if kind == "s":
+        (header_length,) = struct.unpack_from("<I", payload)
+        table = json.loads(payload[4 : 4 + header_length])
+        codes = array("I")
+        codes.frombytes(payload[4 + header_length :])
+        if swap:
+            codes.byteswap()
+        return [table[code] for code in codes]
+    values = array(kind)
+    values.frombytes(payload)
+    if swap:
+        values.byteswap()
+    return values
+
+
+def chunk_path(directory: Path) -> Path:
+    return Path(directory) / f"chunk-{int(time.time() * 1000):013d}-{os.getpid()}-{next(_chunk_sequence):04d}.mqa"
+
+
+def write_chunk(directory: Path, batch: AnswerBatch, path: Path | None = None) -> Path:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    blobs = [encode_column(kind, batch.columns[name]) for name, kind in ANSWER_COLUMNS]
+
+    byteorder = 0 if sys.byteorder == "little" else 1
+    parts = [_HEADER.pack(CHUNK_MAGIC, CHUNK_VERSION, byteorder, batch.rows, len(ANSWER_COLUMNS))]
+    directory_size = sum(
+        1 + len(name.encode("utf-8")) + 1 + _DIRECTORY_ENTRY.size for name, _kind in ANSWER_COLUMNS
+    )
+    offset = _HEADER.size + directory_size
+    for (name, kind), blob in zip(ANSWER_COLUMNS, blobs):
+        encoded = name.encode("utf-8")
+        parts.append(bytes([len(encoded)]) + encoded + kind.encode("ascii"))
+        parts.append(_DIRECTORY_ENTRY.pack(offset, len(blob)))
+        offset += len(blob)
+    parts.extend(blobs)
+
+    path = Path(path) if path is not None else chunk_path(directory)
+    atomic_write_bytes(path, b"".join(parts))
+    return path
+
+
+def read_directory(handle) -> tuple[int, bool, Dict[str, tuple[str, int, int]]]:
+    magic, version, byteorder, rows, column_count = _HEADER.unpack(handle.read(_HEADER.size))
+    if magic != CHUNK_MAGIC or version != CHUNK_VERSION:
+        raise ValueError("Not an answer log chunk")
+    swap = (byteorder == 0) != (sys.byteorder == "little")
+    directory = {}
+    for _ in range(column_count):
+        name_length = handle.read(1)[0]
+        name = handle.read(name_length).decode("utf-8")
+        kind = handle.read(1).decode("ascii")
+        offset, length = _DIRECTORY_ENTRY.unpack(handle.read(_DIRECTORY_ENTRY.size))
+        directory[name] = (kind, offset, length)
+    return rows, swap, directory
+
+
+def read_columns(path: Path, names: Sequence[str]) -> Dict[str, List | array]:
+    # Seeks straight to the requested column blobs; other columns are never
+    # read or decompressed.
+    with Path(path).open("rb") as handle:
+        _rows, swap, directory = read_directory(handle)
+        columns = {}
+        for name in names:
+            kind, offset, length = directory[name]
+            handle.seek(offset)
+            columns[name] = decode_column(kind, handle.read(length), swap)
+    return columns
+
+
+def iter_chunk_paths(directory: Path = ANSWER_LOG_DIR) -> Iterator[Path]:
+    directory = Path(directory)
+    if not directory.exists():
+        return iter(())
+    return iter(sorted(directory.glob("chunk-*.mqa")))
+
+
+def iter_column(name: str, directory: Path = ANSWER_LOG_DIR) -> Iterator:
+    for path in iter_chunk_paths(directory):
+        yield from read_columns(path, [name])[name]
+
+
+def iter_answer_events(directory: Path = ANSWER_LOG_DIR, names: Sequence[str] | None = None) -> Iterator[Dict]:
+    names = list(names or COLUMN_KINDS)
+    for path in iter_chunk_paths(directory):
+        columns = read_columns(path, names)
+        for row in zip(*(columns[name] for name in names)):
+            event = dict(zip(names, row))
+            if "land" in event:
+                land = event["land"]
+                event["land"] = LANDS[land] if land < len(LANDS) else None
+            yield event
@@ -1,17 +1,33 @@
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.table import Table
-    from rich.text import Text
-except ImportError:  # pragma: no cover - optional dependency
-    Console = None
-    Panel = None
-    Table = None
-    Text = None
+from functools import lru_cache
+from types import SimpleNamespace
 
+from terminal import current_terminal, echo
+
+# rich is optional and slow to import, so it is resolved on the first styled
+# output instead of at import time; None means "not tried yet".
+_rich: SimpleNamespace | bool | None = None
+
+
+def rich_modules() -> SimpleNamespace | None:
+    global _rich
+    if _rich is None:
+        try:
+            from rich.console import Console
+            from rich.panel import Panel
+            from rich.table import Table
+            from rich.text import Text
+        except ImportError:  # pragma: no cover - optional dependency
+            _rich = False
+        else:
+            _rich = SimpleNamespace(console=Console(), Panel=Panel, Table=Table, Text=Text)
+    return _rich or None
+
+
+def styled_console():
+    # The rich console for the player being served, or None for plain text.
+    rich = rich_modules()
+    return current_terminal.get().rich_console(rich) if rich else None
 
-RICH_ENABLED = Console is not None
-console = Console() if RICH_ENABLED else None
 
 COLOR_PALETTES = {
     "Fractions Forest": {
@@ -121,43 +137,61 @@ AVATAR_OPTIONS = [
 
 
 def fancy_print(text="", style=None, justify="left"):
-    if RICH_ENABLED:
+    console = styled_console()
+    if console:
         console.print(text, style=style, justify=justify)
     else:
-        print(text)
+        echo(text)
+
+
+# Banners never change, so their rich renderables are built once and reused.
+@lru_cache(maxsize=None)
+def styled_banner(name):
+    rich = rich_modules()
+    if name == "title":
+        return rich.Text(TITLE_BANNER, style="bold deep_sky_blue1")
+    if name == "battle":
+        return rich.Panel.fit("Quiz Battle!", border_style="magenta", style="bold white")
+    if name == "lesson":
+        return rich.Panel.fit("Story Lesson", border_style="cyan", style="bold")
+    return rich.Panel.fit("Quest Results", border_style="gold1", style="bold")
 
 
 def render_title_banner():
-    if RICH_ENABLED and Text:
-        fancy_print(Text(TITLE_BANNER, style="bold deep_sky_blue1"), justify="center")
+    console = styled_console()
+    if console:
+        console.print(styled_banner("title"), justify="center")
     else:
-        print(TITLE_BANNER)
+        echo(TITLE_BANNER)
 
 
 def render_battle_header():
-    if RICH_ENABLED and Panel:
-        console.print(Panel.fit("Quiz Battle!", border_style="magenta", style="bold white"))
+    console = styled_console()
+    if console:
+        console.print(styled_banner("battle"))
     else:
-        print(BATTLE_HEADER)
+        echo(BATTLE_HEADER)
 
 
 def render_lesson_header():
-    if RICH_ENABLED and Panel:
-        console.print(Panel.fit("Story Lesson", border_style="cyan", style="bold"))
+    console = styled_console()
+    if console:
+        console.print(styled_banner("lesson"))
     else:
-        print(LESSON_HEADER)
+        echo(LESSON_HEADER)
 
 
 def render_results_header():
-    if RICH_ENABLED and Panel:
-        console.print(Panel.fit("Quest Results", border_style="gold1", style="bold"))
+    console = styled_console()
+    if console:
+        console.print(styled_banner("results"))
     else:
-        print(RESULTS_HEADER)
+        echo(RESULTS_HEADER)
 
 
 def format_land_line(status, emoji, name, unlocked):
     text = LAND_LINE_TEMPLATE.format(status=status, emoji=emoji, name=name)
-    if RICH_ENABLED:
+    if styled_console():
         style = LAND_STATUS_STYLES[unlocked]
         return f"[{style}]{text}[/{style}]"
     return text
@@ -165,18 +199,20 @@ def format_land_line(status, emoji, name, unlocked):
 
 def render_map_panel(lines):
     body = "\n".join(lines)
-    if RICH_ENABLED and Panel:
-        console.print(Panel(body, title="Quest Map", border_style="yellow", expand=False))
+    console = styled_console()
+    if console:
+        console.print(rich_modules().Panel(body, title="Quest Map", border_style="yellow", expand=False))
     else:
-        print(MAP_TEMPLATE.format(lands=body))
+        echo(MAP_TEMPLATE.format(lands=body))
 
 
 def render_results_table(rows):
-    if RICH_ENABLED and Table:
-        table = Table(show_header=False, box=None, pad_edge=False)
+    console = styled_console()
+    if console:
+        table = rich_modules().Table(show_header=False, box=None, pad_edge=False)
         for label, value, style in rows:
             table.add_row(f"[bold]{label}[/bold]", f"[{style}]{value}[/{style}]")
         console.print(table)
     else:
         for label, value, _ in rows:
-            print(f"{label}: {value}")
+            echo(f"{label}: {value}")
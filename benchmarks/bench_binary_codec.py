@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from bench_report_export import write_store  # noqa: E402
+from binary_codec import COMPRESSIONS, iter_binary_store_profiles, json_to_binary, load_binary  # noqa: E402
+from game_utils import LEADERBOARD_DATA_PATH, PLAYER_DATA_PATH, encode_record, load_json, sanitize_profile  # noqa: E402
+
+
+def best_of(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def parse_json_store(path: Path) -> None:
+    for profile in load_json(path)["slots"].values():
+        if profile is not None:
+            sanitize_profile(profile)
+
+
+def stream_binary_store(path: Path) -> None:
+    for _slot in iter_binary_store_profiles(path):
+        pass
+
+
+def canonical(store: dict) -> str:
+    slots = {slot: sanitize_profile(profile) if profile is not None else None for slot, profile in store.get("slots", {}).items()}
+    return json.dumps(dict(store, slots=slots), sort_keys=True, default=encode_record)
+
+
+def compare(label: str, source: Path, workdir: Path, repeat: int) -> bool:
+    is_store = "slots" in load_json(source)
+    json_size = source.stat().st_size
+    data = load_json(source)
+    compact = len(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    print(f"{label}: {json_size / 1024:.1f} KiB as saved, {compact / 1024:.1f} KiB compact JSON")
+    parse = parse_json_store if is_store else load_json
+    json_time = best_of(lambda: parse(source), repeat)
+    print(f"  {'json':<6} {json_size / 1024:9.1f} KiB  {'':>14}  parse {json_time * 1000:8.1f} ms")
+    ok = True
+    for compression in COMPRESSIONS:
+        target = workdir / f"{source.stem}-{compression}.mqb"
+        encode_time = best_of(lambda: json_to_binary(source, target, compression), repeat)
+        decode = stream_binary_store if is_store else load_binary
+        decode_time = best_of(lambda: decode(target), repeat)
+        size = target.stat().st_size
+        print(
+            f"  {compression:<6} {size / 1024:9.1f} KiB  ({size / json_size:5.1%} of json)  "
+            f"parse {decode_time * 1000:8.1f} ms  ({json_time / decode_time:4.1f}x)  encode {encode_time * 1000:8.1f} ms"
+        )
+        if is_store and canonical(load_binary(target)) != canonical(data):
+            print(f"  {compression}: round trip does not match the JSON file")
+            ok = False
+        elif not is_store and load_binary(target) != data:
+            print(f"  {compression}: round trip does not match the JSON file")
+            ok = False
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare save sizes and parse times of JSON and the binary codec.")
+    parser.add_argument("--slots", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--current", action="store_true", help=f"also measure {PLAYER_DATA_PATH} and {LEADERBOARD_DATA_PATH} in the cwd")
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        store_path = workdir / "player_data.json"
+        write_store(store_path, args.slots)
+        ok = compare(f"synthetic store, {args.slots} slots", store_path, workdir, args.repeat)
+        if args.current:
+            for path in (PLAYER_DATA_PATH, LEADERBOARD_DATA_PATH):
+                if path.exists():
+                    ok = compare(str(path), path.resolve(), workdir, args.repeat) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from content_host import ContentHost, SharedContent  # noqa: E402
+from game_utils import LESSON_DATA_PATH, QUIZ_DATA_PATH, load_json  # noqa: E402
+
+
+def memory_kib() -> dict:
+    # Private pages are what each extra session really costs; Pss splits
+    # shared pages evenly between the processes mapping them.
+    values = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as handle:
+        for line in handle:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return {"private": values["Private_Clean"] + values["Private_Dirty"], "pss": values["Pss"], "rss": values["Rss"]}
+
+
+def session(mode: str, name: str, lessons_path: str, quizzes_path: str, reads: int, results, done) -> None:
+    before = memory_kib()
+    started = time.perf_counter()
+    if mode == "shared":
+        content = SharedContent.attach(name)
+        lessons, quiz_bank = content.lessons, content.quiz_bank
+    else:
+        lessons, quiz_bank = load_json(Path(lessons_path)), load_json(Path(quizzes_path))
+    loaded = time.perf_counter() - started
+    # A play session: a lesson and a run of questions from every land.
+    started = time.perf_counter()
+    for land in quiz_bank:
+        lessons.get(land)
+        pool = quiz_bank[land]
+        for index in range(0, len(pool), max(1, len(pool) // reads)):
+            pool[index]["prompt"]
+    played = time.perf_counter() - started
+    after = memory_kib()
+    results.put((after["private"] - before["private"], after["rss"] - before["rss"], loaded, played))
+    done.wait()
+    results.put(memory_kib()["pss"])
+
+
+def run(mode: str, name: str, sessions: int, paths: tuple, reads: int) -> None:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    done = context.Event()
+    processes = [context.Process(target=session, args=(mode, name, *paths, reads, results, done)) for _ in range(sessions)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    done.set()
+    pss = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    private = sum(sample[0] for sample in samples) / sessions
+    rss = sum(sample[1] for sample in samples) / sessions
+    loaded = max(sample[2] for sample in samples)
+    played = max(sample[3] for sample in samples)
+    print(
+        f"{mode:<7} {sessions} sessions: +{private / 1024:7.2f} MiB private and +{rss / 1024:7.2f} MiB RSS per session, "
+        f"{pss / 1024:7.1f} MiB Pss in total; load {loaded * 1000:7.1f} ms, play {played * 1000:6.1f} ms (slowest)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-session memory with and without the shared content host.")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--scale", type=int, default=400, help="copies of each land's questions in the synthetic bank")
+    parser.add_argument("--reads", type=int, default=20, help="questions each session reads per land")
+    args = parser.parse_args()
+    if not Path("/proc/self/smaps_rollup").exists():
+        parser.error("needs Linux /proc/self/smaps_rollup to measure memory")
+
+    lessons = load_json(REPO_ROOT / LESSON_DATA_PATH)
+    quiz_bank = {land: questions * args.scale for land, questions in load_json(REPO_ROOT / QUIZ_DATA_PATH).items()}
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = (str(Path(workdir) / "lessons.json"), str(Path(workdir) / "quizzes.json"))
+        Path(paths[0]).write_text(json.dumps(lessons), encoding="utf-8")
+        Path(paths[1]).write_text(json.dumps(quiz_bank), encoding="utf-8")
+        print(f"bank: {sum(map(len, quiz_bank.values()))} questions, {Path(paths[1]).stat().st_size / 1024 / 1024:.1f} MiB of JSON\n")
+
+        name = f"mathquest6-bench-{os.getpid()}"
+        run("json", name, args.sessions, paths, args.reads)
+        host = ContentHost(name)
+        try:
+            size = host.publish(lessons, quiz_bank)
+            print(f"(host segment: {size / 1024 / 1024:.1f} MiB, mapped once)")
+            run("shared", name, args.sessions, paths, args.reads)
+        finally:
+            host.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import durable_io  # noqa: E402
+from durable_io import DURABILITY_MODES, set_durability  # noqa: E402
+from game_utils import default_profile, ensure_profile_store, save_json, save_profiles  # noqa: E402
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def commit_loop(commit, count: int, latencies: list) -> None:
+    for index in range(count):
+        started = time.perf_counter()
+        commit(index)
+        latencies.append(time.perf_counter() - started)
+
+
+def measure(mode: str, label: str, commit, count: int, threads: int) -> None:
+    set_durability(mode)
+    batches_before = durable_io.group_committer.batches
+    latencies: list = []
+    workers = [threading.Thread(target=commit_loop, args=(commit, count, latencies)) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    # Grouped commits are only durable once the pending batch is flushed.
+    durable_io.group_committer.flush()
+    durable_elapsed = time.perf_counter() - started
+    commits = count * threads
+    batches = durable_io.group_committer.batches - batches_before
+    print(
+        f"{mode:<8} {label:<22} {commits / elapsed:8.0f} commits/s  "
+        f"p50 {percentile(latencies, 0.5) * 1000:7.2f} ms  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  "
+        f"durable after {durable_elapsed:6.2f} s" + (f"  ({batches} fsync batches)" if mode == "grouped" else "")
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare commit latency and throughput of the durability modes.")
+    parser.add_argument("--slots", type=int, default=200)
+    parser.add_argument("--commits", type=int, default=200, help="commits per thread")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent writers for the small-file run")
+    parser.add_argument("--dir", type=Path, help="run on this filesystem instead of the system temp dir")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as workdir:
+        os.chdir(workdir)
+        store = ensure_profile_store()
+        for index in range(args.slots):
+            store["slots"][f"Student {index + 1}"] = default_profile()
+        save_profiles(store)
+        size = Path("player_data.json").stat().st_size
+        print(f"store: {args.slots} slots, {size / 1024:.0f} KiB; working in {workdir}\n")
+
+        def save_game(index: int) -> None:
+            store["slots"]["Slot 1"]["xp"] = index % 100
+            save_profiles(store)
+
+        def save_small(index: int) -> None:
+            name = threading.current_thread().name
+            save_json(Path(f"small-{name}.json"), {"index": index})
+
+        for mode in DURABILITY_MODES:
+            measure(mode, "save_profiles", save_game, args.commits, 1)
+            measure(mode, f"small file x{args.threads} thr", save_small, args.commits, args.threads)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import argparse
+import heapq
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from game_utils import leaderboard_entry  # noqa: E402
+from leaderboard_merge import identity, merge_leaderboards, merge_sort_key  # noqa: E402
+
+
+def synthetic_profile(student: int, rng: random.Random) -> dict:
+    return {
+        "player_name": f"Student {student}",
+        # Roughly half the students were imported from a roster with IDs.
+        "student_id": f"S{student:06d}" if student % 2 else "",
+        "level": rng.randint(1, 12),
+        "xp": rng.randint(0, 99),
+        "daily_stats": {"streak_best": rng.randint(0, 30), "total_completions": rng.randint(0, 40)},
+    }
+
+
+def write_machines(root: Path, machines: int, slots: int, students: int, seed: int = 11) -> list:
+    # Each machine sees a random sample of the school, so popular students
+    # show up on several machines with different progress.
+    rng = random.Random(seed)
+    directories = []
+    for machine in range(machines):
+        directory = root / f"lab-{machine + 1:02d}"
+        directory.mkdir()
+        with (directory / "player_data.json").open("w", encoding="utf-8") as handle:
+            handle.write('{"active_slot": "Slot 1", "slots": {')
+            for index in range(slots):
+                profile = synthetic_profile(rng.randrange(students), rng)
+                handle.write(f'{"," if index else ""}{json.dumps(f"Slot {index + 1}")}: {json.dumps(profile)}')
+            handle.write("}}")
+        directories.append(directory)
+    return directories
+
+
+def brute_force(directories: list, limit: int) -> list:
+    best = {}
+    for directory in directories:
+        store = json.loads((directory / "player_data.json").read_text(encoding="utf-8"))
+        for slot, profile in store["slots"].items():
+            entry = leaderboard_entry(slot, profile)
+            entry["machine"] = directory.name
+            who = identity(entry, profile.get("student_id") or "", "auto")
+            if who not in best or merge_sort_key(entry) < merge_sort_key(best[who]):
+                best[who] = entry
+    return [(entry["machine"], entry["slot"]) for entry in heapq.nsmallest(limit, best.values(), key=merge_sort_key)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the multi-machine leaderboard merge.")
+    parser.add_argument("--machines", type=int, default=8)
+    parser.add_argument("--slots", type=int, default=25_000, help="slots per machine")
+    parser.add_argument("--students", type=int, default=60_000)
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        directories = write_machines(Path(workdir), args.machines, args.slots, args.students)
+        print(f"{args.machines} machines x {args.slots} slots, {args.students} distinct students")
+        expected = brute_force(directories, args.top)
+        jobs = 1
+        while True:
+            started = time.perf_counter()
+            board = merge_leaderboards(directories, args.top, jobs=jobs)
+            elapsed = time.perf_counter() - started
+            got = [(entry["machine"], entry["slot"]) for entry in board["entries"]]
+            print(f"jobs={jobs:<3} {elapsed:7.2f} s  matches brute force: {got == expected}")
+            if jobs >= args.machines:
+                break
+            jobs = min(jobs * 2, args.machines)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
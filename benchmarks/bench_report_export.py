@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from game_utils import LANDS, load_json  # noqa: E402
+from report_export import ReportFilter, export_report  # noqa: E402
+
+
+def synthetic_profile(index: int, rng: random.Random) -> dict:
+    history = [
+        {
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "land": rng.choice(LANDS),
+            "seconds": rng.randint(40, 600),
+            "bonus_xp": 25,
+            "badge_reward": "Daily Star",
+        }
+        for _ in range(rng.randint(0, 12))
+    ]
+    return {
+        "player_name": f"Student {index}",
+        "level": rng.randint(1, 12),
+        "xp": rng.randint(0, 99),
+        "badges": rng.sample(LANDS, rng.randint(0, 4)),
+        "unlocked_lands": LANDS[: rng.randint(1, len(LANDS))],
+        "daily_stats": {
+            "streak_current": rng.randint(0, 9),
+            "streak_best": rng.randint(0, 30),
+            "total_completions": len(history),
+            "last_completion_date": history[-1]["date"] if history else None,
+        },
+        "daily_history": history,
+    }
+
+
+def write_store(path: Path, slots: int, seed: int = 7) -> None:
+    # Written slot by slot so generating the fixture is itself constant-memory.
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write('{\n  "active_slot": "Slot 1",\n  "slots": {\n')
+        for index in range(slots):
+            separator = ",\n" if index else ""
+            handle.write(f'{separator}    {json.dumps(f"Slot {index + 1}")}: {json.dumps(synthetic_profile(index, rng))}')
+        handle.write("\n  }\n}\n")
+
+
+def measure(label: str, func) -> None:
+    # Timed and traced in separate passes; tracemalloc slows allocation-heavy
+    # code several-fold and would swamp the timing.
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {elapsed:7.2f} s  peak {peak / 1024 / 1024:7.1f} MiB  rows {result}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming report export on a synthetic store.")
+    parser.add_argument("--slots", type=int, default=100_000)
+    parser.add_argument("--baseline", action="store_true", help="also time json.load of the whole store")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # History archives resolve relative to the working directory.
+        os.chdir(workdir)
+        for slots in (args.slots // 10, args.slots):
+            store = Path(workdir) / f"store-{slots}.json"
+            write_store(store, slots)
+            print(f"\n{slots} slots, {store.stat().st_size / 1024 / 1024:.1f} MiB store")
+            measure("students -> csv", lambda: export_report(Path("students.csv"), "students", source=store))
+            measure("dailies -> jsonl", lambda: export_report(Path("dailies.jsonl"), "dailies", source=store))
+            measure(
+                "dailies, filtered -> csv",
+                lambda: export_report(
+                    Path("filtered.csv"),
+                    "dailies",
+                    columns=["slot", "date", "seconds"],
+                    filters=ReportFilter(lands=LANDS[:2], since="2025-06-01", min_level=5),
+                    source=store,
+                ),
+            )
+            if args.baseline:
+                measure("baseline json.load (no export)", lambda: len(load_json(store)["slots"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
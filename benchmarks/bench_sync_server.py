@@ -0,0 +1,126 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from game_utils import LANDS, default_profile, encode_record  # noqa: E402
+from profile_sync import SyncClient, encode_body, unit_values  # noqa: E402
+from sync_server import SyncHub, make_server  # noqa: E402
+
+
+class CountingClient(SyncClient):
+    def __init__(self, url: str, state_path: Path) -> None:
+        super().__init__(url, state_path)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def request(self, path: str, payload=None):
+        if payload is not None:
+            self.bytes_sent += len(encode_body(payload))
+        response = super().request(path, payload)
+        self.bytes_received += len(encode_body(response))
+        return response
+
+
+def roster(slots: int) -> dict:
+    store = {"active_slot": "Slot 1", "slots": {}}
+    for index in range(slots):
+        profile = default_profile()
+        profile["player_name"] = f"Student {index + 1}"
+        store["slots"][f"Slot {index + 1}"] = profile
+    return store
+
+
+def play(profile, rng: random.Random) -> None:
+    # A short session: some XP, sometimes a level, a badge or a new land.
+    profile["xp"] += rng.randint(5, 40)
+    if profile["xp"] >= 100:
+        profile["xp"] -= 100
+        profile["level"] += 1
+    if rng.random() < 0.2:
+        profile["badges"] = profile["badges"] + [rng.choice(LANDS)]
+        profile["badges"] = list(dict.fromkeys(profile["badges"]))
+    if rng.random() < 0.1:
+        profile["unlocked_lands"] = [land for land in LANDS if land in profile["unlocked_lands"] or land == rng.choice(LANDS)]
+
+
+def run_machine(client: CountingClient, store: dict, rounds: int, edits: int, seed: int, latencies: list) -> None:
+    rng = random.Random(seed)
+    slots = list(store["slots"])
+    for _ in range(rounds):
+        for slot in rng.sample(slots, edits):
+            play(store["slots"][slot], rng)
+        started = time.perf_counter()
+        result = client.sync(store)
+        latencies.append(time.perf_counter() - started)
+        if result["offline"]:
+            raise RuntimeError("sync server unreachable")
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the reference sync server on localhost.")
+    parser.add_argument("--machines", type=int, default=8)
+    parser.add_argument("--slots", type=int, default=2000, help="students on every machine's roster")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=50, help="profiles played per machine per round")
+    args = parser.parse_args()
+
+    hub = SyncHub()
+    server = make_server(hub, port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        clients = [CountingClient(url, Path(workdir) / f"sync-{index}.json") for index in range(args.machines)]
+        stores = [roster(args.slots) for _ in clients]
+        latencies: list = []
+        threads = [
+            threading.Thread(target=run_machine, args=(client, store, args.rounds, args.edits, index, latencies))
+            for index, (client, store) in enumerate(zip(clients, stores))
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        # Two quiet rounds let every machine pick up the last merges.
+        for _ in range(2):
+            for client, store in zip(clients, stores):
+                client.sync(store)
+        reference = {slot: unit_values(profile) for slot, profile in stores[0]["slots"].items()}
+        converged = all(
+            {slot: unit_values(profile) for slot, profile in store["slots"].items()} == reference for store in stores[1:]
+        )
+
+    server.shutdown()
+    full_store = len(json.dumps(stores[0], default=encode_record).encode("utf-8"))
+    sent = sum(client.bytes_sent for client in clients)
+    received = sum(client.bytes_received for client in clients)
+    syncs = len(latencies)
+    print(f"{args.machines} machines x {args.slots} slots, {args.rounds} rounds of {args.edits} edits")
+    print(f"{syncs} syncs in {elapsed:.2f} s ({syncs / elapsed:.1f}/s)")
+    print(f"sync latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms  p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"bytes per sync: sent {sent / syncs / 1024:.1f} KiB, received {received / syncs / 1024:.1f} KiB")
+    print(f"whole player_data.json: {full_store / 1024:.1f} KiB uncompressed")
+    print(f"server records {len(hub.records)}, seq {hub.seq}; all machines converged: {converged}")
+    print(f"mean latency {statistics.mean(latencies) * 1000:.1f} ms")
+    return 0 if converged else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
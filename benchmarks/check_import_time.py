@@ -0,0 +1,58 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules the console must not pull in before its first styled output.
+DEFERRED_MODULES = ("rich", "tkinter")
+
+
+def measure_import(module: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        cumulative_us = int(cumulative_us)
+        timings[name] = max(timings.get(name, 0), cumulative_us)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Guard the console startup import cost with -X importtime.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=120.0, help="maximum cumulative import time for the module")
+    parser.add_argument("--runs", type=int, default=5, help="take the fastest of this many cold interpreter runs")
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda timings: timings.get(args.module, 0))
+    total_ms = best.get(args.module, 0) / 1000
+
+    print(f"{args.module}: {total_ms:.1f} ms cumulative (best of {args.runs}, budget {args.budget_ms:.1f} ms)")
+    for name, cumulative in sorted(best.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import of {args.module} took {total_ms:.1f} ms, over the {args.budget_ms:.1f} ms budget")
+    for deferred in DEFERRED_MODULES:
+        if any(name == deferred or name.startswith(f"{deferred}.") for name in best):
+            failures.append(f"{deferred} is imported eagerly by {args.module}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+OPTION_KEY = re.compile(r"^\s+(\w+)\) ", re.MULTILINE)
+
+
+class Seat:
+    # One simulated student at a line terminal: waits for a prompt, thinks,
+    # types a reply. Latency is from sending a line to seeing the next prompt.
+    def __init__(self, index: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latencies: List[float]) -> None:
+        self.index = index
+        self.reader = reader
+        self.writer = writer
+        self.latencies = latencies
+        self.buffer = ""
+
+    async def prompt(self) -> str:
+        started = time.perf_counter()
+        while True:
+            # Prompts end in ": " or "? " and are never followed by a newline.
+            if self.buffer.endswith((": ", "? ", "...")):
+                self.latencies.append(time.perf_counter() - started)
+                screen, self.buffer = self.buffer, ""
+                return screen
+            chunk = await self.reader.read(65536)
+            if not chunk:
+                raise EOFError(f"seat {self.index + 1}: connection closed")
+            self.buffer += chunk.decode("utf-8", "replace")
+
+    async def send(self, line: str) -> None:
+        self.writer.write((line + "\n").encode("utf-8"))
+        await self.writer.drain()
+
+
+async def student(index: int, host: str, port: int, rounds: int, think: float, latencies: List[float], rng: random.Random) -> None:
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    seat = Seat(index, reader, writer, latencies)
+    battles = 0
+    try:
+        while True:
+            screen = await seat.prompt()
+            await asyncio.sleep(rng.uniform(0, think))
+            if screen.endswith("Selection: "):
+                await seat.send(str(index + 1))
+            elif screen.endswith("name? "):
+                await seat.send(f"Student {index + 1}")
+            elif screen.endswith("avatar: "):
+                await seat.send("1")
+            elif screen.endswith("Enter number or command: "):
+                if battles == rounds:
+                    await seat.send("quit")
+                    break
+                battles += 1
+                await seat.send("1")
+            elif screen.endswith("Your answer: "):
+                keys = OPTION_KEY.findall(screen) or ["a"]
+                await seat.send(rng.choice(keys))
+            elif screen.endswith("(y/n): "):
+                await seat.send("n")
+            else:
+                await seat.send("")
+        while await reader.read(65536):
+            pass
+    finally:
+        writer.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_load(host: str, port: int, seats: int, rounds: int, think: float, seed: int) -> bool:
+    latencies: List[float] = []
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(student(index, host, port, rounds, think, latencies, random.Random(rng.random())) for index in range(seats)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    failures = [result for result in results if isinstance(result, BaseException)]
+    print(f"{seats} concurrent seats, {len(latencies)} prompts in {elapsed:.2f} s ({len(latencies) / elapsed:.0f} prompts/s)")
+    print(
+        f"  reply-to-prompt latency: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+    )
+    for failure in failures[:5]:
+        print(f"  failed: {failure!r}")
+    if failures:
+        print(f"  {len(failures)} of {seats} seats failed")
+    return not failures
+
+
+def peak_rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status", encoding="ascii") as handle:
+        for line in handle:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Play many console sessions at once against console_daemon.py.")
+    parser.add_argument("--seats", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=3, help="battles per seat")
+    parser.add_argument("--think", type=float, default=0.05, help="max seconds a student thinks per prompt")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ("lesson_data.json", "quiz_data.json"):
+            (Path(workdir) / name).write_bytes((REPO_ROOT / name).read_bytes())
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / "console_daemon.py"), "--port", str(port), "--seats", str(args.seats)],
+            cwd=workdir,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            print(server.stdout.readline().strip())
+            ok = asyncio.run(run_load("127.0.0.1", port, args.seats, args.rounds, args.think, args.seed))
+            if Path("/proc").exists():
+                print(f"  daemon peak RSS: {peak_rss_mib(server.pid):.1f} MiB for the whole class")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        slots = json.loads((Path(workdir) / "player_data.json").read_text(encoding="utf-8"))["slots"]
+        saved = sum(1 for profile in slots.values() if profile and (profile.get("player_name") or "").startswith("Student "))
+        print(f"\nprofiles on disk after shutdown: {saved} of {args.seats}")
+    return 0 if ok and saved == args.seats else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
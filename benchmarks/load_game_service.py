@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class Connection:
+    # Minimal keep-alive HTTP/1.1 client: one connection per simulated
+    # student, like a browser tab.
+    def __init__(self, host: str, port: int, latencies: Dict[str, List[float]]) -> None:
+        self.host = host
+        self.port = port
+        self.latencies = latencies
+        self.session: str | None = None
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def request(self, method: str, path: str, body: Dict | None = None, label: str | None = None) -> Dict:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(data)}\r\n"
+        if self.session:
+            head += f"X-Session: {self.session}\r\n"
+        started = time.perf_counter()
+        self.writer.write(head.encode("latin-1") + b"\r\n" + data)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length))
+        self.latencies.setdefault(label or f"{method} {path.split('?')[0]}", []).append(time.perf_counter() - started)
+        if status != 200:
+            raise RuntimeError(f"{method} {path}: {status} {payload.get('error')}")
+        return payload
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+async def student(index: int, host: str, port: int, rounds: int, think: float, latencies, rng: random.Random) -> None:
+    connection = Connection(host, port, latencies)
+    try:
+        opened = await connection.request("POST", "/session", {"slot": f"Load {index + 1}", "player_name": f"Student {index + 1}"})
+        connection.session = opened["session"]
+        for _ in range(rounds):
+            view = await connection.request("GET", "/map")
+            unlocked = [entry["land"] for entry in view["lands"] if entry["unlocked"]]
+            land = rng.choice(unlocked)
+            await connection.request("GET", "/lesson?" + urllib.parse.urlencode({"land": land}))
+            battle = await connection.request("POST", "/battle/start", {"land": land})
+            question = battle["question"]
+            while question is not None:
+                await asyncio.sleep(rng.uniform(0, think))
+                result = await connection.request("POST", "/battle/answer", {"choice": rng.choice(list(question["options"]))})
+                question = result.get("question")
+            await connection.request("GET", "/leaderboard?limit=10")
+        await connection.request("DELETE", "/session")
+    finally:
+        await connection.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_load(host: str, port: int, sessions: int, rounds: int, think: float, seed: int) -> bool:
+    latencies: Dict[str, List[float]] = {}
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(student(index, host, port, rounds, think, latencies, random.Random(rng.random())) for index in range(sessions)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    failures = [result for result in results if isinstance(result, Exception)]
+    total = sum(len(values) for values in latencies.values())
+    print(f"{sessions} concurrent sessions, {total} requests in {elapsed:.2f} s ({total / elapsed:.0f} req/s)\n")
+    print(f"  {'endpoint':<22} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, values in sorted(latencies.items()) + [("all", [value for values in latencies.values() for value in values])]:
+        print(
+            f"  {label:<22} {len(values):>7} {percentile(values, 0.5) * 1000:8.1f} "
+            f"{percentile(values, 0.99) * 1000:8.1f} {max(values) * 1000:8.1f}"
+        )
+    for failure in failures[:5]:
+        print(f"  failed: {failure}")
+    if failures:
+        print(f"  {len(failures)} of {sessions} sessions failed")
+    return not failures
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drive game_service.py with many concurrent simulated students.")
+    parser.add_argument("--url", help="running service to test (default: start one in a temp dir)")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3, help="battles per session")
+    parser.add_argument("--think", type=float, default=0.05, help="max seconds a student thinks per question")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.url:
+        url = urllib.parse.urlsplit(args.url)
+        ok = asyncio.run(run_load(url.hostname, url.port or 80, args.sessions, args.rounds, args.think, args.seed))
+        return 0 if ok else 1
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ("lesson_data.json", "quiz_data.json"):
+            (Path(workdir) / name).write_bytes((REPO_ROOT / name).read_bytes())
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / "game_service.py"), "--port", str(port)],
+            cwd=workdir,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            print(server.stdout.readline().strip())
+            ok = asyncio.run(run_load("127.0.0.1", port, args.sessions, args.rounds, args.think, args.seed))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        slots = json.loads((Path(workdir) / "player_data.json").read_text(encoding="utf-8"))["slots"]
+        saved = sum(1 for slot, profile in slots.items() if slot.startswith("Load ") and profile is not None)
+        print(f"\nprofiles on disk after shutdown: {saved} of {args.sessions}")
+    return 0 if ok and saved == args.sessions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
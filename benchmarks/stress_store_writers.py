@@ -0,0 +1,130 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from game_utils import (  # noqa: E402
+    PLAYER_DATA_PATH,
+    StoreConflictError,
+    claim_active_slot,
+    default_profile,
+    ensure_profile_store,
+    load_json,
+    save_json,
+    save_profiles,
+)
+
+SHARED_SLOT = "Shared"
+
+
+def own_slot_writer(workdir: str, slot: str, iterations: int) -> None:
+    # One game session: holds its slot's session lock and saves after every
+    # change, the way the console does. Each save bumps xp by one.
+    os.chdir(workdir)
+    store = ensure_profile_store()
+    if not claim_active_slot(slot):
+        raise RuntimeError(f"{slot} already claimed")
+    if store["slots"].get(slot) is None:
+        store["slots"][slot] = default_profile()
+    for _ in range(iterations):
+        store["slots"][slot]["xp"] += 1
+        save_profiles(store)
+
+
+def shared_slot_writer(workdir: str, iterations: int, retries) -> None:
+    # Writers that skip the session lock and fight over one slot: every
+    # conflict is detected, the writer reloads and re-applies its change.
+    os.chdir(workdir)
+    store = ensure_profile_store()
+    for _ in range(iterations):
+        while True:
+            profile = store["slots"].get(SHARED_SLOT) or default_profile()
+            store["slots"][SHARED_SLOT] = profile
+            profile["xp"] += 1
+            try:
+                save_profiles(store)
+                break
+            except StoreConflictError:
+                with retries.get_lock():
+                    retries.value += 1
+                store = ensure_profile_store()
+
+
+def blind_writer(workdir: str, slot: str, iterations: int) -> None:
+    # The old behaviour: read the whole file, change one slot, overwrite.
+    os.chdir(workdir)
+    for _ in range(iterations):
+        while True:
+            try:
+                store = load_json(PLAYER_DATA_PATH)
+                break
+            except (ValueError, OSError):
+                continue  # torn read of a half-written file
+        profile = store["slots"].get(slot) or default_profile().to_dict()
+        profile["xp"] += 1
+        store["slots"][slot] = profile
+        save_json(PLAYER_DATA_PATH, store)
+
+
+def run(label: str, workdir: str, processes: list) -> float:
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            raise SystemExit(f"{label}: a writer exited with code {process.exitcode}")
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Hammer player_data.json from many processes and count lost updates.")
+    parser.add_argument("--writers", type=int, default=8, help="processes, each saving its own slot")
+    parser.add_argument("--shared", type=int, default=4, help="extra processes fighting over one slot")
+    parser.add_argument("--iterations", type=int, default=100, help="saves per process")
+    parser.add_argument("--blind", action="store_true", help="also run the same load with unlocked blind overwrites")
+    args = parser.parse_args()
+    context = multiprocessing.get_context("spawn")
+    expected = {f"Writer {index + 1}": args.iterations for index in range(args.writers)}
+    failed = False
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        ensure_profile_store()
+        retries = context.Value("i", 0)
+        processes = [
+            context.Process(target=own_slot_writer, args=(workdir, slot, args.iterations)) for slot in expected
+        ]
+        processes += [
+            context.Process(target=shared_slot_writer, args=(workdir, args.iterations, retries)) for _ in range(args.shared)
+        ]
+        elapsed = run("locked", workdir, processes)
+        slots = json.loads(Path(workdir, PLAYER_DATA_PATH).read_text(encoding="utf-8"))["slots"]
+        lost = sum(expected[slot] - (slots.get(slot) or {}).get("xp", 0) for slot in expected)
+        shared_lost = args.shared * args.iterations - ((slots.get(SHARED_SLOT) or {}).get("xp", 0) if args.shared else 0)
+        saves = (args.writers + args.shared) * args.iterations
+        print(f"locked: {saves} saves from {len(processes)} processes in {elapsed:.2f} s ({saves / elapsed:.0f}/s)")
+        print(f"  own-slot updates lost: {lost}; shared-slot updates lost: {shared_lost}; conflicts retried: {retries.value}")
+        failed = bool(lost or shared_lost)
+
+    if args.blind:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            ensure_profile_store()
+            processes = [context.Process(target=blind_writer, args=(workdir, slot, args.iterations)) for slot in expected]
+            elapsed = run("blind", workdir, processes)
+            slots = load_json(Path(workdir, PLAYER_DATA_PATH))["slots"]
+            lost = sum(expected[slot] - (slots.get(slot) or {}).get("xp", 0) for slot in expected)
+            print(f"blind:  {args.writers * args.iterations} saves in {elapsed:.2f} s; updates lost: {lost}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
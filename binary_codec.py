@@ -0,0 +1,630 @@
+import argparse
+import json
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from durable_io import atomic_open
+from game_utils import (
+    DAILY_CHALLENGE_BADGE,
+    LAND_INDEX,
+    LANDS,
+    DailyAggregates,
+    DailyChallenge,
+    DailyStats,
+    HintTokens,
+    Profile,
+    RetryStatus,
+    day_to_iso,
+    encode_record,
+    iso_to_day,
+    lands_mask,
+    sanitize_profile,
+)
+
+# File layout: a 6-byte header (magic, format version, kind, compression),
+# then a possibly compressed stream of records. Each record is a tag byte
+# and a varint payload length, so a reader decodes one slot or leaderboard
+# entry at a time and never holds the whole file. Tag 0 ends the stream.
+# Version 2 stores the daily challenge as an unlock mask; version 1 files
+# (land and question ids) are still read.
+MAGIC = b"MQB"
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+KIND_STORE = 1
+KIND_LEADERBOARD = 2
+COMPRESSIONS = {"none": 0, "zlib": 1, "lzma": 2}
+BINARY_SUFFIX = ".mqb"
+READ_CHUNK_BYTES = 1 << 16
+
+TAG_END = 0
+TAG_META = 1
+TAG_SLOT = 2
+TAG_ENTRY = 3
+
+# Strings are interned per file: the first use writes the text and later
+# uses a small index. The table starts out holding every land, so lands,
+# unlocked sets and per-land tallies never spell a name out.
+SEED_STRINGS: Tuple[str, ...] = tuple(LANDS) + (DAILY_CHALLENGE_BADGE,)
+
+HISTORY_KEYS = ("date", "land", "seconds", "bonus_xp", "badge_reward")
+LEADERBOARD_KEYS = ("slot", "player_name", "level", "xp", "badge_count", "streak_best", "total_dailies")
+
+_DOUBLE = struct.Struct("<d")
+
+
+class CodecError(ValueError):
+    pass
+
+
+def put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def put_number(out: bytearray, value) -> None:
+    # 0 is None, 1 is a float in the next 8 bytes, otherwise a zigzagged
+    # int + 2, so small counters of either sign take one byte.
+    if value is None:
+        out.append(0)
+    elif isinstance(value, float):
+        out.append(1)
+        out += _DOUBLE.pack(value)
+    else:
+        put_varint(out, (value * 2 if value >= 0 else -value * 2 - 1) + 2)
+
+
+def put_bytes(out: bytearray, data: bytes) -> None:
+    put_varint(out, len(data))
+    out += data
+
+
+def is_number(value) -> bool:
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def is_text(value) -> bool:
+    return value is None or isinstance(value, str)
+
+
+class Encoder:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {text: index for index, text in enumerate(SEED_STRINGS)}
+
+    def put_string(self, out: bytearray, text: str | None) -> None:
+        if text is None:
+            out.append(0)
+            return
+        index = self.strings.get(text)
+        if index is None:
+            self.strings[text] = len(self.strings)
+            out.append(1)
+            put_bytes(out, text.encode("utf-8"))
+        else:
+            put_varint(out, index + 2)
+
+    def put_json(self, out: bytearray, value) -> None:
+        put_bytes(out, json.dumps(value, separators=(",", ":"), default=encode_record).encode("utf-8"))
+
+    def history_entry(self, out: bytearray, entry: Dict) -> None:
+        date = entry.get("date")
+        day = iso_to_day(date)
+        typed = (
+            len(entry) == len(HISTORY_KEYS)
+            and all(key in entry for key in HISTORY_KEYS)
+            and (date is None or (day is not None and day_to_iso(day) == date))
+            and is_text(entry["land"])
+            and is_text(entry["badge_reward"])
+            and is_number(entry["seconds"])
+            and is_number(entry["bonus_xp"])
+        )
+        if not typed:
+            # Entries written by older or newer code keep their exact shape.
+            out.append(0)
+            self.put_json(out, entry)
+            return
+        out.append(1)
+        put_number(out, day)
+        self.put_string(out, entry["land"])
+        put_number(out, entry["seconds"])
+        put_number(out, entry["bonus_xp"])
+        self.put_string(out, entry["badge_reward"])
+
+    def profile(self, out: bytearray, profile: Profile) -> None:
+        put_string = self.put_string
+        put_string(out, profile.player_name)
+        put_string(out, profile.student_id)
+        put_number(out, profile.level)
+        put_number(out, profile.xp)
+        put_varint(out, len(profile.badges))
+        for badge in profile.badges:
+            put_string(out, badge)
+        put_varint(out, lands_mask(profile.unlocked_lands))
+        out += profile.hint_tokens.counts.tobytes()
+        put_number(out, profile.hint_reset_day)
+        put_string(out, profile.avatar)
+
+        challenge = profile.daily_challenge
+        put_number(out, challenge.generated_day)
+        put_number(out, challenge.unlock_mask)
+        put_number(out, challenge.bonus_xp)
+        put_string(out, challenge.badge_reward)
+        out.append(bool(challenge.completed) | bool(challenge.reward_claimed) << 1)
+        put_number(out, challenge.completion_epoch)
+        put_number(out, challenge.completion_time_seconds)
+
+        stats = profile.daily_stats
+        put_number(out, stats.streak_current)
+        put_number(out, stats.streak_best)
+        put_number(out, stats.last_completion_day)
+        put_number(out, stats.fastest_completion_seconds)
+        put_number(out, stats.total_completions)
+
+        put_varint(out, len(profile.daily_history))
+        for entry in profile.daily_history:
+            self.history_entry(out, entry)
+
+        aggregates = profile.daily_aggregates
+        put_number(out, aggregates.count)
+        for tally in (aggregates.per_land, aggregates.per_month):
+            put_varint(out, len(tally))
+            for key, count in tally.items():
+                put_string(out, key)
+                put_number(out, count)
+        put_number(out, aggregates.timed_count)
+        put_number(out, aggregates.total_seconds)
+        put_number(out, aggregates.archived_count)
+
+        put_number(out, profile.retry_status.hearts)
+        put_number(out, profile.retry_status.depleted_epoch)
+
+    def leaderboard_entry(self, out: bytearray, entry: Dict) -> None:
+        typed = all(key in entry for key in LEADERBOARD_KEYS) and (
+            is_text(entry["slot"])
+            and is_text(entry["player_name"])
+            and all(is_number(entry[key]) for key in LEADERBOARD_KEYS[2:])
+        )
+        if not typed:
+            out.append(0)
+            self.put_json(out, entry)
+            return
+        out.append(1)
+        self.put_string(out, entry["slot"])
+        self.put_string(out, entry["player_name"])
+        for key in LEADERBOARD_KEYS[2:]:
+            put_number(out, entry[key])
+        # Boards written by other tools (e.g. merged boards) add fields.
+        extras = {key: value for key, value in entry.items() if key not in LEADERBOARD_KEYS}
+        if extras:
+            self.put_json(out, extras)
+        else:
+            out.append(0)
+
+
+@lru_cache(maxsize=4096)
+def iso_day(day: int | None) -> str | None:
+    return day_to_iso(day)
+
+
+class Cursor:
+    # Reads one record's payload. Kept deliberately flat: decoding speed is
+    # dominated by these few methods.
+    __slots__ = ("data", "pos", "strings", "version")
+
+    def __init__(self, data: bytes, strings: List[str], version: int = FORMAT_VERSION) -> None:
+        self.data = data
+        self.pos = 0
+        self.strings = strings
+        self.version = version
+
+    def varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            self.pos = pos
+            return byte
+        value = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.pos = pos
+                return value
+            shift += 7
+
+    def number(self):
+        code = self.data[self.pos]
+        if code < 0x80:
+            self.pos += 1
+        else:
+            code = self.varint()
+        if code >= 2:
+            code -= 2
+            return code >> 1 if not code & 1 else -((code + 1) >> 1)
+        if code == 0:
+            return None
+        value = _DOUBLE.unpack_from(self.data, self.pos)[0]
+        self.pos += _DOUBLE.size
+        return value
+
+    def raw(self) -> bytes:
+        length = self.varint()
+        start = self.pos
+        self.pos = start + length
+        return self.data[start : self.pos]
+
+    def string(self) -> str | None:
+        code = self.data[self.pos]
+        if code < 0x80:
+            self.pos += 1
+        else:
+            code = self.varint()
+        if code >= 2:
+            return self.strings[code - 2]
+        if code == 0:
+            return None
+        text = self.raw().decode("utf-8")
+        self.strings.append(text)
+        return text
+
+    def json(self):
+        return json.loads(self.raw().decode("utf-8"))
+
+    def byte(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def history_entry(self) -> Dict:
+        if not self.byte():
+            return self.json()
+        return {
+            "date": iso_day(self.number()),
+            "land": self.string(),
+            "seconds": self.number(),
+            "bonus_xp": self.number(),
+            "badge_reward": self.string(),
+        }
+
+    def profile(self) -> Profile:
+        # Builds the typed records directly, skipping the dict round trip
+        # that sanitize_profile does for JSON saves.
+        profile = Profile()
+        string, number, varint = self.string, self.number, self.varint
+        profile.player_name = string()
+        profile.student_id = string()
+        profile.level = number()
+        profile.xp = number()
+        profile.badges = [string() for _ in range(varint())]
+        mask = varint()
+        profile.unlocked_lands = [land for index, land in enumerate(LANDS) if mask >> index & 1]
+        tokens = HintTokens()
+        tokens.counts = array("B", self.data[self.pos : self.pos + len(LANDS)])
+        self.pos += len(LANDS)
+        profile.hint_tokens = tokens
+        profile.hint_reset_day = number()
+        profile.avatar = string()
+
+        challenge = DailyChallenge()
+        challenge.generated_day = number()
+        if self.version == 1:
+            land = string()
+            for _ in range(varint()):
+                number()
+            challenge.unlock_mask = lands_mask([land]) if land in LAND_INDEX else None
+        else:
+            challenge.unlock_mask = number()
+        challenge.bonus_xp = number()
+        challenge.badge_reward = string()
+        flags = self.byte()
+        challenge.completed = bool(flags & 1)
+        challenge.reward_claimed = bool(flags & 2)
+        challenge.completion_epoch = number()
+        challenge.completion_time_seconds = number()
+        profile.daily_challenge = challenge
+
+        stats = DailyStats()
+        stats.streak_current = number()
+        stats.streak_best = number()
+        stats.last_completion_day = number()
+        stats.fastest_completion_seconds = number()
+        stats.total_completions = number()
+        profile.daily_stats = stats
+
+        profile.daily_history = [self.history_entry() for _ in range(varint())]
+
+        aggregates = DailyAggregates()
+        aggregates.count = number()
+        aggregates.per_land = {string(): number() for _ in range(varint())}
+        aggregates.per_month = {string(): number() for _ in range(varint())}
+        aggregates.timed_count = number()
+        aggregates.total_seconds = number()
+        aggregates.archived_count = number()
+        profile.daily_aggregates = aggregates
+
+        retry = RetryStatus()
+        retry.hearts = number()
+        retry.depleted_epoch = number()
+        profile.retry_status = retry
+        return profile
+
+    def leaderboard_entry(self) -> Dict:
+        if not self.byte():
+            return self.json()
+        entry = {"slot": self.string(), "player_name": self.string()}
+        for key in LEADERBOARD_KEYS[2:]:
+            entry[key] = self.number()
+        if self.data[self.pos]:
+            entry.update(self.json())
+        else:
+            self.pos += 1
+        return entry
+
+
+class BinaryWriter:
+    # Streaming encoder: records go through the compressor as they are
+    # produced, so converting a store costs one profile of memory.
+    def __init__(self, handle: BinaryIO, kind: int, compression: str = "zlib") -> None:
+        if compression not in COMPRESSIONS:
+            raise CodecError(f"Unknown compression {compression!r}; expected one of {', '.join(COMPRESSIONS)}")
+        self.handle = handle
+        self.encoder = Encoder()
+        if compression == "zlib":
+            self.compressor = zlib.compressobj(6)
+        elif compression == "lzma":
+            self.compressor = lzma.LZMACompressor(preset=6)
+        else:
+            self.compressor = None
+        handle.write(MAGIC + bytes([FORMAT_VERSION, kind, COMPRESSIONS[compression]]))
+
+    def emit(self, data: bytes) -> None:
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        if data:
+            self.handle.write(data)
+
+    def record(self, tag: int, payload: bytearray) -> None:
+        head = bytearray([tag])
+        put_varint(head, len(payload))
+        self.emit(bytes(head) + payload)
+
+    def meta(self, key: str, value) -> None:
+        payload = bytearray()
+        self.encoder.put_json(payload, [key, value])
+        self.record(TAG_META, payload)
+
+    def slot(self, slot: str, profile) -> None:
+        payload = bytearray()
+        put_bytes(payload, slot.encode("utf-8"))
+        if profile is None:
+            payload.append(0)
+        else:
+            payload.append(1)
+            self.encoder.profile(payload, sanitize_profile(profile))
+        self.record(TAG_SLOT, payload)
+
+    def entry(self, entry: Dict) -> None:
+        payload = bytearray()
+        self.encoder.leaderboard_entry(payload, entry)
+        self.record(TAG_ENTRY, payload)
+
+    def close(self) -> None:
+        self.emit(bytes([TAG_END]))
+        if self.compressor is not None:
+            self.handle.write(self.compressor.flush())
+
+
+class BinaryReader:
+    def __init__(self, handle: BinaryIO) -> None:
+        self.handle = handle
+        header = handle.read(len(MAGIC) + 3)
+        if len(header) < len(MAGIC) + 3 or header[: len(MAGIC)] != MAGIC:
+            raise CodecError("Not a MathQuest6 binary file")
+        self.version, self.kind, compression = header[len(MAGIC) :]
+        if self.version not in READABLE_VERSIONS:
+            raise CodecError(f"Unsupported binary format version {self.version}")
+        if compression == COMPRESSIONS["zlib"]:
+            self.decompressor = zlib.decompressobj()
+        elif compression == COMPRESSIONS["lzma"]:
+            self.decompressor = lzma.LZMADecompressor()
+        elif compression == COMPRESSIONS["none"]:
+            self.decompressor = None
+        else:
+            raise CodecError(f"Unknown compression code {compression}")
+        self.buffer = b""
+        self.pos = 0
+        self.strings: List[str] = list(SEED_STRINGS)
+
+    def _fill(self, needed: int) -> None:
+        while len(self.buffer) - self.pos < needed:
+            chunk = self.handle.read(READ_CHUNK_BYTES)
+            if not chunk:
+                raise CodecError("Truncated binary file")
+            if self.decompressor is not None:
+                chunk = self.decompressor.decompress(chunk)
+            self.buffer = self.buffer[self.pos :] + chunk
+            self.pos = 0
+
+    def _varint(self) -> int:
+        value = 0
+        shift = 0
+        while True:
+            self._fill(1)
+            byte = self.buffer[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def records(self) -> Iterator[Tuple[int, Cursor]]:
+        while True:
+            self._fill(1)
+            tag = self.buffer[self.pos]
+            self.pos += 1
+            if tag == TAG_END:
+                return
+            length = self._varint()
+            self._fill(length)
+            payload = self.buffer[self.pos : self.pos + length]
+            self.pos += length
+            yield tag, Cursor(payload, self.strings, self.version)
+
+
+def write_store(handle: BinaryIO, slots: Iterable[Tuple[str, Dict | None]], meta: Dict, compression: str = "zlib") -> None:
+    writer = BinaryWriter(handle, KIND_STORE, compression)
+    for key, value in meta.items():
+        writer.meta(key, value)
+    for slot, profile in slots:
+        writer.slot(slot, profile)
+    writer.close()
+
+
+def write_leaderboard(handle: BinaryIO, leaderboard: Dict, compression: str = "zlib") -> None:
+    writer = BinaryWriter(handle, KIND_LEADERBOARD, compression)
+    for key, value in leaderboard.items():
+        if key != "entries":
+            writer.meta(key, value)
+    for entry in leaderboard.get("entries", []):
+        writer.entry(entry)
+    writer.close()
+
+
+def iter_binary(path: Path) -> Iterator[Tuple[str, object]]:
+    # Yields ("meta", (key, value)), ("slot", (slot, Profile | None)) and
+    # ("entry", dict) items in file order, decoding one record at a time.
+    with Path(path).open("rb") as handle:
+        reader = BinaryReader(handle)
+        for tag, cursor in reader.records():
+            if tag == TAG_SLOT:
+                slot = cursor.raw().decode("utf-8")
+                yield "slot", (slot, cursor.profile() if cursor.byte() else None)
+            elif tag == TAG_ENTRY:
+                yield "entry", cursor.leaderboard_entry()
+            elif tag == TAG_META:
+                yield "meta", tuple(cursor.json())
+            else:
+                raise CodecError(f"Unknown record tag {tag}")
+
+
+def iter_binary_store_profiles(path: Path) -> Iterator[Tuple[str, Profile | None]]:
+    for kind, item in iter_binary(path):
+        if kind == "slot":
+            yield item
+
+
+def load_binary(path: Path) -> Dict:
+    # The whole file as the dict json.load would give for the JSON form,
+    # except that store profiles come back as typed Profile records.
+    data: Dict = {}
+    for kind, item in iter_binary(path):
+        if kind == "meta":
+            data[item[0]] = item[1]
+        elif kind == "slot":
+            data.setdefault("slots", {})[item[0]] = item[1]
+        else:
+            data.setdefault("entries", []).append(item)
+    return data
+
+
+def is_binary_file(path: Path) -> bool:
+    with Path(path).open("rb") as handle:
+        return handle.read(len(MAGIC)) == MAGIC
+
+
+def json_to_binary(source: Path, destination: Path, compression: str = "zlib") -> str:
+    # Store files are streamed slot by slot. Keys before the slots are held
+    # back until the kind of file is known from its container key.
+    from report_export import StreamingObjectReader
+
+    with Path(source).open("r", encoding="utf-8") as text, atomic_open(destination, binary=True) as handle:
+        reader = StreamingObjectReader(text)
+        writer = None
+        kind = None
+        pending: List[Tuple[str, object]] = []
+        for key in reader.members():
+            if key in ("slots", "entries") and writer is None:
+                kind = "store" if key == "slots" else "leaderboard"
+                writer = BinaryWriter(handle, KIND_STORE if key == "slots" else KIND_LEADERBOARD, compression)
+                for item in pending:
+                    writer.meta(*item)
+            if key == "slots" and kind == "store":
+                for slot in reader.members():
+                    writer.slot(slot, reader.value())
+            elif key == "entries" and kind == "leaderboard":
+                for entry in reader.value():
+                    writer.entry(entry)
+            elif writer is not None:
+                writer.meta(key, reader.value())
+            else:
+                pending.append((key, reader.value()))
+        if writer is None:
+            raise CodecError(f"{source} is neither a profile store nor a leaderboard")
+        writer.close()
+    return kind
+
+
+def _kind(path: Path) -> int:
+    with Path(path).open("rb") as handle:
+        return handle.read(len(MAGIC) + 2)[-1]
+
+
+def binary_to_json(source: Path, destination: Path) -> str:
+    # Streams slots out as they decode. Metadata records may follow the
+    # slots, so they are collected and written after them.
+    meta: List[Tuple[str, object]] = []
+    kind = "leaderboard" if _kind(source) == KIND_LEADERBOARD else "store"
+    container = "entries" if kind == "leaderboard" else "slots"
+    with atomic_open(destination) as handle:
+        handle.write("{\n  " + json.dumps(container) + ": " + ("[" if kind == "leaderboard" else "{"))
+        first = True
+        for item_kind, item in iter_binary(source):
+            if item_kind == "meta":
+                meta.append(item)
+                continue
+            handle.write("\n    " if first else ",\n    ")
+            first = False
+            if item_kind == "slot":
+                slot, profile = item
+                handle.write(json.dumps(slot) + ": " + json.dumps(profile, default=encode_record))
+            else:
+                handle.write(json.dumps(item))
+        handle.write(("\n  " if not first else "") + ("]" if kind == "leaderboard" else "}"))
+        for key, value in meta:
+            handle.write(",\n  " + json.dumps(key) + ": " + json.dumps(value))
+        handle.write("\n}\n")
+    return kind
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert MathQuest6 saves and leaderboards between JSON and binary.")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("destination", type=Path, nargs="?", help=f"default: source with {BINARY_SUFFIX} or .json swapped in")
+    parser.add_argument("--compression", choices=sorted(COMPRESSIONS), default="zlib", help="when writing binary")
+    args = parser.parse_args(argv)
+
+    to_json = is_binary_file(args.source)
+    destination = args.destination or args.source.with_suffix(".json" if to_json else BINARY_SUFFIX)
+    try:
+        kind = binary_to_json(args.source, destination) if to_json else json_to_binary(args.source, destination, args.compression)
+    except (CodecError, ValueError) as exc:
+        print(f"{args.source}: {exc}", file=sys.stderr)
+        return 1
+    before, after = args.source.stat().st_size, destination.stat().st_size
+    print(f"Wrote {kind} {destination} ({before / 1024:.1f} KiB -> {after / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
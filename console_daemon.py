@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+from typing import List, Sequence, Set
+
+from analytics import AnswerRecorder
+from game_utils import DEFAULT_SLOTS, SlotClaims, ensure_player_profile
+from leaderboard_history import LeaderboardHistory
+from leaderboards import Leaderboards
+from scheduler import ProfileTimers
+from terminal import Terminal, current_terminal, echo
+
+import main as console
+
+CONSOLE_DAEMON_PORT = 8767
+IDLE_TIMEOUT_SECONDS = 30 * 60
+MAX_LINE_BYTES = 1024
+
+
+class StreamTerminal(Terminal):
+    # One connected player. Output is buffered on the transport and flushed
+    # whenever the flow waits for input, which is also where backpressure
+    # from a slow client is applied.
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        super().__init__(SlotClaims())
+        self.reader = reader
+        self.writer = writer
+        self.console = None
+
+    def write(self, text: str) -> None:
+        # Raw sockets and telnet both expect CRLF line ends.
+        self.writer.write(text.replace("\n", "\r\n").encode("utf-8"))
+
+    def flush(self) -> None:
+        pass
+
+    async def readline(self, prompt: str = "") -> str:
+        self.write(prompt)
+        await self.writer.drain()
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), IDLE_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, ValueError):
+            raise EOFError("idle or oversized input")
+        if not line:
+            raise EOFError("client disconnected")
+        return line.decode("utf-8", "replace").rstrip("\r\n")
+
+    def clear(self) -> None:
+        self.write("\x1b[2J\x1b[H")
+
+    def rich_console(self, rich):
+        # A console per player that renders into this terminal.
+        if self.console is None:
+            from rich.console import Console
+
+            self.console = Console(file=self, force_terminal=True, width=100)
+        return self.console
+
+
+class ConsoleDaemon:
+    # Everything but the terminal is shared: one profile store, one content
+    # bank, one set of timers, analytics and leaderboards, as if every
+    # student sat at the same console in turn. The timers hold only the
+    # slots seats have claimed. Flows run as coroutines on one event loop,
+    # so the shared objects need no locks.
+    def __init__(self, seats: int = len(DEFAULT_SLOTS)) -> None:
+        self.store, _profile = ensure_player_profile()
+        # One save slot per seat in the lab, numbered like the defaults.
+        for number in range(1, seats + 1):
+            self.store["slots"].setdefault(f"Slot {number}", None)
+        console.save_session(self.store)
+        self.timers = ProfileTimers()
+        self.answer_log = AnswerRecorder()
+        self.leaderboard = Leaderboards.from_store(self.store, rollups=self.answer_log.rollups)
+        self.history = LeaderboardHistory()
+        self.sessions: Set[asyncio.Task] = set()
+
+    async def serve_player(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        terminal = StreamTerminal(reader, writer)
+        current_terminal.set(terminal)
+        session = asyncio.current_task()
+        self.sessions.add(session)
+        slot = None
+        try:
+            console.display_title()
+            slot, profile = await console.start_session(self.store)
+            self.timers.track(slot, profile)
+            await console.run_adventure(self.store, slot, profile, self.timers, self.answer_log, self.leaderboard, self.history)
+            echo("\nThanks for playing MathQuest6! Keep your adventurous spirit alive!\n")
+            await writer.drain()
+        except (EOFError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Shutdown: the session ends here rather than propagating, so
+            # the progress below is still saved for this player.
+            echo("\n\nThe MathQuest6 server is closing. Your progress is saved.\n")
+        finally:
+            self.sessions.discard(session)
+            if slot is not None:
+                self.timers.untrack(slot)
+            # Saved while the seat still holds its slot, so a conflicting
+            # write elsewhere cannot replace this player's progress.
+            try:
+                console.save_session(self.store)
+            finally:
+                terminal.claims.release_all()
+            writer.close()
+
+    async def close(self) -> None:
+        for session in list(self.sessions):
+            session.cancel()
+        await asyncio.gather(*list(self.sessions), return_exceptions=True)
+        self.answer_log.flush()
+        console.save_session(self.store)
+
+
+async def serve(host: str, port: int, socket_path: Path | None, seats: int) -> None:
+    daemon = ConsoleDaemon(seats)
+    servers: List[asyncio.AbstractServer] = []
+    limit = MAX_LINE_BYTES
+    if socket_path is not None:
+        servers.append(await asyncio.start_unix_server(daemon.serve_player, str(socket_path), limit=limit))
+        print(f"MathQuest6 console daemon on {socket_path} (connect with: socat - UNIX-CONNECT:{socket_path})", flush=True)
+    if port:
+        servers.append(await asyncio.start_server(daemon.serve_player, host, port, limit=limit))
+        print(f"MathQuest6 console daemon on {host}:{port} (connect with: nc {host} {port})", flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows; Ctrl+C still raises KeyboardInterrupt
+    try:
+        await stop.wait()
+    finally:
+        for server in servers:
+            server.close()
+        await daemon.close()
+        if socket_path is not None:
+            socket_path.unlink(missing_ok=True)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Host many MathQuest6 console sessions in one process over TCP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=CONSOLE_DAEMON_PORT, help="TCP port, 0 to disable")
+    parser.add_argument("--socket", type=Path, help="also listen on this Unix socket")
+    parser.add_argument("--seats", type=int, default=len(DEFAULT_SLOTS), help="make sure this many save slots exist")
+    args = parser.parse_args(argv)
+    if not args.port and args.socket is None:
+        parser.error("nothing to listen on; give --port or --socket")
+    try:
+        asyncio.run(serve(args.host, args.port, args.socket, args.seats))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import signal
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Sequence, Tuple
+
+from game_utils import LESSON_DATA_PATH, QUIZ_DATA_PATH, load_json
+
+CONTENT_SHM_ENV = "MATHQUEST_CONTENT_SHM"
+DEFAULT_CONTENT_SHM = "mathquest6-content"
+
+# Segment layout, all integers little-endian:
+#   header   magic, version, land count, question count, content digest
+#   lands    per land: name span, lesson span, first question, question count
+#   index    per question: offset and length of its JSON text
+#   blobs    compact UTF-8 JSON of every name, lesson and question
+# The magic is written last, so a session that attaches while the host is
+# still filling the segment sees no magic and falls back to the JSON files.
+MAGIC = b"MQC\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI16s")
+LAND_ROW = struct.Struct("<IIIIII")
+SPAN = struct.Struct("<II")
+
+
+def compact(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compile_content(lessons: Dict, quiz_bank: Dict) -> bytes:
+    lands = list(dict.fromkeys(list(quiz_bank) + list(lessons)))
+    question_count = sum(len(quiz_bank.get(land) or []) for land in lands)
+    blob_start = HEADER.size + LAND_ROW.size * len(lands) + SPAN.size * question_count
+    rows = bytearray()
+    index = bytearray()
+    blobs = bytearray()
+
+    def place(data: bytes) -> Tuple[int, int]:
+        offset = blob_start + len(blobs)
+        blobs.extend(data)
+        return offset, len(data)
+
+    first = 0
+    for land in lands:
+        name = place(land.encode("utf-8"))
+        lesson = place(compact(lessons[land])) if land in lessons else (0, 0)
+        questions = quiz_bank.get(land) or []
+        for question in questions:
+            index += SPAN.pack(*place(compact(question)))
+        rows += LAND_ROW.pack(*name, *lesson, first, len(questions))
+        first += len(questions)
+    body = bytes(rows + index + blobs)
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    return HEADER.pack(b"\0" * len(MAGIC), FORMAT_VERSION, len(lands), question_count, digest) + body
+
+
+def open_untracked(name: str) -> shared_memory.SharedMemory:
+    # Before Python 3.13 every process that opens a segment registers it with
+    # its resource tracker, which unlinks it when that process exits. Only
+    # the host may remove the segment, so sessions open it unregistered.
+    # (Unregistering afterwards is not enough: processes started from one
+    # parent share its tracker, and the host's own registration would go.)
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda _name, _rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class QuestionList(Sequence):
+    # One land's questions. Each access decodes just that question's JSON
+    # straight out of the shared segment; nothing is cached per session.
+    def __init__(self, content: "SharedContent", first: int, count: int) -> None:
+        self.content = content
+        self.first = first
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("question index out of range")
+        offset, length = SPAN.unpack_from(self.content.view, self.content.index_start + SPAN.size * (self.first + index))
+        return self.content.decode(offset, length)
+
+
+class SharedQuizBank(Mapping):
+    def __init__(self, content: "SharedContent") -> None:
+        self.content = content
+
+    def __getitem__(self, land: str) -> QuestionList:
+        _lesson, first, count = self.content.lands[land]
+        return QuestionList(self.content, first, count)
+
+    def __iter__(self) -> Iterator[str]:
+        return (land for land, (_lesson, _first, count) in self.content.lands.items() if count)
+
+    def __len__(self) -> int:
+        return sum(1 for _land in self)
+
+
+class SharedLessons(Mapping):
+    def __init__(self, content: "SharedContent") -> None:
+        self.content = content
+
+    def __getitem__(self, land: str) -> Dict:
+        lesson, _first, _count = self.content.lands[land]
+        if not lesson[1]:
+            raise KeyError(land)
+        return self.content.decode(*lesson)
+
+    def __iter__(self) -> Iterator[str]:
+        return (land for land, (lesson, _first, _count) in self.content.lands.items() if lesson[1])
+
+    def __len__(self) -> int:
+        return sum(1 for _land in self)
+
+
+class SharedContent:
+    # A session's read-only view of the host's segment. Attaching maps the
+    # pages the host already filled; only the small land table is decoded.
+    def __init__(self, shm: shared_memory.SharedMemory) -> None:
+        self.shm = shm
+        self.view: memoryview | None = shm.buf.toreadonly()
+        magic, version, land_count, question_count, self.digest = HEADER.unpack_from(self.view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError("content segment is not ready or has an unknown format")
+        self.index_start = HEADER.size + LAND_ROW.size * land_count
+        self.question_count = question_count
+        self.lands: Dict[str, Tuple[Tuple[int, int], int, int]] = {}
+        for position in range(land_count):
+            row = LAND_ROW.unpack_from(self.view, HEADER.size + LAND_ROW.size * position)
+            name = bytes(self.view[row[0] : row[0] + row[1]]).decode("utf-8")
+            self.lands[name] = ((row[2], row[3]), row[4], row[5])
+        self.lessons = SharedLessons(self)
+        self.quiz_bank = SharedQuizBank(self)
+
+    @classmethod
+    def attach(cls, name: str | None = None) -> "SharedContent | None":
+        name = name or os.environ.get(CONTENT_SHM_ENV) or DEFAULT_CONTENT_SHM
+        try:
+            shm = open_untracked(name)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        try:
+            content = cls(shm)
+        except ValueError:
+            return None
+        # The read-only view must be released before the mapping is closed,
+        # which SharedMemory.__del__ would otherwise attempt first at exit.
+        atexit.register(content.close)
+        return content
+
+    def decode(self, offset: int, length: int):
+        return json.loads(bytes(self.view[offset : offset + length]))
+
+    def close(self) -> None:
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+            self.shm.close()
+
+
+class ContentHost:
+    def __init__(self, name: str = DEFAULT_CONTENT_SHM) -> None:
+        self.name = name
+        self.shm: shared_memory.SharedMemory | None = None
+
+    def publish(self, lessons: Dict, quiz_bank: Dict) -> int:
+        data = compile_content(lessons, quiz_bank)
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=len(data))
+        except FileExistsError:
+            # Left behind by a host that was killed. Sessions still attached
+            # to it keep their mapping after the name is removed.
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=len(data))
+        shm.buf[len(MAGIC) : len(data)] = data[len(MAGIC) :]
+        shm.buf[: len(MAGIC)] = MAGIC
+        self.shm = shm
+        return len(data)
+
+    def close(self) -> None:
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the lesson and quiz bank from shared memory to console sessions on this host.")
+    parser.add_argument("--name", default=os.environ.get(CONTENT_SHM_ENV) or DEFAULT_CONTENT_SHM, help=f"segment name (default: ${CONTENT_SHM_ENV} or {DEFAULT_CONTENT_SHM})")
+    parser.add_argument("--lessons", type=Path, default=LESSON_DATA_PATH)
+    parser.add_argument("--quizzes", type=Path, default=QUIZ_DATA_PATH)
+    args = parser.parse_args(argv)
+
+    host = ContentHost(args.name)
+    size = host.publish(load_json(args.lessons), load_json(args.quizzes))
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+    print(f"Serving {size / 1024:.1f} KiB of content as {args.name!r}; restart to pick up edited JSON. Ctrl+C to stop.")
+    try:
+        if hasattr(signal, "pause"):
+            signal.pause()
+        else:
+            input()  # Windows has no signal.pause
+    except KeyboardInterrupt:
+        pass
+    finally:
+        host.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Set
+
+DURABILITY_ENV = "MATHQUEST_DURABILITY"
+DURABILITY_MODES = ("strict", "grouped", "relaxed")
+DEFAULT_DURABILITY = "grouped"
+GROUP_COMMIT_MS = 50
+
+# Every mode writes to a temporary file and renames it over the target, so
+# a crash or kill mid-write leaves the previous version intact. They differ
+# in when the bytes are forced to disk, which is what survives power loss:
+#   strict   fsync the file and its directory before the write returns
+#   grouped  fsync the file before the rename, so the name never points at
+#            unwritten data; a background thread fsyncs the directories
+#            renamed into in the last GROUP_COMMIT_MS in one batch. Power
+#            loss inside that window can lose the rename, which leaves the
+#            previous version, never an empty or truncated file.
+#   relaxed  never fsync; the OS flushes when it likes, and power loss can
+#            leave a renamed file empty or truncated
+
+
+class GroupCommitter:
+    def __init__(self, interval_ms: int = GROUP_COMMIT_MS) -> None:
+        self.interval = interval_ms / 1000
+        self.condition = threading.Condition()
+        # Files written in place (appends) still need their data synced;
+        # renamed files only need their directory.
+        self.pending: Set[Path] = set()
+        self.directories: Set[Path] = set()
+        self.thread: threading.Thread | None = None
+        self.batches = 0
+
+    def add(self, path: Path, synced: bool = False) -> None:
+        with self.condition:
+            if not synced:
+                self.pending.add(path)
+            self.directories.add(path.parent)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="group-commit", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.pending and not self.directories:
+                    self.condition.wait()
+            # Let the batch fill for one interval; repeated writes to the
+            # same file in that window cost a single fsync.
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self) -> None:
+        with self.condition:
+            paths, self.pending = self.pending, set()
+            directories, self.directories = self.directories, set()
+        if not paths and not directories:
+            return
+        for path in paths:
+            fsync_path(path)
+        for directory in directories:
+            fsync_directory(directory)
+        self.batches += 1
+
+
+def fsync_path(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return  # replaced or removed since; the newer write has its own entry
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(directory: Path) -> None:
+    # Makes the rename itself durable. Windows cannot open directories and
+    # NTFS journals renames, so there is nothing to do there.
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except FileNotFoundError:
+        return  # removed since, e.g. a temporary working directory
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_durability() -> str:
+    mode = os.environ.get(DURABILITY_ENV, DEFAULT_DURABILITY).strip().lower()
+    return mode if mode in DURABILITY_MODES else DEFAULT_DURABILITY
+
+
+durability = read_durability()
+group_committer = GroupCommitter()
+atexit.register(group_committer.flush)
+
+
+def set_durability(mode: str, group_commit_ms: int | None = None) -> None:
+    global durability
+    if mode not in DURABILITY_MODES:
+        raise ValueError(f"Unknown durability mode {mode!r}; expected one of {', '.join(DURABILITY_MODES)}")
+    group_committer.flush()
+    durability = mode
+    if group_commit_ms is not None:
+        group_committer.interval = group_commit_ms / 1000
+
+
+def commit_path(path: Path, synced: bool = False) -> None:
+    # Called once a file's new contents are in place. ``synced`` means the
+    # data itself was already fsynced, leaving only the directory entry.
+    path = Path(path)
+    if durability == "strict":
+        if not synced:
+            fsync_path(path)
+        fsync_directory(path.parent)
+    elif durability == "grouped":
+        group_committer.add(path, synced)
+
+
+@contextmanager
+def atomic_open(path: Path, binary: bool = False, newline: str | None = None) -> Iterator[IO]:
+    # Yields a handle on a sibling temp file; on a clean exit it replaces
+    # ``path`` in one rename, on an exception the temp file is discarded.
+    # Temp names carry the pid and thread so concurrent writers never share.
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    if binary:
+        handle = temp_path.open("wb")
+    else:
+        handle = temp_path.open("w", encoding="utf-8", newline=newline)
+    try:
+        yield handle
+        handle.flush()
+        if durability != "relaxed":
+            os.fsync(handle.fileno())
+        handle.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        handle.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+    commit_path(path, synced=durability != "relaxed")
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    with atomic_open(path) as handle:
+        handle.write(text)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    with atomic_open(path, binary=True) as handle:
+        handle.write(data)
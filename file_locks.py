@@ -0,0 +1,87 @@
+import os
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_POLL_SECONDS = 0.01
+LOCK_TIMEOUT_SECONDS = 30.0
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+def _try_acquire(fd: int, shared: bool) -> bool:
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+    # msvcrt has no shared mode; readers take the exclusive byte lock too.
+    try:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _release(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    # Advisory lock on a sidecar file. Cooperating processes (and threads,
+    # since each FileLock opens its own descriptor) exclude each other;
+    # nothing stops a program that ignores the lock.
+    def __init__(self, path: Path, shared: bool = False, timeout: float | None = LOCK_TIMEOUT_SECONDS) -> None:
+        self.path = Path(path)
+        self.shared = shared
+        self.timeout = timeout
+        self.fd: int | None = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self.fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not _try_acquire(fd, self.shared):
+            if not blocking:
+                os.close(fd)
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(fd)
+                raise LockTimeout(f"Timed out after {self.timeout:.0f}s waiting for {self.path}")
+            time.sleep(LOCK_POLL_SECONDS)
+        self.fd = fd
+        return True
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+        try:
+            _release(self.fd)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+    @property
+    def held(self) -> bool:
+        return self.fd is not None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
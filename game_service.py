@@ -0,0 +1,571 @@
+import argparse
+import asyncio
+import json
+import secrets
+import signal
+import sys
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+from analytics import AnswerRecorder, write_answer_chunk
+from file_locks import FileLock
+from game_utils import (
+    LANDS,
+    LESSON_DATA_PATH,
+    QUIZ_DATA_PATH,
+    RETRY_MAX_HEARTS,
+    XP_CORRECT,
+    XP_INCORRECT,
+    StoreConflictError,
+    apply_xp_change,
+    award_badge,
+    claim_daily_reward,
+    collect_history_overflow,
+    consume_retry_heart,
+    default_profile,
+    encode_record,
+    ensure_profile_store,
+    get_daily_challenge_questions,
+    get_retry_hearts,
+    load_json,
+    mark_daily_completion,
+    refresh_daily_challenge,
+    reload_slot,
+    reset_hint_tokens,
+    resolve_store_conflict,
+    retry_cooldown_remaining,
+    save_profiles,
+    slot_lock_path,
+    snapshot_store,
+    spend_hint,
+    summarize_results,
+    unlock_next_land,
+)
+from leaderboards import DEFAULT_BOARD, Leaderboards
+
+GAME_SERVICE_PORT = 8766
+HP_PER_BATTLE = 3
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+MAX_SLOT_NAME = 40
+KEEPALIVE_SECONDS = 30
+SESSION_IDLE_SECONDS = 30 * 60
+LEADERBOARD_PAGE_LIMIT = 50
+STORE_WRITE_WORKERS = 1
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class Battle:
+    __slots__ = ("land", "questions", "position", "hp", "correct", "daily", "started", "hint_used")
+
+    def __init__(self, land: str, questions: List[Dict], daily: bool) -> None:
+        self.land = land
+        self.questions = questions
+        self.position = 0
+        self.hp = HP_PER_BATTLE
+        self.correct = 0
+        self.daily = daily
+        self.started = time.monotonic()
+        self.hint_used = False
+
+    def question(self) -> Dict:
+        question = self.questions[self.position]
+        # Clients never see the answer or explanation before they answer.
+        return {
+            "number": self.position + 1,
+            "of": len(self.questions),
+            "creature": question.get("creature"),
+            "prompt": question["prompt"],
+            "options": question["options"],
+            "hp": self.hp,
+        }
+
+
+class Session:
+    __slots__ = ("token", "slot", "lock", "battle", "seen", "asked_at")
+
+    def __init__(self, token: str, slot: str, lock: FileLock) -> None:
+        self.token = token
+        self.slot = slot
+        self.lock = lock
+        self.battle: Battle | None = None
+        self.seen = time.monotonic()
+        self.asked_at = self.seen
+
+
+class GameService:
+    # All game state lives on the event loop thread, so handlers mutate
+    # profiles without locks. Disk work goes to a small fixed executor:
+    # saves are coalesced, at most one runs at a time, and every request
+    # that changed a profile answers only once a save covering it is done.
+    def __init__(self, content: Tuple[Dict, Dict] | None = None) -> None:
+        self.store = ensure_profile_store()
+        self.lessons, self.quiz_bank = content or load_content()
+        self.answers = AnswerRecorder(autoflush=False)
+        self.leaderboards = Leaderboards.from_store(self.store, rollups=self.answers.rollups)
+        self.sessions: Dict[str, Session] = {}
+        self.open_slots: Dict[str, Session] = {}
+        self.executor = ThreadPoolExecutor(max_workers=STORE_WRITE_WORKERS, thread_name_prefix="store-writer")
+        self.changes = 0
+        self.saved = 0
+        self.save_error: Exception | None = None
+        self.save_wanted: asyncio.Event | None = None
+        self.save_done: asyncio.Condition | None = None
+        self.writer_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.save_wanted = asyncio.Event()
+        self.save_done = asyncio.Condition()
+        self.writer_task = asyncio.get_running_loop().create_task(self.write_loop())
+
+    async def write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.save_wanted.wait()
+            self.save_wanted.clear()
+            covered = self.changes
+            # Same hand-off as the Tk app: trim history and snapshot on the
+            # loop thread, serialize and merge on the writer thread.
+            overflow = collect_history_overflow(self.store)
+            snapshot = snapshot_store(self.store)
+            pending = self.answers.detach() if self.answers.full else None
+            try:
+                if pending is not None:
+                    await loop.run_in_executor(self.executor, write_answer_chunk, *pending)
+                refreshed = await loop.run_in_executor(self.executor, save_snapshot, snapshot, overflow, set(self.open_slots))
+                self.adopt_refreshed(refreshed)
+                self.save_error = None
+            except Exception as exc:  # surfaced to every waiting request
+                self.save_error = exc
+            self.saved = covered
+            async with self.save_done:
+                self.save_done.notify_all()
+
+    def adopt_refreshed(self, refreshed: Dict) -> None:
+        # Slots saved by another program meanwhile. Slots open here are
+        # session-locked to this service, so they never appear.
+        for slot, profile in refreshed.items():
+            if slot in self.open_slots:
+                continue
+            if profile is None:
+                self.store["slots"].pop(slot, None)
+                self.leaderboards.remove(slot)
+            else:
+                self.store["slots"][slot] = profile
+                self.leaderboards.update(slot, profile)
+
+    async def commit(self, slot: str) -> None:
+        self.leaderboards.update(slot, self.store["slots"].get(slot))
+        self.changes += 1
+        wanted = self.changes
+        self.save_wanted.set()
+        async with self.save_done:
+            await self.save_done.wait_for(lambda: self.saved >= wanted)
+        if self.save_error is not None:
+            raise ServiceError(503, f"progress could not be saved: {self.save_error}")
+
+    async def close(self) -> None:
+        if self.changes > self.saved:
+            self.save_wanted.set()
+            async with self.save_done:
+                await self.save_done.wait_for(lambda: self.saved >= self.changes)
+        self.writer_task.cancel()
+        pending = self.answers.detach()
+        if pending is not None:
+            write_answer_chunk(*pending)
+        for session in list(self.sessions.values()):
+            self.release(session)
+        self.executor.shutdown()
+
+    def session_for(self, token: str | None) -> Session:
+        session = self.sessions.get(token or "")
+        if session is None:
+            raise ServiceError(404, "unknown or expired session; open a new one with POST /session")
+        session.seen = time.monotonic()
+        return session
+
+    def release(self, session: Session) -> None:
+        self.sessions.pop(session.token, None)
+        if self.open_slots.get(session.slot) is session:
+            del self.open_slots[session.slot]
+        session.lock.release()
+
+    def expire_idle(self) -> None:
+        cutoff = time.monotonic() - SESSION_IDLE_SECONDS
+        for session in [session for session in self.sessions.values() if session.seen < cutoff]:
+            self.release(session)
+
+    async def open_session(self, body: Dict) -> Dict:
+        slot = str(body.get("slot") or "").strip()
+        if not slot or len(slot) > MAX_SLOT_NAME:
+            raise ServiceError(400, f"slot must be 1-{MAX_SLOT_NAME} characters")
+        if slot in self.open_slots:
+            raise ServiceError(409, f"{slot} is already open in another session")
+        # The same session lock the console and GUI take, held by this
+        # process for as long as the web session lasts.
+        lock = FileLock(slot_lock_path(slot))
+        if not lock.acquire(blocking=False):
+            raise ServiceError(409, f"{slot} is open in another MathQuest6 program")
+        try:
+            # The copy loaded at startup may predate another program's
+            # session in this slot.
+            profile = reload_slot(self.store, slot)
+        except (OSError, ValueError) as exc:
+            lock.release()
+            raise ServiceError(503, f"{slot} could not be read: {exc}")
+        if profile is None:
+            profile = self.store["slots"][slot] = default_profile()
+        if body.get("player_name"):
+            profile["player_name"] = str(body["player_name"]).strip()[:MAX_SLOT_NAME]
+        elif not profile.get("player_name"):
+            profile["player_name"] = "Hero"
+        reset_hint_tokens(profile)
+        session = Session(secrets.token_urlsafe(16), slot, lock)
+        self.sessions[session.token] = session
+        self.open_slots[slot] = session
+        try:
+            await self.commit(slot)
+        except ServiceError:
+            self.release(session)
+            raise
+        return {"session": session.token, "slot": slot, "profile": profile}
+
+    async def close_session(self, session: Session) -> Dict:
+        self.release(session)
+        return {"closed": session.slot}
+
+    def profile_of(self, session: Session):
+        return self.store["slots"][session.slot]
+
+    def map_view(self, session: Session) -> Dict:
+        profile = self.profile_of(session)
+        challenge = profile["daily_challenge"]
+        hearts = get_retry_hearts(profile)
+        return {
+            "lands": [{"land": land, "unlocked": land in profile["unlocked_lands"]} for land in LANDS],
+            "daily_challenge": {
+                "land": challenge.get("land"),
+                "completed": challenge.get("completed"),
+                "reward_claimed": challenge.get("reward_claimed"),
+                "bonus_xp": challenge.get("bonus_xp"),
+            },
+            "retry_hearts": hearts,
+            "retry_max_hearts": RETRY_MAX_HEARTS,
+            "cooldown_seconds": retry_cooldown_remaining(profile) if hearts <= 0 else 0,
+            "streak": profile["daily_stats"].get("streak_current", 0),
+        }
+
+    def lesson(self, session: Session, land: str) -> Dict:
+        if land not in self.profile_of(session)["unlocked_lands"]:
+            raise ServiceError(409, f"{land} is locked")
+        lesson = self.lessons.get(land)
+        if lesson is None:
+            raise ServiceError(404, f"no lesson for {land}")
+        return {"land": land, **lesson}
+
+    async def start_battle(self, session: Session, body: Dict) -> Dict:
+        profile = self.profile_of(session)
+        if body.get("daily"):
+            hearts = get_retry_hearts(profile)
+            if hearts <= 0:
+                raise ServiceError(409, f"all retry hearts spent; rest {retry_cooldown_remaining(profile)} s")
+            refresh_daily_challenge(profile, self.quiz_bank)
+            land, questions = get_daily_challenge_questions(profile, self.quiz_bank)
+            if not land or not questions:
+                raise ServiceError(409, "the daily challenge has no questions right now")
+            session.battle = Battle(land, list(questions), daily=True)
+            await self.commit(session.slot)
+        else:
+            land = body.get("land")
+            if land not in profile["unlocked_lands"]:
+                raise ServiceError(409, f"{land} is locked" if land in LANDS else f"unknown land {land!r}")
+            questions = list(self.quiz_bank.get(land) or [])
+            if not questions:
+                raise ServiceError(409, f"{land} has no questions")
+            session.battle = Battle(land, questions, daily=False)
+        session.asked_at = time.monotonic()
+        return {"land": land, "daily": session.battle.daily, "question": session.battle.question()}
+
+    def battle_of(self, session: Session) -> Battle:
+        if session.battle is None:
+            raise ServiceError(409, "no battle in progress; POST /battle/start first")
+        return session.battle
+
+    async def use_hint(self, session: Session) -> Dict:
+        battle = self.battle_of(session)
+        profile = self.profile_of(session)
+        if not spend_hint(profile, battle.land):
+            raise ServiceError(409, f"no hint tokens left for {battle.land} today")
+        battle.hint_used = True
+        await self.commit(session.slot)
+        return {"hint": battle.questions[battle.position].get("hint"), "tokens": profile["hint_tokens"].get(battle.land, 0)}
+
+    async def answer(self, session: Session, body: Dict) -> Dict:
+        battle = self.battle_of(session)
+        profile = self.profile_of(session)
+        question = battle.questions[battle.position]
+        choice = str(body.get("choice") or "").strip().lower()
+        if choice not in question["options"]:
+            raise ServiceError(400, f"choice must be one of {', '.join(question['options'])}")
+        correct = choice == question["answer"]
+        latency_ms = int((time.monotonic() - session.asked_at) * 1000)
+        self.answers.record(session.slot, battle.land, question, choice, correct, battle.hint_used, latency_ms)
+        if correct:
+            battle.correct += 1
+        else:
+            battle.hp -= 1
+        xp, leveled = apply_xp_change(profile, XP_CORRECT if correct else XP_INCORRECT)
+        result = {
+            "correct": correct,
+            "answer": question["answer"],
+            "explanation": question.get("explanation"),
+            "xp": xp,
+            "level": profile["level"],
+            "leveled": leveled,
+            "hp": battle.hp,
+        }
+        battle.position += 1
+        battle.hint_used = False
+        if battle.hp > 0 and battle.position < len(battle.questions):
+            result["question"] = battle.question()
+            session.asked_at = time.monotonic()
+        else:
+            result["finished"] = self.finish_battle(session, battle)
+        await self.commit(session.slot)
+        return result
+
+    def finish_battle(self, session: Session, battle: Battle) -> Dict:
+        # The tail of the console's battle_quiz and attempt_daily_challenge.
+        profile = self.profile_of(session)
+        session.battle = None
+        accuracy, mood = summarize_results(battle.correct, len(battle.questions))
+        success = battle.hp > 0
+        summary = {
+            "correct": battle.correct,
+            "total": len(battle.questions),
+            "accuracy": accuracy,
+            "mood": mood,
+            "success": success,
+            "badge": award_badge(profile, battle.land, accuracy),
+            "unlocked": unlock_next_land(profile, LANDS, battle.land) if accuracy >= 0.6 and success else None,
+        }
+        if battle.daily:
+            if success:
+                summary["daily_completed"] = mark_daily_completion(profile, int(time.monotonic() - battle.started))
+            else:
+                summary["retry_hearts"] = consume_retry_heart(profile)
+        return summary
+
+    async def claim(self, session: Session) -> Dict:
+        reward = claim_daily_reward(self.profile_of(session))
+        if reward is None:
+            raise ServiceError(409, "no reward to claim; complete the daily challenge first")
+        await self.commit(session.slot)
+        bonus, badge = reward
+        return {"bonus_xp": bonus, "badge": badge}
+
+    def leaderboard(self, session: Session | None, query: Dict) -> Dict:
+        name = query.get("board", DEFAULT_BOARD)
+        try:
+            board = self.leaderboards.board(name)
+            offset = max(0, int(query.get("offset", 0)))
+            limit = max(1, min(LEADERBOARD_PAGE_LIMIT, int(query.get("limit", 10))))
+        except KeyError as exc:
+            raise ServiceError(404, exc.args[0])
+        except ValueError:
+            raise ServiceError(400, "offset and limit must be integers")
+        spec = self.leaderboards.specs[name]
+        return {
+            "board": name,
+            "title": spec.title,
+            "size": len(board),
+            "rank": board.rank_of(session.slot) if session is not None else None,
+            "entries": [
+                {"rank": rank, "player_name": entry["player_name"], "score": spec.score(entry), "slot": entry["slot"]}
+                for rank, entry in board.page(offset, limit)
+            ],
+        }
+
+    async def dispatch(self, method: str, path: str, query: Dict, token: str | None, body: Dict):
+        route = (method, path)
+        if route == ("GET", "/health"):
+            return {"sessions": len(self.sessions), "slots": len(self.store["slots"]), "pending_saves": self.changes - self.saved}
+        if route == ("POST", "/session"):
+            return await self.open_session(body)
+        if route == ("GET", "/leaderboard"):
+            return self.leaderboard(self.sessions.get(token or ""), query)
+        session = self.session_for(token)
+        if route == ("DELETE", "/session"):
+            return await self.close_session(session)
+        if route == ("GET", "/profile"):
+            return {"slot": session.slot, "profile": self.profile_of(session)}
+        if route == ("GET", "/map"):
+            return self.map_view(session)
+        if route == ("GET", "/lesson"):
+            return self.lesson(session, query.get("land", ""))
+        if route == ("POST", "/battle/start"):
+            return await self.start_battle(session, body)
+        if route == ("POST", "/battle/hint"):
+            return await self.use_hint(session)
+        if route == ("POST", "/battle/answer"):
+            return await self.answer(session, body)
+        if route == ("POST", "/daily/claim"):
+            return await self.claim(session)
+        raise ServiceError(404, f"no route for {method} {path}")
+
+
+def save_snapshot(snapshot: Dict, overflow: Dict, keep: set) -> Dict:
+    # Writer-thread job. Slots open here keep the local copy if another
+    # program changed them too; any other slot takes the disk version, which
+    # adopt_refreshed then applies to the live store.
+    try:
+        return save_profiles(snapshot, overflow)
+    except StoreConflictError as conflict:
+        refreshed = resolve_store_conflict(snapshot, conflict.slots, keep)
+    # Nothing was archived; slots just replaced from disk drop theirs.
+    overflow = {slot: entries for slot, entries in overflow.items() if slot not in refreshed}
+    refreshed.update(save_profiles(snapshot, overflow))
+    return refreshed
+
+
+def load_content() -> Tuple[Dict, Dict]:
+    # Attach to a content_host.py segment when one runs on this machine.
+    from content_host import SharedContent
+
+    shared = SharedContent.attach()
+    if shared is not None:
+        return shared.lessons, shared.quiz_bank
+    return load_json(LESSON_DATA_PATH), load_json(QUIZ_DATA_PATH)
+
+
+async def read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes] | None:
+    line = await asyncio.wait_for(reader.readline(), KEEPALIVE_SECONDS)
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ServiceError(400, "malformed request line")
+    method, target, version = parts
+    headers = {"http-version": version}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ServiceError(400, "too many headers")
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ServiceError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+def encode_response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, default=encode_record, separators=(",", ":")).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Error')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def make_handler(service: GameService):
+    # One coroutine per connection, not a thread: idle keep-alive clients
+    # cost a few KiB each.
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except (ServiceError, ValueError) as exc:
+                    status = exc.status if isinstance(exc, ServiceError) else 400
+                    writer.write(encode_response(status, {"error": str(exc)}, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, raw = request
+                url = urllib.parse.urlsplit(target)
+                query = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+                keep_alive = headers.get("connection", "").lower() != "close" and headers["http-version"] == "HTTP/1.1"
+                try:
+                    body = json.loads(raw) if raw else {}
+                    if not isinstance(body, dict):
+                        raise ServiceError(400, "body must be a JSON object")
+                    payload = await service.dispatch(method, url.path, query, headers.get("x-session"), body)
+                    status = 200
+                except ServiceError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except ValueError:
+                    status, payload = 400, {"error": "body must be JSON"}
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host: str, port: int, ready=None) -> None:
+    service = GameService()
+    service.start()
+    server = await asyncio.start_server(make_handler(service), host, port, backlog=1024)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows; Ctrl+C still raises KeyboardInterrupt
+    bound = server.sockets[0].getsockname()
+    print(f"MathQuest6 game service on http://{bound[0]}:{bound[1]}/ ({len(service.store['slots'])} slots)", flush=True)
+    if ready is not None:
+        ready(bound[1])
+
+    async def sweep() -> None:
+        while True:
+            await asyncio.sleep(60)
+            service.expire_idle()
+
+    sweeper = loop.create_task(sweep())
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        sweeper.cancel()
+        await service.close()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve MathQuest6 to browser and tablet clients as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=GAME_SERVICE_PORT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
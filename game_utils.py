@@ -1,14 +1,31 @@
+import gzip
+import hashlib
+import heapq
 import json
 import random
+import re
+import time
+from array import array
 from copy import deepcopy
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from durable_io import atomic_open, commit_path
+from file_locks import FileLock
+
 PLAYER_DATA_PATH = Path("player_data.json")
 LESSON_DATA_PATH = Path("lesson_data.json")
 QUIZ_DATA_PATH = Path("quiz_data.json")
 LEADERBOARD_DATA_PATH = Path("leaderboard_data.json")
+HISTORY_ARCHIVE_DIR = Path("history_archive")
+SLOT_INDEX_PATH = Path("slot_index.json")
+STORE_LOCK_PATH = Path("player_data.json.lock")
+SLOT_LOCK_DIR = Path("slot_locks")
+
+# Read here rather than in profile_sync so the console can tell whether
+# sync is on without importing it.
+SYNC_URL_ENV = "MATHQUEST_SYNC_URL"
 
 XP_CORRECT = 10
 XP_INCORRECT = -5
@@ -35,15 +52,23 @@ DAILY_CHALLENGE_BADGE = "Daily Star"
 
 RETRY_MAX_HEARTS = 3
 RETRY_COOLDOWN_MINUTES = 5
+RETRY_COOLDOWN_SECONDS = RETRY_COOLDOWN_MINUTES * 60
+
+SECONDS_PER_DAY = 86400
+EPOCH_DATE = date(1970, 1, 1)
 
 LEADERBOARD_MAX_ENTRIES = 10
 
+HISTORY_INLINE_LIMIT = 30
+HISTORY_SEGMENT_ENTRIES = 500
+
+STORE_CLEAN_DIGESTS = 8
+
 
 def daily_challenge_defaults() -> Dict:
     return {
         "date_generated": None,
-        "land": None,
-        "question_ids": [],
+        "unlock_mask": None,
         "bonus_xp": DAILY_CHALLENGE_BONUS_XP,
         "badge_reward": DAILY_CHALLENGE_BADGE,
         "completed": False,
@@ -81,20 +106,432 @@ def merge_defaults(data: Dict | None, template: Dict) -> Dict:
             merged[key] = value
     return merged
 
-DEFAULT_PROFILE_TEMPLATE = {
-    "player_name": None,
-    "level": 1,
-    "xp": 0,
-    "badges": [],
-    "unlocked_lands": [LANDS[0]],
-    "hint_tokens": {land: MAX_HINTS_PER_TOPIC for land in LANDS},
-    "last_hint_reset": None,
-    "avatar": None,
-    "daily_challenge": daily_challenge_defaults(),
-    "daily_stats": daily_stats_defaults(),
-    "daily_history": [],
-    "retry_status": retry_defaults(),
-}
+LAND_INDEX = {land: index for index, land in enumerate(LANDS)}
+
+
+def lands_mask(lands) -> int:
+    mask = 0
+    for land in lands:
+        mask |= 1 << LAND_INDEX[land]
+    return mask
+
+
+# Time-based profile state is held as integer UTC epoch seconds and UTC day
+# numbers (days since 1970-01-01); ISO strings only exist in player_data.json.
+def utc_epoch() -> int:
+    return int(time.time())
+
+
+def utc_day_number(epoch: int | None = None) -> int:
+    return (utc_epoch() if epoch is None else epoch) // SECONDS_PER_DAY
+
+
+def epoch_to_iso(epoch: int | None) -> str | None:
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def iso_to_epoch(text: str | None) -> int | None:
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def day_to_iso(day: int | None) -> str | None:
+    if day is None:
+        return None
+    return (EPOCH_DATE + timedelta(days=day)).isoformat()
+
+
+def iso_to_day(text: str | None) -> int | None:
+    if not text:
+        return None
+    try:
+        return (date.fromisoformat(text[:10]) - EPOCH_DATE).days
+    except (TypeError, ValueError):
+        return None
+
+
+class Record:
+    # Typed, __slots__-backed profile parts. They keep the dict-style access
+    # (record["key"], .get, .setdefault, "key" in record) that the console and
+    # GUI already use, and serialize back to the player_data.json shape.
+    # FIELDS defaults to __slots__; records that keep a field in another form
+    # (e.g. epoch seconds behind an ISO property) list their FIELDS explicitly.
+    # DERIVED keys read like fields but are computed, so they are never saved.
+    # A field holding None counts as unset, as a missing key would in a dict:
+    # "in" is False, .get returns the default and .setdefault stores it.
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    DERIVED: Tuple[str, ...] = ()
+    NESTED: Dict[str, type] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "FIELDS" not in cls.__dict__:
+            cls.FIELDS = tuple(cls.__slots__)
+
+    @classmethod
+    def from_dict(cls, data: Dict | None):
+        record = cls()
+        if data:
+            for key in cls.FIELDS:
+                if key in data:
+                    record[key] = data[key]
+        return record
+
+    def to_dict(self) -> Dict:
+        result = {}
+        for key in self.FIELDS:
+            value = getattr(self, key)
+            result[key] = value.to_dict() if hasattr(value, "to_dict") else value
+        return result
+
+    def keys(self):
+        return self.FIELDS
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.FIELDS]
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __contains__(self, key) -> bool:
+        return (key in self.FIELDS or key in self.DERIVED) and getattr(self, key) is not None
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS and key not in self.DERIVED:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        nested = self.NESTED.get(key)
+        if nested is not None and not isinstance(value, nested):
+            value = nested.from_dict(value)
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        if key not in self.FIELDS and key not in self.DERIVED:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def setdefault(self, key: str, default=None):
+        value = self.get(key)
+        if value is None and default is not None:
+            self[key] = default
+            value = getattr(self, key)
+        return value
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class DailyChallenge(Record):
+    # Only the day, the lands unlocked when it was generated and the
+    # completion state are stored; the land and questions are derived from
+    # the first two through DAILY_SELECTIONS.
+    __slots__ = (
+        "generated_day",
+        "unlock_mask",
+        "bonus_xp",
+        "badge_reward",
+        "completed",
+        "reward_claimed",
+        "completion_epoch",
+        "completion_time_seconds",
+    )
+    FIELDS = (
+        "date_generated",
+        "unlock_mask",
+        "bonus_xp",
+        "badge_reward",
+        "completed",
+        "reward_claimed",
+        "completion_timestamp",
+        "completion_time_seconds",
+    )
+    DERIVED = ("land",)
+
+    def __init__(self) -> None:
+        self.generated_day = None
+        self.unlock_mask = None
+        self.bonus_xp = DAILY_CHALLENGE_BONUS_XP
+        self.badge_reward = DAILY_CHALLENGE_BADGE
+        self.completed = False
+        self.reward_claimed = False
+        self.completion_epoch = None
+        self.completion_time_seconds = None
+
+    @property
+    def date_generated(self) -> str | None:
+        return day_to_iso(self.generated_day)
+
+    @date_generated.setter
+    def date_generated(self, value: str | None) -> None:
+        self.generated_day = iso_to_day(value)
+
+    @property
+    def completion_timestamp(self) -> str | None:
+        return epoch_to_iso(self.completion_epoch)
+
+    @completion_timestamp.setter
+    def completion_timestamp(self, value: str | None) -> None:
+        self.completion_epoch = iso_to_epoch(value)
+
+    @property
+    def land(self) -> str | None:
+        if self.generated_day is None or not self.unlock_mask:
+            return None
+        return DAILY_SELECTIONS.land(self.generated_day, self.unlock_mask)
+
+    @classmethod
+    def from_dict(cls, data: Dict | None):
+        record = super().from_dict(data)
+        if data and record.unlock_mask is None and data.get("land") in LAND_INDEX:
+            # Saved before selections were derived: a mask of just the stored
+            # land derives that same land, so today's challenge keeps it.
+            record.unlock_mask = lands_mask([data["land"]])
+        return record
+
+
+class DailyStats(Record):
+    __slots__ = (
+        "streak_current",
+        "streak_best",
+        "last_completion_day",
+        "fastest_completion_seconds",
+        "total_completions",
+    )
+    FIELDS = (
+        "streak_current",
+        "streak_best",
+        "last_completion_date",
+        "fastest_completion_seconds",
+        "total_completions",
+    )
+
+    def __init__(self) -> None:
+        self.streak_current = 0
+        self.streak_best = 0
+        self.last_completion_day = None
+        self.fastest_completion_seconds = None
+        self.total_completions = 0
+
+    @property
+    def last_completion_date(self) -> str | None:
+        return day_to_iso(self.last_completion_day)
+
+    @last_completion_date.setter
+    def last_completion_date(self, value: str | None) -> None:
+        self.last_completion_day = iso_to_day(value)
+
+
+class RetryStatus(Record):
+    __slots__ = ("hearts", "depleted_epoch")
+    FIELDS = ("hearts", "last_depleted_at")
+
+    def __init__(self) -> None:
+        self.hearts = RETRY_MAX_HEARTS
+        self.depleted_epoch = None
+
+    @property
+    def last_depleted_at(self) -> str | None:
+        return epoch_to_iso(self.depleted_epoch)
+
+    @last_depleted_at.setter
+    def last_depleted_at(self, value: str | None) -> None:
+        self.depleted_epoch = iso_to_epoch(value)
+
+    def cooldown_deadline(self) -> int | None:
+        if self.hearts > 0 or self.depleted_epoch is None:
+            return None
+        return self.depleted_epoch + RETRY_COOLDOWN_SECONDS
+
+    def cooldown_remaining(self, now: int) -> int:
+        deadline = self.cooldown_deadline()
+        if deadline is None:
+            return 0
+        # Clamped so a wall clock that jumps backwards can never stretch the
+        # wait past one full cooldown.
+        return max(0, min(RETRY_COOLDOWN_SECONDS, deadline - now))
+
+
+class HintTokens:
+    # One byte per land, indexed through LAND_INDEX, instead of a dict keyed
+    # by land name in every profile.
+    __slots__ = ("counts",)
+
+    def __init__(self, fill: int = MAX_HINTS_PER_TOPIC) -> None:
+        self.counts = array("B", [fill]) * len(LANDS)
+
+    @classmethod
+    def from_dict(cls, data: Dict | None) -> "HintTokens":
+        tokens = cls()
+        if data:
+            for land, count in data.items():
+                index = LAND_INDEX.get(land)
+                if index is not None:
+                    tokens.counts[index] = max(0, min(255, int(count)))
+        return tokens
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(zip(LANDS, self.counts))
+
+    def reset(self, count: int = MAX_HINTS_PER_TOPIC) -> None:
+        for index in range(len(self.counts)):
+            self.counts[index] = count
+
+    def keys(self):
+        return LANDS
+
+    def items(self):
+        return list(zip(LANDS, self.counts))
+
+    def __iter__(self):
+        return iter(LANDS)
+
+    def __len__(self) -> int:
+        return len(LANDS)
+
+    def __contains__(self, land) -> bool:
+        return land in LAND_INDEX
+
+    def __getitem__(self, land: str) -> int:
+        return self.counts[LAND_INDEX[land]]
+
+    def __setitem__(self, land: str, count: int) -> None:
+        self.counts[LAND_INDEX[land]] = max(0, min(255, int(count)))
+
+    def get(self, land: str, default=None):
+        index = LAND_INDEX.get(land)
+        return default if index is None else self.counts[index]
+
+    def __repr__(self) -> str:
+        return f"HintTokens({self.to_dict()!r})"
+
+
+class DailyAggregates(Record):
+    # Running totals over the whole daily_history, including entries already
+    # rolled out to archive segments, so stats never rescan history.
+    __slots__ = ("count", "per_land", "per_month", "timed_count", "total_seconds", "archived_count")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.per_land = {}
+        self.per_month = {}
+        self.timed_count = 0
+        self.total_seconds = 0
+        self.archived_count = 0
+
+    @classmethod
+    def from_history(cls, history: List[Dict]) -> "DailyAggregates":
+        aggregates = cls()
+        for entry in history:
+            aggregates.add(entry)
+        return aggregates
+
+    def add(self, entry: Dict) -> None:
+        self.count += 1
+        land = entry.get("land")
+        if land:
+            self.per_land[land] = self.per_land.get(land, 0) + 1
+        month = (entry.get("date") or "")[:7]
+        if month:
+            self.per_month[month] = self.per_month.get(month, 0) + 1
+        seconds = entry.get("seconds")
+        if seconds is not None:
+            self.timed_count += 1
+            self.total_seconds += seconds
+
+    def average_seconds(self) -> float | None:
+        if not self.timed_count:
+            return None
+        return self.total_seconds / self.timed_count
+
+
+class Profile(Record):
+    __slots__ = (
+        "player_name",
+        "student_id",
+        "level",
+        "xp",
+        "badges",
+        "unlocked_lands",
+        "hint_tokens",
+        "hint_reset_day",
+        "avatar",
+        "daily_challenge",
+        "daily_stats",
+        "daily_history",
+        "daily_aggregates",
+        "retry_status",
+    )
+    FIELDS = (
+        "player_name",
+        "student_id",
+        "level",
+        "xp",
+        "badges",
+        "unlocked_lands",
+        "hint_tokens",
+        "last_hint_reset",
+        "avatar",
+        "daily_challenge",
+        "daily_stats",
+        "daily_history",
+        "daily_aggregates",
+        "retry_status",
+    )
+    NESTED = {
+        "hint_tokens": HintTokens,
+        "daily_challenge": DailyChallenge,
+        "daily_stats": DailyStats,
+        "daily_aggregates": DailyAggregates,
+        "retry_status": RetryStatus,
+    }
+
+    def __init__(self) -> None:
+        self.player_name = None
+        self.student_id = None
+        self.level = 1
+        self.xp = 0
+        self.badges = []
+        self.unlocked_lands = [LANDS[0]]
+        self.hint_tokens = HintTokens()
+        self.hint_reset_day = None
+        self.avatar = None
+        self.daily_challenge = DailyChallenge()
+        self.daily_stats = DailyStats()
+        self.daily_history = []
+        self.daily_aggregates = DailyAggregates()
+        self.retry_status = RetryStatus()
+
+    @property
+    def last_hint_reset(self) -> str | None:
+        return day_to_iso(self.hint_reset_day)
+
+    @last_hint_reset.setter
+    def last_hint_reset(self, value: str | None) -> None:
+        self.hint_reset_day = iso_to_day(value)
+
+
+def encode_record(value):
+    if isinstance(value, (Record, HintTokens)):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
 def load_json(path: Path):
@@ -103,8 +540,8 @@ def load_json(path: Path):
 
 
 def save_json(path: Path, data):
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
+    with atomic_open(path) as handle:
+        json.dump(data, handle, indent=2, default=encode_record)
 
 
 def leaderboard_defaults() -> Dict:
@@ -127,39 +564,120 @@ def save_leaderboard(data: Dict) -> None:
     save_json(LEADERBOARD_DATA_PATH, data)
 
 
-def default_profile() -> Dict:
-    return deepcopy(DEFAULT_PROFILE_TEMPLATE)
+def slot_summary(profile: Dict | None) -> Dict | None:
+    if profile is None:
+        return None
+    return {
+        "player_name": profile.get("player_name"),
+        "level": profile.get("level", 1),
+        "unlocked_count": len(profile.get("unlocked_lands", [])),
+    }
+
+
+def build_slot_index(store: Dict) -> Dict:
+    return {
+        "active_slot": store.get("active_slot"),
+        "slots": [
+            {"slot": slot, "summary": slot_summary(profile)}
+            for slot, profile in store.get("slots", {}).items()
+        ],
+    }
+
+
+def save_slot_index(store: Dict) -> None:
+    save_json(SLOT_INDEX_PATH, build_slot_index(store))
+
+
+def load_slot_index() -> Dict | None:
+    if not SLOT_INDEX_PATH.exists():
+        return None
+    try:
+        return load_json(SLOT_INDEX_PATH)
+    except (json.JSONDecodeError, OSError):  # pragma: no cover - defensive
+        return None
+
+
+def default_profile() -> Profile:
+    return Profile()
 
 
-def sanitize_profile(profile: Dict) -> Dict:
-    sanitized = default_profile()
+def sanitize_profile(profile: Dict | None) -> Profile:
+    if isinstance(profile, Profile):
+        return profile
+    sanitized = Profile()
     if profile is None:
         return sanitized
-    sanitized.update({
-        "player_name": profile.get("player_name") or sanitized["player_name"],
-        "level": profile.get("level", sanitized["level"]),
-        "xp": max(0, profile.get("xp", sanitized["xp"])),
-        "badges": profile.get("badges") or sanitized["badges"],
-        "unlocked_lands": profile.get("unlocked_lands") or sanitized["unlocked_lands"],
-        "last_hint_reset": profile.get("last_hint_reset", sanitized["last_hint_reset"]),
-        "avatar": profile.get("avatar") or sanitized["avatar"],
-    })
-
-    sanitized["badges"] = list(dict.fromkeys(sanitized["badges"]))
-    sanitized["unlocked_lands"] = [land for land in LANDS if land in sanitized["unlocked_lands"]]
-    if not sanitized["unlocked_lands"]:
-        sanitized["unlocked_lands"].append(LANDS[0])
-
-    hint_tokens = profile.get("hint_tokens", {}) if profile else {}
-    sanitized["hint_tokens"] = {land: hint_tokens.get(land, MAX_HINTS_PER_TOPIC) for land in LANDS}
-    sanitized["daily_challenge"] = merge_defaults(profile.get("daily_challenge") if profile else None, daily_challenge_defaults())
-    sanitized["daily_stats"] = merge_defaults(profile.get("daily_stats") if profile else None, daily_stats_defaults())
-    sanitized["daily_history"] = profile.get("daily_history") or []
-    sanitized["retry_status"] = merge_defaults(profile.get("retry_status") if profile else None, retry_defaults())
+    sanitized.player_name = profile.get("player_name") or sanitized.player_name
+    sanitized.student_id = profile.get("student_id") or sanitized.student_id
+    sanitized.level = profile.get("level", sanitized.level)
+    sanitized.xp = max(0, profile.get("xp", sanitized.xp))
+    sanitized.last_hint_reset = profile.get("last_hint_reset", sanitized.last_hint_reset)
+    sanitized.avatar = profile.get("avatar") or sanitized.avatar
+
+    sanitized.badges = list(dict.fromkeys(profile.get("badges") or []))
+    unlocked = set(profile.get("unlocked_lands") or [])
+    sanitized.unlocked_lands = [land for land in LANDS if land in unlocked] or [LANDS[0]]
+
+    sanitized.hint_tokens = HintTokens.from_dict(profile.get("hint_tokens"))
+    sanitized.daily_challenge = DailyChallenge.from_dict(profile.get("daily_challenge"))
+    sanitized.daily_stats = DailyStats.from_dict(profile.get("daily_stats"))
+    sanitized.daily_history = profile.get("daily_history") or []
+    if profile.get("daily_aggregates"):
+        sanitized.daily_aggregates = DailyAggregates.from_dict(profile["daily_aggregates"])
+    else:
+        sanitized.daily_aggregates = DailyAggregates.from_history(sanitized.daily_history)
+    sanitized.retry_status = RetryStatus.from_dict(profile.get("retry_status"))
     return sanitized
 
 
-def ensure_profile_store() -> Dict:
+class StoreConflictError(RuntimeError):
+    def __init__(self, slots: List[str]) -> None:
+        super().__init__(
+            f"Another MathQuest6 program changed {', '.join(slots)} since it was loaded here; "
+            "restart to pick up its changes"
+        )
+        self.slots = slots
+
+
+class SlotBase:
+    # The store revision of a slot as this process last read or wrote it,
+    # plus digests of disk versions it has seen. A profile whose digest is in
+    # ``clean`` has not been edited here, even if it is a snapshot taken
+    # before a newer disk version was adopted.
+    __slots__ = ("revision", "clean")
+
+    def __init__(self, revision: int, digest: str) -> None:
+        self.revision = revision
+        self.clean = [digest]
+
+    def adopt(self, revision: int, digest: str) -> None:
+        self.revision = revision
+        self.clean = (self.clean + [digest])[-STORE_CLEAN_DIGESTS:]
+
+
+STORE_BASES: Dict[Path, Dict[str, SlotBase]] = {}
+
+
+def profile_digest(profile: Dict | None) -> str:
+    if profile is None:
+        return ""
+    text = json.dumps(profile, default=encode_record, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def store_bases() -> Dict[str, SlotBase]:
+    return STORE_BASES.setdefault(PLAYER_DATA_PATH.resolve(), {})
+
+
+def remember_store(store: Dict) -> None:
+    revisions = store.get("revisions", {})
+    bases = store_bases()
+    bases.clear()
+    for slot, profile in store.get("slots", {}).items():
+        bases[slot] = SlotBase(revisions.get(slot, 0), profile_digest(profile))
+
+
+def _load_profile_store() -> Dict:
     if not PLAYER_DATA_PATH.exists():
         store = {
             "active_slot": DEFAULT_SLOTS[0],
@@ -167,6 +685,7 @@ def ensure_profile_store() -> Dict:
         }
         store["slots"][DEFAULT_SLOTS[0]] = default_profile()
         save_json(PLAYER_DATA_PATH, store)
+        save_slot_index(store)
         return store
 
     data = load_json(PLAYER_DATA_PATH)
@@ -177,6 +696,7 @@ def ensure_profile_store() -> Dict:
         }
         migrated["slots"][DEFAULT_SLOTS[0]] = sanitize_profile(data)
         save_json(PLAYER_DATA_PATH, migrated)
+        save_slot_index(migrated)
         return migrated
 
     for slot in DEFAULT_SLOTS:
@@ -192,12 +712,321 @@ def ensure_profile_store() -> Dict:
         data["active_slot"] = DEFAULT_SLOTS[0]
 
     save_json(PLAYER_DATA_PATH, data)
+    save_slot_index(data)
+    migrate_history_dirs(data["slots"])
     return data
 
 
-def save_profiles(store: Dict):
-    save_json(PLAYER_DATA_PATH, store)
-    sync_leaderboard(store)
+def ensure_profile_store() -> Dict:
+    # Exclusive: loading may rewrite the file (first run, migration,
+    # sanitizing) and must not interleave with another process's save.
+    with FileLock(STORE_LOCK_PATH):
+        store = _load_profile_store()
+        remember_store(store)
+    return store
+
+
+def merge_disk_store(store: Dict) -> Dict[str, Profile | None]:
+    # Optimistic read-merge-write step of save_profiles, run under the store
+    # lock. Slots edited here are written if the disk copy still has the
+    # revision they were loaded at; slots not edited here take whatever is
+    # on disk, so one process never overwrites another's slots. Every
+    # write stamps the slots it changes with a new store-wide revision, so a
+    # slot deleted and recreated elsewhere can never look unchanged.
+    # Returns the slots refreshed from disk (None for removed ones).
+    bases = store_bases()
+    disk = load_json(PLAYER_DATA_PATH) if PLAYER_DATA_PATH.exists() else {}
+    disk_slots = disk.get("slots", {})
+    disk_revisions = disk.get("revisions", {})
+    revision = disk.get("revision", 0) + 1
+    slots: Dict[str, Profile | None] = {}
+    revisions: Dict[str, int] = {}
+    refreshed: Dict[str, Profile | None] = {}
+    written: Dict[str, str] = {}
+    conflicts: List[str] = []
+
+    for slot, profile in store["slots"].items():
+        base = bases.get(slot)
+        disk_revision = disk_revisions.get(slot, 0)
+        digest = profile_digest(profile)
+        if base is not None and digest in base.clean:
+            if slot not in disk_slots:
+                refreshed[slot] = None
+            elif base.revision != disk_revision or digest != base.clean[-1]:
+                fresh = disk_slots[slot]
+                refreshed[slot] = slots[slot] = sanitize_profile(fresh) if fresh is not None else None
+                revisions[slot] = disk_revision
+            else:
+                slots[slot] = profile
+                revisions[slot] = disk_revision
+        elif disk_revision != (base.revision if base is not None else 0):
+            conflicts.append(slot)
+        else:
+            slots[slot] = profile
+            revisions[slot] = revision
+            written[slot] = digest
+    for slot, fresh in disk_slots.items():
+        if slot in store["slots"]:
+            continue
+        base = bases.get(slot)
+        if base is None:
+            refreshed[slot] = slots[slot] = sanitize_profile(fresh) if fresh is not None else None
+            revisions[slot] = disk_revisions.get(slot, 0)
+        elif disk_revisions.get(slot, 0) != base.revision:
+            conflicts.append(slot)
+    if conflicts:
+        raise StoreConflictError(conflicts)
+
+    store["slots"] = slots
+    store["revisions"] = revisions
+    store["revision"] = revision
+    if store.get("active_slot") not in slots:
+        store["active_slot"] = disk.get("active_slot") if disk.get("active_slot") in slots else next(iter(slots), None)
+    for slot in list(bases):
+        if slot not in slots:
+            del bases[slot]
+    for slot, digest in written.items():
+        bases[slot] = SlotBase(revision, digest)
+    for slot, fresh in refreshed.items():
+        if fresh is None:
+            continue
+        if slot in bases:
+            bases[slot].adopt(revisions[slot], profile_digest(fresh))
+        else:
+            bases[slot] = SlotBase(revisions[slot], profile_digest(fresh))
+    return refreshed
+
+
+def save_profiles(
+    store: Dict, history_overflow: Dict[str, List[Tuple[int, Dict]]] | None = None
+) -> Dict[str, Profile | None]:
+    if history_overflow is None:
+        history_overflow = collect_history_overflow(store)
+    # Archived under the store lock, and only once the merge has accepted
+    # the save, so a conflicting save leaves no entries behind and two
+    # programs never interleave appends to one archive.
+    with FileLock(STORE_LOCK_PATH):
+        refreshed = merge_disk_store(store)
+        append_history_segments(history_overflow)
+        save_json(PLAYER_DATA_PATH, store)
+        save_slot_index(store)
+        sync_leaderboard(store)
+    return refreshed
+
+
+def reload_slot(store: Dict, slot: str) -> Profile | None:
+    # Called right after a slot is claimed: the copy in memory may predate
+    # another program's session in it. Nothing has been edited here since
+    # the claim, so a newer disk version simply replaces it.
+    with FileLock(STORE_LOCK_PATH):
+        disk = load_json(PLAYER_DATA_PATH) if PLAYER_DATA_PATH.exists() else {}
+    bases = store_bases()
+    base = bases.get(slot)
+    revision = disk.get("revisions", {}).get(slot, 0)
+    if slot not in disk.get("slots", {}) or (base is not None and base.revision == revision):
+        return store["slots"].get(slot)
+    fresh = disk["slots"][slot]
+    profile = store["slots"][slot] = sanitize_profile(fresh) if fresh is not None else None
+    bases[slot] = SlotBase(revision, profile_digest(profile))
+    return profile
+
+
+def resolve_store_conflict(store: Dict, slots: List[str], keep) -> Dict[str, Profile | None]:
+    # Recovery from a StoreConflictError before saving again. Slots in
+    # ``keep`` are claimed here, so the local copy is the one to write and
+    # is rebased onto the disk revision. Any other conflicting slot takes
+    # the disk version, dropping what changed here. Returns the slots
+    # replaced from disk (None for removed ones).
+    with FileLock(STORE_LOCK_PATH):
+        disk = load_json(PLAYER_DATA_PATH) if PLAYER_DATA_PATH.exists() else {}
+    disk_slots = disk.get("slots", {})
+    disk_revisions = disk.get("revisions", {})
+    bases = store_bases()
+    refreshed: Dict[str, Profile | None] = {}
+    for slot in slots:
+        revision = disk_revisions.get(slot, 0)
+        if slot in keep:
+            if slot in bases:
+                bases[slot].revision = revision
+            else:
+                bases[slot] = SlotBase(revision, profile_digest(None))
+        elif slot in disk_slots:
+            fresh = disk_slots[slot]
+            refreshed[slot] = store["slots"][slot] = sanitize_profile(fresh) if fresh is not None else None
+            bases[slot] = SlotBase(revision, profile_digest(refreshed[slot]))
+        else:
+            refreshed[slot] = None
+            store["slots"].pop(slot, None)
+            bases.pop(slot, None)
+    return refreshed
+
+
+def slot_file_stem(slot: str) -> str:
+    # Hashed so slot names that sanitize alike ("Room 1", "Room_1", any
+    # all-non-ASCII name) still get their own lock and archive.
+    return f"{legacy_slot_file_stem(slot)}-{hashlib.blake2b(slot.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+def legacy_slot_file_stem(slot: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", slot).strip("_") or "slot"
+
+
+def slot_lock_path(slot: str) -> Path:
+    return SLOT_LOCK_DIR / f"{slot_file_stem(slot)}.lock"
+
+
+class SlotClaims:
+    # Session locks held by one player seat: a slot open in one console or
+    # window cannot be opened in another until it is closed. Released
+    # automatically when the process exits, so a crash never leaves a slot
+    # stuck. Each lock is its own open file, so seats inside one process
+    # (the console daemon) exclude each other the same way processes do.
+    def __init__(self) -> None:
+        self.held: Dict[str, FileLock] = {}
+
+    def claim(self, slot: str) -> bool:
+        if slot not in self.held:
+            lock = FileLock(slot_lock_path(slot))
+            if not lock.acquire(blocking=False):
+                return False
+            self.held[slot] = lock
+        for other in [held for held in self.held if held != slot]:
+            self.held.pop(other).release()
+        return True
+
+    def in_use(self, slot: str) -> bool:
+        # True when any other seat or process holds the slot.
+        if slot in self.held:
+            return False
+        lock = FileLock(slot_lock_path(slot))
+        if not lock.acquire(blocking=False):
+            return True
+        lock.release()
+        return False
+
+    def release_all(self) -> None:
+        while self.held:
+            self.held.popitem()[1].release()
+
+
+PROCESS_SLOT_CLAIMS = SlotClaims()
+
+
+def claim_active_slot(slot: str) -> bool:
+    return PROCESS_SLOT_CLAIMS.claim(slot)
+
+
+def slot_in_use(slot: str) -> bool:
+    return PROCESS_SLOT_CLAIMS.in_use(slot)
+
+
+def claimed_slots() -> List[str]:
+    return list(PROCESS_SLOT_CLAIMS.held)
+
+
+def history_slot_dir(slot: str, archive_dir: Path = HISTORY_ARCHIVE_DIR) -> Path:
+    return archive_dir / slot_file_stem(slot)
+
+
+def migrate_history_dirs(slots) -> None:
+    # Archives written before directory names were hashed. One that a
+    # single slot maps to is renamed into place; one that several slots
+    # shared already mixes their entries and is left alone rather than
+    # handed to one of them.
+    if not HISTORY_ARCHIVE_DIR.is_dir():
+        return
+    claimants: Dict[str, List[str]] = {}
+    for slot in slots:
+        claimants.setdefault(legacy_slot_file_stem(slot), []).append(slot)
+    for stem, names in claimants.items():
+        legacy = HISTORY_ARCHIVE_DIR / stem
+        if len(names) == 1 and legacy.is_dir() and not history_slot_dir(names[0]).exists():
+            legacy.rename(history_slot_dir(names[0]))
+
+
+def collect_history_overflow(store: Dict) -> Dict[str, List[Tuple[int, Dict]]]:
+    # Pops the oldest inline entries beyond HISTORY_INLINE_LIMIT and tags each
+    # with its position in the slot's archive. Pure in-memory, so the GUI can
+    # run it on the live store and hand the result to a background writer.
+    overflow: Dict[str, List[Tuple[int, Dict]]] = {}
+    for slot, profile in store.get("slots", {}).items():
+        if profile is None:
+            continue
+        history = profile.get("daily_history") or []
+        excess = len(history) - HISTORY_INLINE_LIMIT
+        if excess <= 0:
+            continue
+        ensure_daily_structures(profile)
+        aggregates = profile["daily_aggregates"]
+        start = aggregates.archived_count
+        overflow[slot] = list(enumerate(history[:excess], start=start))
+        del history[:excess]
+        aggregates.archived_count = start + excess
+    return overflow
+
+
+def append_history_segments(overflow: Dict[str, List[Tuple[int, Dict]]]) -> None:
+    for slot, entries in overflow.items():
+        directory = history_slot_dir(slot)
+        directory.mkdir(parents=True, exist_ok=True)
+        by_segment: Dict[int, List[str]] = {}
+        for index, entry in entries:
+            line = json.dumps({"n": index, **entry}, separators=(",", ":"))
+            by_segment.setdefault(index // HISTORY_SEGMENT_ENTRIES, []).append(line)
+        for segment, lines in by_segment.items():
+            # Each append adds a gzip member; readers see one continuous stream.
+            path = directory / f"segment-{segment:05d}.jsonl.gz"
+            with gzip.open(path, "at", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+            commit_path(path)
+
+
+def iter_archived_history(slot: str, archive_dir: Path = HISTORY_ARCHIVE_DIR):
+    directory = history_slot_dir(slot, archive_dir)
+    if not directory.exists():
+        return
+    expected = 0
+    for path in sorted(directory.glob("segment-*.jsonl.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                # A crash between archiving and saving the store re-archives
+                # the same entries on the next save; skip those repeats.
+                index = entry.pop("n", expected)
+                if index < expected:
+                    continue
+                expected = index + 1
+                yield entry
+
+
+def iter_daily_history(slot: str, profile: Dict, archive_dir: Path = HISTORY_ARCHIVE_DIR):
+    yield from iter_archived_history(slot, archive_dir)
+    yield from profile.get("daily_history") or []
+
+
+def daily_history_stats(profile: Dict) -> Dict:
+    ensure_daily_structures(profile)
+    aggregates = profile["daily_aggregates"]
+    return {
+        "total_completions": aggregates.count,
+        "per_land": dict(aggregates.per_land),
+        "per_month": dict(aggregates.per_month),
+        "average_seconds": aggregates.average_seconds(),
+        "archived_entries": aggregates.archived_count,
+    }
+
+
+def snapshot_store(store: Dict) -> Dict:
+    # Detached plain-dict copy that a background writer can serialize while
+    # the caller keeps mutating the live store.
+    snapshot = {key: deepcopy(value) for key, value in store.items() if key != "slots"}
+    snapshot["slots"] = {
+        slot: profile.to_dict() if isinstance(profile, Record) else deepcopy(profile)
+        for slot, profile in store.get("slots", {}).items()
+    }
+    return snapshot
 
 
 def list_slots(store: Dict) -> List[str]:
@@ -244,7 +1073,13 @@ def ensure_player_profile():
 
 
 def reset_hint_tokens(profile: Dict):
-    today = datetime.utcnow().date().isoformat()
+    if isinstance(profile, Profile):
+        today_number = utc_day_number()
+        if profile.hint_reset_day != today_number:
+            profile.hint_tokens.reset()
+            profile.hint_reset_day = today_number
+        return
+    today = utc_today_iso()
     if profile.get("last_hint_reset") != today:
         for land in LANDS:
             profile.setdefault("hint_tokens", {})
@@ -253,63 +1088,75 @@ def reset_hint_tokens(profile: Dict):
 
 
 def ensure_daily_structures(profile: Dict):
-    profile["daily_challenge"] = merge_defaults(profile.get("daily_challenge"), daily_challenge_defaults())
-    profile["daily_stats"] = merge_defaults(profile.get("daily_stats"), daily_stats_defaults())
+    if isinstance(profile, Profile):
+        return
+    if not isinstance(profile.get("daily_challenge"), DailyChallenge):
+        profile["daily_challenge"] = DailyChallenge.from_dict(profile.get("daily_challenge"))
+    if not isinstance(profile.get("daily_stats"), DailyStats):
+        profile["daily_stats"] = DailyStats.from_dict(profile.get("daily_stats"))
     profile.setdefault("daily_history", [])
+    if not isinstance(profile.get("daily_aggregates"), DailyAggregates):
+        aggregates = profile.get("daily_aggregates")
+        profile["daily_aggregates"] = (
+            DailyAggregates.from_dict(aggregates) if aggregates else DailyAggregates.from_history(profile["daily_history"])
+        )
 
 
 def ensure_retry_status(profile: Dict):
-    profile["retry_status"] = merge_defaults(profile.get("retry_status"), retry_defaults())
+    if isinstance(profile, Profile):
+        return
+    if not isinstance(profile.get("retry_status"), RetryStatus):
+        profile["retry_status"] = RetryStatus.from_dict(profile.get("retry_status"))
 
 
-def refresh_retry_status(profile: Dict) -> Dict:
+def refresh_retry_status(profile: Dict, now: int | None = None) -> RetryStatus:
     ensure_retry_status(profile)
     status = profile["retry_status"]
-    hearts = status.get("hearts", RETRY_MAX_HEARTS)
-    last_depleted = status.get("last_depleted_at")
-    if hearts == 0 and last_depleted:
-        try:
-            last_dt = datetime.fromisoformat(last_depleted)
-        except ValueError:
-            last_dt = None
-        if last_dt and datetime.utcnow() >= last_dt + timedelta(minutes=RETRY_COOLDOWN_MINUTES):
-            status["hearts"] = RETRY_MAX_HEARTS
-            status["last_depleted_at"] = None
+    deadline = status.cooldown_deadline()
+    if deadline is not None and (utc_epoch() if now is None else now) >= deadline:
+        status.hearts = RETRY_MAX_HEARTS
+        status.depleted_epoch = None
     return status
 
 
 def get_retry_hearts(profile: Dict) -> int:
     status = refresh_retry_status(profile)
-    return int(status.get("hearts", RETRY_MAX_HEARTS))
+    return int(status.hearts)
 
 
 def consume_retry_heart(profile: Dict) -> int:
-    status = refresh_retry_status(profile)
-    hearts = int(status.get("hearts", RETRY_MAX_HEARTS))
+    now = utc_epoch()
+    status = refresh_retry_status(profile, now)
+    hearts = int(status.hearts)
     if hearts <= 0:
         return hearts
     hearts -= 1
-    status["hearts"] = hearts
+    status.hearts = hearts
     if hearts <= 0:
-        status["last_depleted_at"] = utc_now_iso()
+        status.depleted_epoch = now
     return hearts
 
 
-def retry_cooldown_remaining(profile: Dict) -> int:
-    status = refresh_retry_status(profile)
-    hearts = int(status.get("hearts", RETRY_MAX_HEARTS))
-    if hearts > 0:
-        return 0
-    last_depleted = status.get("last_depleted_at")
-    if not last_depleted:
-        return 0
-    try:
-        last_dt = datetime.fromisoformat(last_depleted)
-    except ValueError:
-        return 0
-    elapsed = datetime.utcnow() - last_dt
-    remaining = (timedelta(minutes=RETRY_COOLDOWN_MINUTES) - elapsed).total_seconds()
-    return max(0, int(remaining))
+def retry_cooldown_deadline(profile: Dict) -> int | None:
+    ensure_retry_status(profile)
+    return profile["retry_status"].cooldown_deadline()
+
+
+def retry_cooldown_remaining(profile: Dict, now: int | None = None) -> int:
+    now = utc_epoch() if now is None else now
+    return refresh_retry_status(profile, now).cooldown_remaining(now)
+
+
+def expired_cooldowns(store: Dict, now: int | None = None) -> List[str]:
+    now = utc_epoch() if now is None else now
+    expired = []
+    for slot, profile in store.get("slots", {}).items():
+        if profile is None:
+            continue
+        deadline = retry_cooldown_deadline(profile)
+        if deadline is not None and deadline <= now:
+            expired.append(slot)
+    return expired
 
 
 def utc_today() -> datetime.date:
@@ -324,87 +1171,165 @@ def utc_today_iso() -> str:
     return utc_today().isoformat()
 
 
-def sync_leaderboard(store: Dict) -> Dict:
-    entries = []
-    slots = store.get("slots", {}) if isinstance(store, dict) else {}
-    for slot_name, profile in slots.items():
-        if not profile:
-            continue
-        sanitized = sanitize_profile(profile)
-        daily_stats = sanitized.get("daily_stats", {})
-        entry = {
-            "slot": slot_name,
-            "player_name": sanitized.get("player_name") or slot_name,
-            "level": sanitized.get("level", 1),
-            "xp": sanitized.get("xp", 0),
-            "badge_count": len(sanitized.get("badges", [])),
-            "streak_best": daily_stats.get("streak_best", 0),
-            "total_dailies": daily_stats.get("total_completions", 0),
-        }
-        entries.append(entry)
-
-    entries.sort(
-        key=lambda item: (
-            -item["level"],
-            -item["xp"],
-            -item["streak_best"],
-            -item["total_dailies"],
-            item["player_name"].lower(),
-        )
+def leaderboard_entry(slot_name: str, profile: Dict) -> Dict:
+    sanitized = sanitize_profile(profile)
+    daily_stats = sanitized.get("daily_stats", {})
+    return {
+        "slot": slot_name,
+        "player_name": sanitized.get("player_name") or slot_name,
+        "level": sanitized.get("level", 1),
+        "xp": sanitized.get("xp", 0),
+        "badge_count": len(sanitized.get("badges", [])),
+        "streak_best": daily_stats.get("streak_best", 0),
+        "total_dailies": daily_stats.get("total_completions", 0),
+    }
+
+
+def leaderboard_sort_key(entry: Dict) -> Tuple:
+    # The trailing slot name breaks ties between identical players so every
+    # entry has a distinct position.
+    return (
+        -entry["level"],
+        -entry["xp"],
+        -entry["streak_best"],
+        -entry["total_dailies"],
+        entry["player_name"].lower(),
+        entry["slot"],
     )
 
-    leaderboard = {
+
+def build_leaderboard(store: Dict) -> Dict:
+    slots = store.get("slots", {}) if isinstance(store, dict) else {}
+    entries = [leaderboard_entry(slot_name, profile) for slot_name, profile in slots.items() if profile]
+    return {
         "updated_at": utc_now_iso(),
-        "entries": entries[:LEADERBOARD_MAX_ENTRIES],
+        "entries": heapq.nsmallest(LEADERBOARD_MAX_ENTRIES, entries, key=leaderboard_sort_key),
     }
+
+
+def sync_leaderboard(store: Dict) -> Dict:
+    leaderboard = build_leaderboard(store)
     save_leaderboard(leaderboard)
     return leaderboard
 
 
-def refresh_daily_challenge(profile: Dict, quiz_bank: Dict[str, List[Dict]], question_count: int = DAILY_CHALLENGE_QUESTION_COUNT) -> Dict:
+def daily_seed(*parts) -> int:
+    # hash() is salted per process; this seed must agree across processes,
+    # machines and restarts so any day's challenge can be reproduced.
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def pick_daily_land(day: int, unlock_mask: int) -> str:
+    unlocked = [land for index, land in enumerate(LANDS) if unlock_mask >> index & 1] or [LANDS[0]]
+    return random.Random(daily_seed(day, unlock_mask)).choice(unlocked)
+
+
+def pick_daily_questions(day: int, land: str, pool_size: int, question_count: int = DAILY_CHALLENGE_QUESTION_COUNT) -> List[int]:
+    # Keyed by land rather than unlock set, so everyone sent to the same land
+    # on the same day answers the same questions. The pool size is part of
+    # the seed so a content update never yields out-of-range indices.
+    indices = list(range(pool_size))
+    random.Random(daily_seed(day, land, pool_size)).shuffle(indices)
+    return indices[:question_count]
+
+
+class DailySelections:
+    # Per-day cache of derived picks shared by every slot in the process.
+    # Lands are 9 bits of unlock mask and progress mostly unlocks them in
+    # order, so a whole class resolves to a handful of entries per day.
+    def __init__(self) -> None:
+        self.day: int | None = None
+        self.lands: Dict[Tuple[int, int], str] = {}
+        self.questions: Dict[Tuple[int, str, int, int], List[int]] = {}
+
+    def _roll(self, day: int) -> None:
+        if self.day is None or day > self.day:
+            self.day = day
+            self.lands.clear()
+            self.questions.clear()
+
+    def land(self, day: int, unlock_mask: int) -> str:
+        self._roll(day)
+        key = (day, unlock_mask)
+        land = self.lands.get(key)
+        if land is None:
+            land = self.lands[key] = pick_daily_land(day, unlock_mask)
+        return land
+
+    def question_ids(self, day: int, land: str, pool_size: int, question_count: int = DAILY_CHALLENGE_QUESTION_COUNT) -> List[int]:
+        self._roll(day)
+        key = (day, land, pool_size, question_count)
+        ids = self.questions.get(key)
+        if ids is None:
+            ids = self.questions[key] = pick_daily_questions(day, land, pool_size, question_count)
+        return ids
+
+
+DAILY_SELECTIONS = DailySelections()
+
+
+def refresh_daily_challenge(
+    profile: Dict,
+    quiz_bank: Dict[str, List[Dict]] | None = None,
+    question_count: int = DAILY_CHALLENGE_QUESTION_COUNT,
+    day: int | None = None,
+) -> Dict:
     ensure_daily_structures(profile)
     challenge = profile["daily_challenge"]
-    today = utc_today_iso()
-    if challenge.get("date_generated") == today and challenge.get("land"):
-        return challenge
-    unlocked = profile.get("unlocked_lands") or [LANDS[0]]
-    land = random.choice(unlocked)
-    pool = quiz_bank.get(land, [])
-    indices = list(range(len(pool)))
-    if indices:
-        random.shuffle(indices)
-        count = min(len(indices), question_count)
-        challenge["question_ids"] = indices[:count]
-    else:
-        challenge["question_ids"] = []
-    challenge["land"] = land
-    challenge["date_generated"] = today
-    challenge["completed"] = False
-    challenge["reward_claimed"] = False
-    challenge["completion_timestamp"] = None
-    challenge["completion_time_seconds"] = None
-    challenge["bonus_xp"] = DAILY_CHALLENGE_BONUS_XP
-    challenge["badge_reward"] = DAILY_CHALLENGE_BADGE
+    today = utc_day_number() if day is None else day
+    if challenge.generated_day != today or not challenge.unlock_mask:
+        # The unlock set is captured now, so unlocking a land later in the
+        # day does not swap the challenge out from under the player.
+        challenge.generated_day = today
+        unlocked = [land for land in profile.get("unlocked_lands") or () if land in LAND_INDEX]
+        challenge.unlock_mask = lands_mask(unlocked or LANDS[:1])
+        challenge["completed"] = False
+        challenge["reward_claimed"] = False
+        challenge.completion_epoch = None
+        challenge["completion_time_seconds"] = None
+        challenge["bonus_xp"] = DAILY_CHALLENGE_BONUS_XP
+        challenge["badge_reward"] = DAILY_CHALLENGE_BADGE
+    if quiz_bank is not None:
+        land = challenge.land
+        DAILY_SELECTIONS.question_ids(today, land, len(quiz_bank.get(land, [])), question_count)
     return challenge
 
 
+def precompute_daily_challenges(profiles, quiz_bank: Dict[str, List[Dict]] | None = None, day: int | None = None) -> int:
+    # Rollover batch: starts each given profile's challenge for the new day
+    # and fills DAILY_SELECTIONS once per distinct unlock set and land, so
+    # the first player to open the challenge pays nothing. Pass only slots
+    # this process has claimed, since it writes into them; any other slot
+    # starts its challenge from the shared cache when its owner opens it.
+    # Returns the number of distinct selections, which is what the
+    # derivation work scales with. It runs sequentially: there are at most
+    # 2**len(LANDS) selections, all of them take milliseconds, and the
+    # results must land in this process's cache, so a worker pool would
+    # cost more to start than the work it split.
+    today = utc_day_number() if day is None else day
+    masks = set()
+    for profile in profiles:
+        if profile is None:
+            continue
+        masks.add(refresh_daily_challenge(profile, day=today).unlock_mask)
+    lands = {DAILY_SELECTIONS.land(today, mask) for mask in masks}
+    if quiz_bank is not None:
+        for land in lands:
+            DAILY_SELECTIONS.question_ids(today, land, len(quiz_bank.get(land, [])))
+    return len(masks)
+
+
 def get_daily_challenge_questions(profile: Dict, quiz_bank: Dict[str, List[Dict]]) -> Tuple[str | None, List[Dict]]:
     ensure_daily_structures(profile)
     challenge = profile["daily_challenge"]
-    land = challenge.get("land")
+    land = challenge.land
     if not land:
         return None, []
     pool = quiz_bank.get(land, [])
     if not pool:
         return land, []
-    selected: List[Dict] = []
-    for index in challenge.get("question_ids", []):
-        if 0 <= index < len(pool):
-            selected.append(pool[index])
-    if not selected:
-        count = min(len(pool), DAILY_CHALLENGE_QUESTION_COUNT)
-        selected = pool[:count]
-    return land, selected
+    return land, [pool[index] for index in DAILY_SELECTIONS.question_ids(challenge.generated_day, land, len(pool))]
 
 
 def mark_daily_completion(profile: Dict, seconds_taken: int | None = None) -> bool:
@@ -413,43 +1338,37 @@ def mark_daily_completion(profile: Dict, seconds_taken: int | None = None) -> bo
     if challenge.get("completed"):
         return False
     stats = profile["daily_stats"]
-    today = utc_today()
-    today_iso = today.isoformat()
+    now = utc_epoch()
+    today = utc_day_number(now)
+    today_iso = day_to_iso(today)
     challenge["completed"] = True
-    challenge["completion_timestamp"] = utc_now_iso()
+    challenge.completion_epoch = now
     challenge["completion_time_seconds"] = seconds_taken
-    last_completion = stats.get("last_completion_date")
+    last_day = stats.last_completion_day
     previous_streak = stats.get("streak_current", 0)
-    if last_completion:
-        try:
-            last_date = datetime.fromisoformat(last_completion).date()
-        except ValueError:
-            last_date = None
-    else:
-        last_date = None
-    if last_date == today:
+    if last_day == today:
         streak = previous_streak or 1
-    elif last_date == today - timedelta(days=1):
+    elif last_day == today - 1:
         streak = (previous_streak or 0) + 1
     else:
         streak = 1
     stats["streak_current"] = streak
     stats["streak_best"] = max(stats.get("streak_best", 0), streak)
-    stats["last_completion_date"] = today_iso
+    stats.last_completion_day = today
     stats["total_completions"] = stats.get("total_completions", 0) + 1
     if seconds_taken is not None:
         fastest = stats.get("fastest_completion_seconds")
         if fastest is None or seconds_taken < fastest:
             stats["fastest_completion_seconds"] = seconds_taken
-    profile["daily_history"].append(
-        {
-            "date": today_iso,
-            "land": challenge.get("land"),
-            "seconds": seconds_taken,
-            "bonus_xp": challenge.get("bonus_xp"),
-            "badge_reward": challenge.get("badge_reward"),
-        }
-    )
+    entry = {
+        "date": today_iso,
+        "land": challenge.get("land"),
+        "seconds": seconds_taken,
+        "bonus_xp": challenge.get("bonus_xp"),
+        "badge_reward": challenge.get("badge_reward"),
+    }
+    profile["daily_history"].append(entry)
+    profile["daily_aggregates"].add(entry)
     return True
 
 
@@ -0,0 +1,96 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List
+
+from analytics import AnalyticsRollups, Tally, mastery_level
+from game_utils import LANDS
+from gui_app.virtual_list import VirtualList
+
+TOP_MISSED_LIMIT = 8
+MATRIX_SLOT_WIDTH = 14
+MATRIX_CELL_WIDTH = 16
+
+
+def format_tally(tally: Tally | None) -> str:
+    if tally is None or not tally.attempts:
+        return "—"
+    return f"{tally.accuracy * 100:.0f}% {mastery_level(tally)}"
+
+
+class MasteryRow(ttk.Frame):
+    def __init__(self, master: tk.Misc, land_count: int) -> None:
+        super().__init__(master, padding=(12, 4), style="Card.TFrame")
+        self.slot_label = ttk.Label(self, width=MATRIX_SLOT_WIDTH, style="CardBody.TLabel")
+        self.slot_label.grid(row=0, column=0, sticky="w")
+        self.cells: list[ttk.Label] = []
+        for column in range(land_count):
+            label = ttk.Label(self, width=MATRIX_CELL_WIDTH, style="CardBody.TLabel")
+            label.grid(row=0, column=column + 1, sticky="w")
+            self.cells.append(label)
+
+    def show(self, slot: str, lands: List[str], row: Dict[str, Tally]) -> None:
+        self.slot_label.configure(text=slot or "Unknown")
+        for label, land in zip(self.cells, lands):
+            label.configure(text=format_tally(row.get(land)))
+
+
+class AnalyticsPanel(ttk.Frame):
+    ROW_HEIGHT = 36
+
+    def __init__(self, master: tk.Misc, rollups: AnalyticsRollups, on_back) -> None:
+        super().__init__(master)
+        self.lands = [land for land in LANDS if land in rollups.lands]
+        self.matrix = rollups.mastery_matrix()
+        self.slots = list(self.matrix)
+
+        header_row = ttk.Frame(self)
+        header_row.pack(fill="x", pady=(0, 12))
+        ttk.Label(header_row, text="📊 Class Analytics", style="Header.TLabel").pack(side="left")
+        ttk.Button(header_row, text="Back", command=on_back).pack(side="right")
+
+        if not self.slots:
+            ttk.Label(
+                self,
+                text="No answers recorded yet. Battle a few creatures first!",
+                style="Body.TLabel",
+            ).pack(pady=(16, 0))
+            return
+
+        ttk.Label(self, text="Mastery by land", style="Dim.TLabel").pack(anchor="w")
+        matrix_header = ttk.Frame(self, padding=(12, 4))
+        matrix_header.pack(fill="x")
+        ttk.Label(matrix_header, text="Slot", width=MATRIX_SLOT_WIDTH, style="Dim.TLabel").grid(row=0, column=0, sticky="w")
+        for column, land in enumerate(self.lands, start=1):
+            ttk.Label(matrix_header, text=land[:MATRIX_CELL_WIDTH - 2], width=MATRIX_CELL_WIDTH, style="Dim.TLabel").grid(
+                row=0, column=column, sticky="w"
+            )
+
+        self.rows = VirtualList(
+            self,
+            row_height=self.ROW_HEIGHT,
+            create_row=lambda master: MasteryRow(master, len(self.lands)),
+            render_row=self.render_row,
+        )
+        self.rows.pack(fill="both", expand=True, pady=(4, 12))
+        self.rows.set_row_count(len(self.slots))
+
+        ttk.Label(self, text="Most missed questions", style="Dim.TLabel").pack(anchor="w")
+        missed = ttk.Frame(self, padding=(12, 4))
+        missed.pack(fill="x")
+        for column, title in enumerate(("Misses", "Tries", "Hints", "Avg s", "Land", "Prompt")):
+            ttk.Label(missed, text=title, style="Dim.TLabel").grid(row=0, column=column, sticky="w", padx=(0, 12))
+        for row, item in enumerate(rollups.top_missed_questions(TOP_MISSED_LIMIT), start=1):
+            values = (
+                str(item["misses"]),
+                str(item["attempts"]),
+                f"{item['hint_rate'] * 100:.0f}%",
+                f"{item['average_seconds']:.1f}",
+                item["land"],
+                item["prompt"][:48],
+            )
+            for column, value in enumerate(values):
+                ttk.Label(missed, text=value).grid(row=row, column=column, sticky="w", padx=(0, 12))
+
+    def render_row(self, row: MasteryRow, index: int) -> None:
+        slot = self.slots[index]
+        row.show(slot, self.lands, self.matrix[slot])
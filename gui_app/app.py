@@ -1,4 +1,9 @@
+import json
+import os
+import platform
 import tkinter as tk
+from datetime import datetime
+from pathlib import Path
 from tkinter import ttk, messagebox
 from time import perf_counter
 
@@ -13,12 +18,25 @@ from art_assets import (
     HP_EMOJI,
 )
 from game_utils import (
+    DEFAULT_SLOTS,
     LANDS,
+    StoreConflictError,
     ensure_player_profile,
     save_profiles,
+    reload_slot,
+    resolve_store_conflict,
+    claimed_slots,
+    snapshot_store,
+    collect_history_overflow,
+    load_slot_index,
+    build_slot_index,
+    slot_summary,
+    load_leaderboard,
+    leaderboard_defaults,
     reset_hint_tokens,
-    list_slots,
     set_active_slot,
+    claim_active_slot,
+    slot_in_use,
     default_profile,
     load_json,
     LESSON_DATA_PATH,
@@ -43,22 +61,60 @@ from game_utils import (
     DAILY_CHALLENGE_BADGE,
     RETRY_MAX_HEARTS,
 )
+from analytics import AnalyticsRollups, AnswerRecorder, load_rollups, write_answer_chunk
+from scheduler import ProfileTimers
+from gui_app.analytics_panel import AnalyticsPanel
+from gui_app.io_executor import IOExecutor
+from gui_app.leaderboard_panel import LeaderboardPanel
+from gui_app.virtual_list import VirtualList
+from gui_app.widget_pool import WidgetPool
+from leaderboard_history import LeaderboardHistory
+from leaderboards import Leaderboards
+
+
+def save_snapshot(snapshot: dict, overflow: dict, keep: set) -> dict:
+    # Store-lane job. Slots in ``keep`` hold the local copy if another
+    # program changed them too; any other slot this window touched takes the
+    # disk version, which handle_store_saved adopts like a refreshed slot.
+    try:
+        return save_profiles(snapshot, overflow)
+    except StoreConflictError as conflict:
+        refreshed = resolve_store_conflict(snapshot, conflict.slots, keep)
+    # Nothing was archived; slots just replaced from disk drop theirs.
+    overflow = {slot: entries for slot, entries in overflow.items() if slot not in refreshed}
+    refreshed.update(save_profiles(snapshot, overflow))
+    return refreshed
 
 
 class MathQuestApp(tk.Tk):
-    def __init__(self) -> None:
+    STARTUP_STAGES = 5
+    TIMER_TICK_MS = 1000
+
+    def __init__(self, started_at: float | None = None) -> None:
+        self.started_at = started_at if started_at is not None else perf_counter()
         super().__init__()
         self.title("MathQuest6 — GUI Prototype")
         self.geometry("900x600")
         self.minsize(820, 520)
         self.configure(background="#1f1f2e")
 
-        self.store, self.profile = ensure_player_profile()
-        reset_hint_tokens(self.profile)
-        save_profiles(self.store)
-
-        self.lessons = load_json(LESSON_DATA_PATH)
-        self.quiz_bank = load_json(QUIZ_DATA_PATH)
+        self.io = IOExecutor(self, on_busy_changed=self.update_save_indicator, on_error=self.report_io_error)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.store: dict | None = None
+        self.store_writable = True
+        self.profile: dict | None = None
+        self.lessons: dict = {}
+        self.quiz_bank: dict = {}
+        self.leaderboard: dict | None = None
+        self.leaderboards = Leaderboards()
+        self.leaderboard_history = LeaderboardHistory()
+        self.slot_index = load_slot_index()
+        self.startup_done = 0
+        self.ready_callbacks: list = []
+        self.startup_metrics: dict = {}
+        self.answers: AnswerRecorder | None = None
+        self.timers = ProfileTimers(on_heart_refill=self.handle_heart_refill, on_rollover=self.handle_rollover)
         self.selected_land: str | None = None
         self.daily_attempt_timer: float | None = None
         self.show_daily_card = True
@@ -75,19 +131,245 @@ class MathQuestApp(tk.Tk):
         self.style.configure("CardBody.TLabel", font=("Segoe UI", 13), background="#2a2a3f", wraplength=320)
         self.style.configure("Dim.TLabel", foreground="#b0b0c0")
 
+        footer = ttk.Frame(self, padding=(12, 0, 12, 6))
+        footer.pack(side="bottom", fill="x")
+        self.loading_label = ttk.Label(footer, text="Loading adventure data…", style="Dim.TLabel")
+        self.loading_label.pack(side="left")
+        self.loading_bar = ttk.Progressbar(footer, length=180, maximum=self.STARTUP_STAGES, mode="determinate")
+        self.loading_bar.pack(side="left", padx=(12, 0))
+        self.save_status = ttk.Label(footer, text="", style="Dim.TLabel")
+        self.save_status.pack(side="right")
+
         self.container = ttk.Frame(self, padding=32)
         self.container.pack(fill="both", expand=True)
 
         self.current_frame: ttk.Frame | None = None
-        self.ensure_daily_challenge()
         self.show_slot_selection()
+        self.after_idle(self.record_first_paint)
+        self.start_background_loading()
+        self.after(self.TIMER_TICK_MS, self.tick_timers)
+
+    def start_background_loading(self) -> None:
+        # Store and content loads run on separate lanes so neither waits for
+        # the other; each completion advances the footer progress bar.
+        # A failed stage is reported and replaced by an empty fallback, so
+        # startup always reaches the ready state.
+        self.io.submit("store", ensure_player_profile, on_done=self.handle_store_loaded, on_error=self.handle_store_failed)
+        self.io.submit(
+            "lessons",
+            load_json,
+            LESSON_DATA_PATH,
+            on_done=self.handle_lessons_loaded,
+            on_error=lambda error: self.handle_load_failed(error, self.handle_lessons_loaded, {}),
+        )
+        self.io.submit(
+            "quiz",
+            load_json,
+            QUIZ_DATA_PATH,
+            on_done=self.handle_quiz_loaded,
+            on_error=lambda error: self.handle_load_failed(error, self.handle_quiz_loaded, {}),
+        )
+        self.io.submit(
+            "leaderboard",
+            load_leaderboard,
+            on_done=self.handle_leaderboard_loaded,
+            on_error=lambda error: self.handle_load_failed(error, self.handle_leaderboard_loaded, leaderboard_defaults()),
+        )
+        self.io.submit(
+            "answers",
+            load_rollups,
+            on_done=self.handle_rollups_loaded,
+            on_error=lambda error: self.handle_load_failed(error, self.handle_rollups_loaded, AnalyticsRollups()),
+        )
+
+    def handle_load_failed(self, error: BaseException, handler, fallback) -> None:
+        self.report_io_error(error, loading=True)
+        handler(fallback)
+
+    def handle_store_loaded(self, result: tuple) -> None:
+        store, profile = result
+        # Hints and timers wait for handle_slot_selected: until then the
+        # active slot is not claimed and may be open in another window.
+        try:
+            slot_index = build_slot_index(store)
+        except Exception as error:
+            self.handle_store_failed(error)
+            return
+        self.store, self.profile, self.slot_index = store, profile, slot_index
+        if isinstance(self.current_frame, SlotSelectionFrame):
+            self.current_frame.set_summaries(self.slot_summaries())
+        self.advance_startup()
+
+    def handle_store_failed(self, error: BaseException) -> None:
+        # Play on with a fresh store that is never saved, leaving the
+        # unreadable file on disk untouched for repair.
+        self.report_io_error(error, loading=True)
+        self.store_writable = False
+        self.store = {"active_slot": DEFAULT_SLOTS[0], "slots": {slot: None for slot in DEFAULT_SLOTS}}
+        self.store["slots"][DEFAULT_SLOTS[0]] = self.profile = default_profile()
+        self.slot_index = None
+        if isinstance(self.current_frame, SlotSelectionFrame):
+            self.current_frame.set_summaries(self.slot_summaries())
+        self.advance_startup()
+
+    def handle_lessons_loaded(self, lessons: dict) -> None:
+        self.lessons = lessons
+        self.advance_startup()
+
+    def handle_quiz_loaded(self, quiz_bank: dict) -> None:
+        self.quiz_bank = quiz_bank
+        self.advance_startup()
+
+    def handle_leaderboard_loaded(self, leaderboard: dict) -> None:
+        self.leaderboard = leaderboard
+        self.advance_startup()
+
+    def handle_rollups_loaded(self, rollups) -> None:
+        self.answers = AnswerRecorder(autoflush=False, rollups=rollups)
+        self.advance_startup()
+
+    def advance_startup(self) -> None:
+        self.startup_done += 1
+        self.loading_bar.configure(value=self.startup_done)
+        if not self.is_ready:
+            return
+        self.leaderboards = Leaderboards.from_store(self.store, rollups=self.answers.rollups)
+        self.loading_label.pack_forget()
+        self.loading_bar.pack_forget()
+        self.startup_metrics["time_to_ready_ms"] = round((perf_counter() - self.started_at) * 1000, 1)
+        self.io.submit("metrics", write_startup_metrics, dict(self.startup_metrics))
+        callbacks, self.ready_callbacks = self.ready_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.startup_done >= self.STARTUP_STAGES
+
+    def when_ready(self, callback) -> None:
+        if self.is_ready:
+            callback()
+        else:
+            self.ready_callbacks = [callback]
+
+    def tick_timers(self) -> None:
+        # Deadlines fire at most once each; between them the only per-second
+        # work is refreshing the countdown text on an open quest map.
+        self.timers.tick()
+        if self.profile is not None and isinstance(self.current_frame, QuestMapFrame):
+            hearts = int(self.profile["retry_status"]["hearts"])
+            cooldown_seconds = retry_cooldown_remaining(self.profile) if hearts <= 0 else 0
+            self.current_frame.update_hearts(hearts, cooldown_seconds)
+        self.after(self.TIMER_TICK_MS, self.tick_timers)
+
+    def handle_heart_refill(self, slot_name: str, profile: dict) -> None:
+        self.save_store()
+        if profile is self.profile and isinstance(self.current_frame, QuestMapFrame):
+            self.show_quest_map()
+
+    def handle_rollover(self, _now: int) -> None:
+        if not self.is_ready:
+            return
+        self.ensure_daily_challenge()
+        if isinstance(self.current_frame, QuestMapFrame):
+            self.show_quest_map()
+
+    def record_first_paint(self) -> None:
+        self.startup_metrics["time_to_first_paint_ms"] = round((perf_counter() - self.started_at) * 1000, 1)
+
+    def slot_summaries(self) -> list[tuple[str, dict | None]]:
+        if self.store is not None:
+            return [(slot, slot_summary(profile)) for slot, profile in self.store["slots"].items()]
+        if self.slot_index:
+            return [(entry["slot"], entry.get("summary")) for entry in self.slot_index.get("slots", [])]
+        return []
 
     def run(self) -> None:
         self.mainloop()
 
+    def close(self) -> None:
+        self.flush_answer_log()
+        self.io.shutdown()
+        self.destroy()
+
+    def save_store(self, keep: tuple = ()) -> None:
+        # ``keep`` names unclaimed slots edited on purpose, such as a reset.
+        if self.store is None or not self.store_writable:
+            return
+        active = self.store.get("active_slot")
+        self.leaderboards.update(active, self.store["slots"].get(active))
+        # All saves share one lane so they hit disk in order; a snapshot that
+        # is still waiting behind a running write is replaced by the newer one
+        # unless it carries history entries that still need archiving.
+        overflow = collect_history_overflow(self.store)
+        snapshot = snapshot_store(self.store)
+        self.io.submit(
+            "store",
+            save_snapshot,
+            snapshot,
+            overflow,
+            set(claimed_slots()) | set(keep),
+            on_done=self.handle_store_saved,
+            replace_pending=not overflow and not keep,
+        )
+        # Leaderboard snapshots are throttled inside record_store, so most of
+        # these jobs return without writing; a queued one is superseded.
+        self.io.submit("history", self.leaderboard_history.record_store, snapshot, replace_pending=True)
+
+    def handle_store_saved(self, refreshed: dict) -> None:
+        # Slots another program saved since we loaded them; the active slot is
+        # session-locked to this window, so it never appears here.
+        active = self.store.get("active_slot")
+        for slot, profile in refreshed.items():
+            if slot == active:
+                continue
+            if profile is None:
+                self.store["slots"].pop(slot, None)
+                self.leaderboards.remove(slot)
+            else:
+                self.store["slots"][slot] = profile
+                self.leaderboards.update(slot, profile)
+        if refreshed and isinstance(self.current_frame, SlotSelectionFrame):
+            self.current_frame.set_summaries(self.slot_summaries())
+
+    def record_answer(
+        self,
+        land: str | None,
+        question: dict,
+        choice: str,
+        correct: bool,
+        hint_used: bool,
+        latency_ms: int,
+    ) -> None:
+        if self.answers is None:
+            return
+        slot = self.store.get("active_slot") if self.store else None
+        self.answers.record(slot, land, question, choice, correct, hint_used, latency_ms)
+        if self.answers.full:
+            self.flush_answer_log()
+
+    def flush_answer_log(self) -> None:
+        pending = self.answers.detach() if self.answers is not None else None
+        if pending is not None:
+            self.io.submit("answers", write_answer_chunk, *pending)
+
+    def update_save_indicator(self, busy: bool) -> None:
+        self.save_status.configure(text="Saving…" if busy else "")
+
+    def report_io_error(self, error: BaseException, loading: bool = False) -> None:
+        if loading:
+            detail = "Progress will not be saved this session." if not self.store_writable else "Starting without it."
+            messagebox.showerror("Loading Failed", f"Could not load game data: {error}\n\n{detail}")
+        else:
+            messagebox.showerror("Save Failed", f"Could not write game data: {error}")
+
     def ensure_daily_challenge(self) -> None:
+        # Until handle_slot_selected claims it, the active slot may be open
+        # in another window and is not ours to write.
+        if self.store.get("active_slot") not in claimed_slots():
+            return
         refresh_daily_challenge(self.profile, self.quiz_bank)
-        save_profiles(self.store)
+        self.save_store()
 
     def swap_content(self, frame: ttk.Frame) -> None:
         if self.current_frame is not None:
@@ -98,7 +380,7 @@ class MathQuestApp(tk.Tk):
     def show_slot_selection(self) -> None:
         frame = SlotSelectionFrame(
             self.container,
-            store=self.store,
+            summaries=self.slot_summaries(),
             on_select=self.handle_slot_selected,
             on_reset=self.handle_slot_reset,
         )
@@ -109,16 +391,40 @@ class MathQuestApp(tk.Tk):
         self.show_quest_map()
 
     def handle_slot_selected(self, slot_name: str) -> None:
+        if not self.is_ready:
+            if isinstance(self.current_frame, SlotSelectionFrame):
+                self.current_frame.set_status(f"Loading {slot_name}… your adventure starts in a moment.")
+            self.when_ready(lambda: self.handle_slot_selected(slot_name))
+            return
+        if not claim_active_slot(slot_name):
+            if isinstance(self.current_frame, SlotSelectionFrame):
+                self.current_frame.set_status(f"{slot_name} is open in another MathQuest6 window. Close it there first.")
+            return
+        previous = self.store.get("active_slot")
+        if previous != slot_name:
+            self.timers.untrack(previous)
+        if self.store_writable:
+            reload_slot(self.store, slot_name)
         self.profile = set_active_slot(self.store, slot_name)
+        self.timers.track(slot_name, self.profile)
         reset_hint_tokens(self.profile)
-        save_profiles(self.store)
+        self.ensure_daily_challenge()
         self.show_title_screen()
 
-    def handle_slot_reset(self, slot_name: str) -> None:
+    def handle_slot_reset(self, slot_name: str) -> str | None:
+        if self.store is None:
+            return "Save data is still loading. Try again in a moment."
+        if slot_in_use(slot_name):
+            return f"{slot_name} is open in another MathQuest6 window. Close it there first."
         self.store["slots"][slot_name] = default_profile()
+        self.leaderboards.update(slot_name, self.store["slots"][slot_name])
         if self.store.get("active_slot") == slot_name:
-            set_active_slot(self.store, slot_name)
-        save_profiles(self.store)
+            self.profile = set_active_slot(self.store, slot_name)
+            self.timers.track(slot_name, self.profile)
+        self.save_store(keep=(slot_name,))
+        if isinstance(self.current_frame, SlotSelectionFrame):
+            self.current_frame.set_summaries(self.slot_summaries())
+        return None
 
     def show_title_screen(self) -> None:
         frame = TitleScreenFrame(
@@ -130,7 +436,6 @@ class MathQuestApp(tk.Tk):
         self.swap_content(frame)
 
     def show_quest_map(self) -> None:
-        self.ensure_daily_challenge()
         frame = QuestMapFrame(
             self.container,
             profile=self.profile,
@@ -139,10 +444,27 @@ class MathQuestApp(tk.Tk):
             on_open_daily=self.start_daily_challenge,
             on_claim_daily=self.claim_daily_reward_gui,
             on_toggle_daily=self.toggle_daily_visibility,
+            on_show_leaderboard=self.show_leaderboard,
+            on_show_analytics=self.show_analytics,
             show_daily=self.show_daily_card,
         )
         self.swap_content(frame)
 
+    def show_leaderboard(self) -> None:
+        frame = LeaderboardPanel(
+            self.container,
+            leaderboards=self.leaderboards,
+            active_slot=self.store.get("active_slot"),
+            on_back=self.show_quest_map,
+        )
+        self.swap_content(frame)
+
+    def show_analytics(self) -> None:
+        if self.answers is None:
+            return
+        frame = AnalyticsPanel(self.container, rollups=self.answers.rollups, on_back=self.show_quest_map)
+        self.swap_content(frame)
+
     def open_lesson(self, land: str) -> None:
         self.selected_land = land
         lesson = self.lessons.get(land)
@@ -161,7 +483,8 @@ class MathQuestApp(tk.Tk):
         frame = BattleFrame(
             self.container,
             profile=self.profile,
-            store=self.store,
+            on_save=self.save_store,
+            on_answer=self.record_answer,
             land=land,
             questions=questions,
             on_back=self.open_lesson if land else self.show_quest_map,
@@ -199,7 +522,8 @@ class MathQuestApp(tk.Tk):
         frame = BattleFrame(
             self.container,
             profile=self.profile,
-            store=self.store,
+            on_save=self.save_store,
+            on_answer=self.record_answer,
             land=land,
             questions=questions,
             on_back=back_to_map,
@@ -221,9 +545,10 @@ class MathQuestApp(tk.Tk):
                 messagebox.showinfo("Daily Challenge", "Daily challenge complete! Visit the map to claim your reward.")
             else:
                 messagebox.showinfo("Daily Challenge", "Daily challenge already marked as complete for today.")
-            save_profiles(self.store)
+            self.save_store()
         else:
             remaining_hearts = consume_retry_heart(self.profile)
+            self.timers.watch_hearts(self.store["active_slot"])
             if remaining_hearts > 0:
                 messagebox.showinfo(
                     "Daily Challenge",
@@ -238,7 +563,7 @@ class MathQuestApp(tk.Tk):
                     "All retry hearts spent. Rest for "
                     f"{minutes:02d}:{seconds:02d} before your next attempt.",
                 )
-            save_profiles(self.store)
+            self.save_store()
 
     def claim_daily_reward_gui(self) -> None:
         reward = claim_daily_reward(self.profile)
@@ -259,7 +584,7 @@ class MathQuestApp(tk.Tk):
         else:
             parts.append("Reward claimed! Keep the streak going.")
         messagebox.showinfo("Daily Challenge", "\n".join(parts))
-        save_profiles(self.store)
+        self.save_store()
         self.ensure_daily_challenge()
         self.show_quest_map()
 
@@ -278,12 +603,12 @@ class SlotSelectionFrame(ttk.Frame):
     def __init__(
         self,
         master: ttk.Frame,
-        store: dict,
+        summaries: list,
         on_select,
         on_reset,
     ) -> None:
         super().__init__(master)
-        self.store = store
+        self.summaries = summaries
         self.on_select = on_select
         self.on_reset = on_reset
 
@@ -332,14 +657,21 @@ class SlotSelectionFrame(ttk.Frame):
         self.listbox.bind("<Double-Button-1>", lambda _evt: self.handle_select())
 
     def populate_slots(self) -> None:
+        selection = self.listbox.curselection()
         self.listbox.delete(0, tk.END)
-        slots = list_slots(self.store)
-        for index, slot_name in enumerate(slots, start=1):
-            profile = self.store["slots"].get(slot_name)
-            summary = summarise_slot(slot_name, profile)
-            self.listbox.insert(tk.END, f"{index}. {summary}")
-        if slots:
-            self.listbox.selection_set(0)
+        for index, (slot_name, summary) in enumerate(self.summaries, start=1):
+            self.listbox.insert(tk.END, f"{index}. {summarise_slot(slot_name, summary)}")
+        if not self.summaries:
+            self.listbox.insert(tk.END, "Loading save slots…")
+            return
+        self.listbox.selection_set(selection[0] if selection and selection[0] < len(self.summaries) else 0)
+
+    def set_summaries(self, summaries: list) -> None:
+        self.summaries = summaries
+        self.populate_slots()
+
+    def set_status(self, text: str) -> None:
+        self.status.configure(text=text)
 
     def selected_slot(self) -> str | None:
         selection = self.listbox.curselection()
@@ -347,8 +679,9 @@ class SlotSelectionFrame(ttk.Frame):
             self.status.configure(text="Please select a slot first.")
             return None
         index = selection[0]
-        slot_name = list_slots(self.store)[index]
-        return slot_name
+        if index >= len(self.summaries):
+            return None
+        return self.summaries[index][0]
 
     def handle_select(self) -> None:
         slot_name = self.selected_slot()
@@ -360,8 +693,10 @@ class SlotSelectionFrame(ttk.Frame):
         slot_name = self.selected_slot()
         if slot_name is None:
             return
-        self.on_reset(slot_name)
-        self.populate_slots()
+        problem = self.on_reset(slot_name)
+        if problem:
+            self.status.configure(text=problem)
+            return
         self.status.configure(text=f"{slot_name} reset. Ready for a fresh quest!")
 
 
@@ -429,6 +764,9 @@ class ComingSoonFrame(ttk.Frame):
 
 
 class QuestMapFrame(ttk.Frame):
+    COLUMNS = 3
+    ROW_HEIGHT = 270
+
     def __init__(
         self,
         master: ttk.Frame,
@@ -438,6 +776,8 @@ class QuestMapFrame(ttk.Frame):
         on_open_daily,
         on_claim_daily,
         on_toggle_daily,
+        on_show_leaderboard,
+        on_show_analytics,
         show_daily: bool,
     ) -> None:
         super().__init__(master)
@@ -447,6 +787,8 @@ class QuestMapFrame(ttk.Frame):
         ttk.Label(header_row, text="Quest Map", style="Header.TLabel").pack(side="left")
         toggle_text = "Hide Daily Challenge" if show_daily else "Show Daily Challenge"
         ttk.Button(header_row, text=toggle_text, command=on_toggle_daily).pack(side="right")
+        ttk.Button(header_row, text="Leaderboard", command=on_show_leaderboard).pack(side="right", padx=(0, 12))
+        ttk.Button(header_row, text="Analytics", command=on_show_analytics).pack(side="right", padx=(0, 12))
 
         challenge = profile.get("daily_challenge") or {}
         stats = profile.get("daily_stats") or {}
@@ -465,12 +807,7 @@ class QuestMapFrame(ttk.Frame):
         streak_best = stats.get("streak_best", 0)
         hearts = get_retry_hearts(profile)
         cooldown_seconds = retry_cooldown_remaining(profile) if hearts <= 0 else 0
-        if cooldown_seconds:
-            minutes = cooldown_seconds // 60
-            seconds = cooldown_seconds % 60
-            cooldown_label = f"Cooldown {minutes:02d}:{seconds:02d}"
-        else:
-            cooldown_label = "Ready"
+        self.hearts_var = tk.StringVar(value=format_hearts_line(hearts, cooldown_seconds))
 
         if show_daily:
             daily_card = ttk.Frame(self, padding=18, style="Card.TFrame")
@@ -502,7 +839,7 @@ class QuestMapFrame(ttk.Frame):
             ).pack(anchor="w")
             ttk.Label(
                 daily_card,
-                text=f"{HP_EMOJI} Retry Hearts: {hearts}/{RETRY_MAX_HEARTS} — {cooldown_label}",
+                textvariable=self.hearts_var,
                 style="CardBody.TLabel",
             ).pack(anchor="w", pady=(0, 12))
 
@@ -540,110 +877,102 @@ class QuestMapFrame(ttk.Frame):
         )
         instructions.pack(pady=(0, 24))
 
-        canvas = tk.Canvas(self, background="#1f1f2e", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=canvas.yview)
-        scroll_frame = ttk.Frame(canvas)
-
-        scroll_frame_id = canvas.create_window((0, 0), window=scroll_frame, anchor="nw")
-
-        def configure_scroll_region(_event=None):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-
-        def resize_frame(event):
-            canvas.itemconfigure(scroll_frame_id, width=event.width)
-
-        scroll_frame.bind("<Configure>", configure_scroll_region)
-        canvas.bind("<Configure>", resize_frame)
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        mousewheel_bound = False
-
-        def on_mousewheel(event: tk.Event) -> None:
-            nonlocal mousewheel_bound
-            if event.delta:
-                steps = int(event.delta / 120)
-                if steps == 0:
-                    steps = 1 if event.delta > 0 else -1
-                canvas.yview_scroll(-steps, "units")
-            elif getattr(event, "num", None) in (4, 5):
-                canvas.yview_scroll(-1 if event.num == 4 else 1, "units")
-
-        def bind_mousewheel(_event: tk.Event) -> None:
-            nonlocal mousewheel_bound
-            if mousewheel_bound:
-                return
-            canvas.bind_all("<MouseWheel>", on_mousewheel)
-            canvas.bind_all("<Button-4>", on_mousewheel)
-            canvas.bind_all("<Button-5>", on_mousewheel)
-            mousewheel_bound = True
-
-        def unbind_mousewheel(_event: tk.Event) -> None:
-            nonlocal mousewheel_bound
-            if not mousewheel_bound:
-                return
-            canvas.unbind_all("<MouseWheel>")
-            canvas.unbind_all("<Button-4>")
-            canvas.unbind_all("<Button-5>")
-            mousewheel_bound = False
-
-        scroll_frame.bind("<Enter>", bind_mousewheel)
-        scroll_frame.bind("<Leave>", unbind_mousewheel)
-        scroll_frame.bind("<Destroy>", unbind_mousewheel)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        grid = ttk.Frame(scroll_frame)
-        grid.pack(fill="both", expand=True)
-
-        for col in range(3):
-            grid.grid_columnconfigure(col, weight=1, uniform="col")
-
-        unlocked_lands = set(profile.get("unlocked_lands", []))
-        badges = set(profile.get("badges", []))
-
-        for index, land in enumerate(LANDS):
-            row = index // 3
-            column = index % 3
-            unlocked = land in unlocked_lands
-            palette = COLOR_PALETTES.get(land, {})
-            emoji = palette.get("emoji", "📘")
-            badge_name = f"{land} Master"
-            has_badge = badge_name in badges
-
-            card = ttk.Frame(grid, padding=18, style="Card.TFrame")
-            card.grid(row=row, column=column, padx=12, pady=12, sticky="nsew")
-
-            title = ttk.Label(card, text=f"{emoji} {land}", style="CardHeader.TLabel")
-            title.pack(anchor="w")
-
-            status = "✅ Unlocked" if unlocked else "🔒 Locked"
-            status_label = ttk.Label(card, text=status, style="CardBody.TLabel")
-            status_label.pack(anchor="w", pady=(6, 4))
-
-            badge_text = "Badge earned!" if has_badge else "Badge pending"
-            ttk.Label(card, text=badge_text, style="Dim.TLabel").pack(anchor="w", pady=(0, 8))
-
-            description = ttk.Label(
-                card,
-                text="Story lesson and battle currently playable in console mode."
-                " GUI version coming soon!",
-                style="CardBody.TLabel",
-            )
-            description.pack(anchor="w", pady=(0, 16))
-
-            enter_btn = ttk.Button(
-                card,
-                text="Enter",
-                style="Accent.TButton" if unlocked else "TButton",
-                command=lambda l=land: on_open_land(l),
-                state=tk.NORMAL if unlocked else tk.DISABLED,
-            )
-            enter_btn.pack(anchor="w")
+        self.on_open_land = on_open_land
+        self.unlocked_lands = set(profile.get("unlocked_lands", []))
+        self.badges = set(profile.get("badges", []))
+        self.lands = list(LANDS)
+
+        self.land_list = VirtualList(
+            self,
+            row_height=self.ROW_HEIGHT,
+            create_row=self.create_land_row,
+            render_row=self.render_land_row,
+        )
+        self.land_list.pack(fill="both", expand=True)
+        self.land_list.set_row_count(-(-len(self.lands) // self.COLUMNS))
 
         back_btn = ttk.Button(self, text="Back", command=on_back)
         back_btn.pack(pady=(24, 0))
 
+    def update_hearts(self, hearts: int, cooldown_seconds: int) -> None:
+        self.hearts_var.set(format_hearts_line(hearts, cooldown_seconds))
+
+    def create_land_row(self, parent: tk.Misc) -> "LandCardRow":
+        return LandCardRow(parent, columns=self.COLUMNS, on_open_land=self.on_open_land)
+
+    def render_land_row(self, row: "LandCardRow", index: int) -> None:
+        for column, card in enumerate(row.cards):
+            land_index = index * self.COLUMNS + column
+            if land_index >= len(self.lands):
+                card.clear()
+                continue
+            land = self.lands[land_index]
+            card.show(
+                land,
+                unlocked=land in self.unlocked_lands,
+                has_badge=f"{land} Master" in self.badges,
+            )
+
+
+class LandCardRow(ttk.Frame):
+    def __init__(self, master: tk.Misc, columns: int, on_open_land) -> None:
+        super().__init__(master)
+        self.grid_rowconfigure(0, weight=1)
+        self.cards: list[LandCard] = []
+        for column in range(columns):
+            self.grid_columnconfigure(column, weight=1, uniform="col")
+            card = LandCard(self, on_open_land=on_open_land)
+            card.grid(row=0, column=column, padx=12, pady=12, sticky="nsew")
+            self.cards.append(card)
+
+
+class LandCard(ttk.Frame):
+    def __init__(self, master: tk.Misc, on_open_land) -> None:
+        super().__init__(master, padding=18, style="Card.TFrame")
+        self.on_open_land = on_open_land
+        self.land: str | None = None
+        self.hidden = False
+
+        self.title = ttk.Label(self, style="CardHeader.TLabel")
+        self.title.pack(anchor="w")
+        self.status = ttk.Label(self, style="CardBody.TLabel")
+        self.status.pack(anchor="w", pady=(6, 4))
+        self.badge = ttk.Label(self, style="Dim.TLabel")
+        self.badge.pack(anchor="w", pady=(0, 8))
+        self.description = ttk.Label(
+            self,
+            text="Story lesson and battle currently playable in console mode."
+            " GUI version coming soon!",
+            style="CardBody.TLabel",
+        )
+        self.description.pack(anchor="w", pady=(0, 16))
+        self.enter_btn = ttk.Button(self, text="Enter", command=self.handle_enter)
+        self.enter_btn.pack(anchor="w")
+
+    def show(self, land: str, unlocked: bool, has_badge: bool) -> None:
+        self.land = land
+        emoji = COLOR_PALETTES.get(land, {}).get("emoji", "📘")
+        self.title.configure(text=f"{emoji} {land}")
+        self.status.configure(text="✅ Unlocked" if unlocked else "🔒 Locked")
+        self.badge.configure(text="Badge earned!" if has_badge else "Badge pending")
+        self.enter_btn.configure(
+            style="Accent.TButton" if unlocked else "TButton",
+            state=tk.NORMAL if unlocked else tk.DISABLED,
+        )
+        if self.hidden:
+            self.grid()
+            self.hidden = False
+
+    def clear(self) -> None:
+        self.land = None
+        if not self.hidden:
+            self.grid_remove()
+            self.hidden = True
+
+    def handle_enter(self) -> None:
+        if self.land:
+            self.on_open_land(self.land)
+
 
 class LessonFrame(ttk.Frame):
     def __init__(self, master: ttk.Frame, land: str, lesson: dict | None, on_back, on_start_battle) -> None:
@@ -699,7 +1028,8 @@ class BattleFrame(ttk.Frame):
         self,
         master: ttk.Frame,
         profile: dict,
-        store: dict,
+        on_save,
+        on_answer,
         land: str | None,
         questions: list,
         on_back,
@@ -710,7 +1040,9 @@ class BattleFrame(ttk.Frame):
     ) -> None:
         super().__init__(master)
         self.profile = profile
-        self.store = store
+        self.on_save = on_save
+        self.on_answer = on_answer
+        self.asked_at = perf_counter()
         self.land = land
         self.questions = questions or []
         self.on_back = on_back
@@ -749,7 +1081,13 @@ class BattleFrame(ttk.Frame):
 
         self.options_frame = ttk.Frame(self)
         self.options_frame.pack(fill="x")
+        self.option_keys: list[str] = []
         self.option_buttons: list[ttk.Button] = []
+        self.option_pool: WidgetPool[ttk.Button] = WidgetPool(
+            factory=self.create_option_button,
+            show=lambda button: button.pack(fill="x", pady=4),
+            hide=lambda button: button.pack_forget(),
+        )
 
         control_row = ttk.Frame(self)
         control_row.pack(fill="x", pady=(16, 0))
@@ -811,6 +1149,7 @@ class BattleFrame(ttk.Frame):
 
     def render_question(self) -> None:
         self.hint_used = False
+        self.asked_at = perf_counter()
         question = self.questions[self.current_index]
         self.progress_var.set(f"Challenge {self.current_index + 1} of {self.total_questions}")
         creature = question.get("creature")
@@ -821,29 +1160,39 @@ class BattleFrame(ttk.Frame):
         self.next_button.configure(state=tk.DISABLED)
         self.update_stats()
 
+    def create_option_button(self, index: int) -> ttk.Button:
+        return ttk.Button(
+            self.options_frame,
+            command=lambda slot=index: self.handle_option(slot),
+            style="Accent.TButton",
+        )
+
     def refresh_option_buttons(self, question: dict) -> None:
-        for button in self.option_buttons:
-            button.destroy()
-        self.option_buttons.clear()
         options = question.get("options", {})
-        for key in sorted(options.keys()):
-            text = options[key]
-            btn = ttk.Button(
-                self.options_frame,
-                text=f"{key.upper()}) {text}",
-                command=lambda choice=key: self.handle_answer(choice),
-                style="Accent.TButton",
-            )
-            btn.pack(fill="x", pady=4)
-            self.option_buttons.append(btn)
+        self.option_keys = sorted(options.keys())
+        self.option_buttons = self.option_pool.acquire(len(self.option_keys))
+        for button, key in zip(self.option_buttons, self.option_keys):
+            button.configure(text=f"{key.upper()}) {options[key]}", state=tk.NORMAL)
         self.hint_button.configure(state=tk.NORMAL if self.profile.get("hint_tokens", {}).get(self.land, 0) > 0 else tk.DISABLED)
 
+    def handle_option(self, index: int) -> None:
+        if index < len(self.option_keys):
+            self.handle_answer(self.option_keys[index])
+
     def handle_answer(self, choice: str) -> None:
         if self.battle_over:
             return
         question = self.questions[self.current_index]
         correct_choice = question.get("answer")
         is_correct = choice == correct_choice
+        self.on_answer(
+            self.land,
+            question,
+            choice,
+            is_correct,
+            self.hint_used,
+            int((perf_counter() - self.asked_at) * 1000),
+        )
         explanation = question.get("explanation", "")
         xp_delta = XP_CORRECT if is_correct else XP_INCORRECT
         current_xp, leveled = apply_xp_change(self.profile, xp_delta)
@@ -891,7 +1240,7 @@ class BattleFrame(ttk.Frame):
         next_land = None
         if accuracy >= 0.6 and self.hp > 0:
             next_land = unlock_next_land(self.profile, LANDS, self.land)
-        save_profiles(self.store)
+        self.on_save()
 
         summary_lines = [
             f"Accuracy: {accuracy * 100:.0f}% — {mood}",
@@ -903,9 +1252,9 @@ class BattleFrame(ttk.Frame):
         if self.hp <= 0:
             summary_lines.append("Regroup and try again when you're ready.")
 
-        for child in self.options_frame.winfo_children():
-            child.destroy()
-        self.option_buttons.clear()
+        self.option_pool.release_all()
+        self.option_keys = []
+        self.option_buttons = []
         self.question_var.set(f"Total Correct: {self.correct_answers}/{self.total_questions}")
         self.creature_var.set("")
         self.feedback_var.set("\n".join(summary_lines))
@@ -930,7 +1279,7 @@ class BattleFrame(ttk.Frame):
             self.on_result(success)
 
     def handle_finish(self) -> None:
-        save_profiles(self.store)
+        self.on_save()
         self.on_finish()
 
     def update_stats(self) -> None:
@@ -943,10 +1292,39 @@ class BattleFrame(ttk.Frame):
 
 
 
-def summarise_slot(slot_name: str, profile: dict | None) -> str:
-    if profile is None:
+def format_hearts_line(hearts: int, cooldown_seconds: int) -> str:
+    if cooldown_seconds:
+        minutes = cooldown_seconds // 60
+        seconds = cooldown_seconds % 60
+        cooldown_label = f"Cooldown {minutes:02d}:{seconds:02d}"
+    else:
+        cooldown_label = "Ready"
+    return f"{HP_EMOJI} Retry Hearts: {hearts}/{RETRY_MAX_HEARTS} — {cooldown_label}"
+
+
+def summarise_slot(slot_name: str, summary: dict | None) -> str:
+    if summary is None:
         return f"{slot_name} — Empty"
-    name = profile.get("player_name") or "Hero"
-    level = profile.get("level", 1)
-    lands = len(profile.get("unlocked_lands", []))
+    name = summary.get("player_name") or "Hero"
+    level = summary.get("level", 1)
+    lands = summary.get("unlocked_count", 0)
     return f"{slot_name} — {name} (Lv {level}, {lands} lands)"
+
+
+STARTUP_METRICS_ENV = "MATHQUEST_STARTUP_METRICS"
+
+
+def write_startup_metrics(metrics: dict) -> None:
+    # Opt-in: set MATHQUEST_STARTUP_METRICS to a file path to append one JSON
+    # line per launch, so cold-start numbers can be compared across releases.
+    target = os.environ.get(STARTUP_METRICS_ENV)
+    if not target:
+        return
+    record = {
+        "recorded_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **metrics,
+    }
+    with Path(target).open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
@@ -0,0 +1,135 @@
+import queue
+import threading
+import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List
+
+
+class IOJob:
+    __slots__ = ("func", "args", "on_done", "on_error", "replaceable")
+
+    def __init__(self, func: Callable, args: tuple, on_done, on_error, replaceable: bool) -> None:
+        self.func = func
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.replaceable = replaceable
+
+
+class IOExecutor:
+    # Runs disk work on a small thread pool and hands results back to Tk.
+    # Jobs sharing a lane run strictly one after another in submission order;
+    # different lanes run in parallel. Callbacks always run on the Tk thread,
+    # from a queue drained with after() while work is outstanding.
+    POLL_MS = 30
+
+    def __init__(
+        self,
+        root: tk.Misc,
+        max_workers: int = 2,
+        on_busy_changed: Callable[[bool], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> None:
+        self.root = root
+        self.on_busy_changed = on_busy_changed
+        self.default_on_error = on_error
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mathquest-io")
+        self.results: "queue.Queue[tuple]" = queue.Queue()
+        self.lanes: Dict[str, Deque[IOJob]] = {}
+        self.lock = threading.Condition()
+        self.pending = 0
+        self.poll_id: str | None = None
+        self.closed = False
+
+    @property
+    def busy(self) -> bool:
+        return self.pending > 0
+
+    def submit(
+        self,
+        lane: str,
+        func: Callable[..., Any],
+        *args: Any,
+        on_done: Callable[[Any], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+        replace_pending: bool = False,
+    ) -> None:
+        if self.closed:
+            raise RuntimeError("IOExecutor is shut down")
+        job = IOJob(func, args, on_done, on_error, replace_pending)
+        with self.lock:
+            jobs = self.lanes.setdefault(lane, deque())
+            # A queued save superseded by a newer snapshot never needs to run;
+            # the head of the lane is already running and is left alone.
+            if replace_pending and len(jobs) > 1 and jobs[-1].replaceable:
+                jobs[-1] = job
+                start = False
+            else:
+                jobs.append(job)
+                start = len(jobs) == 1
+                self.pending += 1
+        if start:
+            self.pool.submit(self._run_lane, lane, job)
+        self._notify_busy()
+        self._schedule_poll()
+
+    def _run_lane(self, lane: str, job: IOJob) -> None:
+        while job is not None:
+            try:
+                result = job.func(*job.args)
+            except BaseException as exc:  # delivered to the Tk thread
+                self.results.put((job, None, exc))
+            else:
+                self.results.put((job, result, None))
+            with self.lock:
+                jobs = self.lanes[lane]
+                jobs.popleft()
+                if jobs:
+                    job = jobs[0]
+                else:
+                    del self.lanes[lane]
+                    job = None
+                    self.lock.notify_all()
+
+    def _schedule_poll(self) -> None:
+        if self.poll_id is None and self.pending:
+            self.poll_id = self.root.after(self.POLL_MS, self.drain)
+
+    def drain(self) -> None:
+        self.poll_id = None
+        completed: List[tuple] = []
+        while True:
+            try:
+                completed.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        for job, result, error in completed:
+            self.pending -= 1
+            if error is not None:
+                handler = job.on_error or self.default_on_error
+                if handler is not None:
+                    handler(error)
+            elif job.on_done is not None:
+                job.on_done(result)
+        if completed:
+            self._notify_busy()
+        self._schedule_poll()
+
+    def _notify_busy(self) -> None:
+        if self.on_busy_changed is not None:
+            self.on_busy_changed(self.busy)
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        with self.lock:
+            idle = self.lock.wait_for(lambda: not self.lanes, timeout=timeout)
+        self.drain()
+        return idle
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        self.wait_idle(timeout)
+        self.closed = True
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,130 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict
+
+from gui_app.virtual_list import VirtualList
+from leaderboards import DEFAULT_BOARD, Leaderboards
+
+LEADERBOARD_PAGE_SIZE = 25
+
+LEADERBOARD_COLUMNS = [
+    ("Rank", 6),
+    ("Adventurer", 22),
+    ("Score", 16),
+    ("Lv", 4),
+    ("XP", 6),
+    ("Badges", 8),
+    ("Best Streak", 12),
+    ("Daily Clears", 12),
+]
+
+
+class LeaderboardRow(ttk.Frame):
+    def __init__(self, master: tk.Misc) -> None:
+        super().__init__(master, padding=(12, 4), style="Card.TFrame")
+        self.labels: list[ttk.Label] = []
+        for column, (_title, width) in enumerate(LEADERBOARD_COLUMNS):
+            label = ttk.Label(self, width=width, style="CardBody.TLabel")
+            label.grid(row=0, column=column, sticky="w")
+            self.labels.append(label)
+
+    def show(self, rank: int, entry: Dict, score: str, mine: bool = False) -> None:
+        values = [
+            f"▶ {rank}" if mine else str(rank),
+            entry.get("player_name", "Hero"),
+            score,
+            str(entry.get("level", 1)),
+            str(entry.get("xp", 0)),
+            str(entry.get("badge_count", 0)),
+            str(entry.get("streak_best", 0)),
+            str(entry.get("total_dailies", 0)),
+        ]
+        for label, value in zip(self.labels, values):
+            label.configure(text=value)
+
+
+class LeaderboardPanel(ttk.Frame):
+    ROW_HEIGHT = 40
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        leaderboards: Leaderboards,
+        active_slot: str | None,
+        on_back,
+        board_name: str = DEFAULT_BOARD,
+    ) -> None:
+        super().__init__(master)
+        self.leaderboards = leaderboards
+        self.active_slot = active_slot
+        self.titles = {spec.title: name for name, spec in leaderboards.specs.items()}
+        self.board_var = tk.StringVar(value=leaderboards.specs[board_name].title)
+        self.rank_var = tk.StringVar()
+        self.empty_var = tk.StringVar()
+        self.page_var = tk.StringVar()
+
+        header_row = ttk.Frame(self)
+        header_row.pack(fill="x", pady=(0, 8))
+        ttk.Label(header_row, text="🏆 Leaderboard", style="Header.TLabel").pack(side="left")
+        picker = ttk.Combobox(header_row, textvariable=self.board_var, values=list(self.titles), state="readonly", width=28)
+        picker.pack(side="right")
+        picker.bind("<<ComboboxSelected>>", lambda _event: self.select_board(self.titles[self.board_var.get()]))
+        ttk.Label(self, textvariable=self.rank_var, style="Dim.TLabel").pack(pady=(0, 16))
+
+        header = ttk.Frame(self, padding=(12, 4))
+        header.pack(fill="x")
+        for column, (title, width) in enumerate(LEADERBOARD_COLUMNS):
+            ttk.Label(header, text=title, width=width, style="Dim.TLabel").grid(row=0, column=column, sticky="w")
+
+        ttk.Label(self, textvariable=self.empty_var, style="Body.TLabel").pack()
+
+        self.rows = VirtualList(
+            self,
+            row_height=self.ROW_HEIGHT,
+            create_row=LeaderboardRow,
+            render_row=self.render_row,
+            on_scroll=self.update_page_label,
+        )
+        self.rows.pack(fill="both", expand=True, pady=(4, 0))
+
+        controls = ttk.Frame(self)
+        controls.pack(fill="x", pady=(16, 0))
+        ttk.Button(controls, text="◀ Prev", command=lambda: self.turn_page(-1)).pack(side="left")
+        ttk.Button(controls, text="Next ▶", command=lambda: self.turn_page(1)).pack(side="left", padx=(12, 0))
+        ttk.Button(controls, text="Find Me", command=self.find_me).pack(side="left", padx=(12, 0))
+        ttk.Label(controls, textvariable=self.page_var, style="Body.TLabel").pack(side="left", padx=(18, 0))
+        ttk.Button(controls, text="Back", command=on_back).pack(side="right")
+
+        self.select_board(board_name)
+
+    def select_board(self, name: str) -> None:
+        self.spec = self.leaderboards.specs[name]
+        self.board = self.leaderboards.board(name)
+        self.rank = self.board.rank_of(self.active_slot) if self.active_slot else None
+        self.rank_var.set(f"Your rank: #{self.rank} of {len(self.board)}" if self.rank else f"{len(self.board)} adventurers")
+        self.empty_var.set("" if len(self.board) else "No adventurers qualify for this board yet. Complete quests to claim a spot!")
+        self.rows.set_row_count(len(self.board))
+        self.rows.scroll_to(0)
+        self.update_page_label(0)
+
+    def find_me(self) -> None:
+        if self.rank:
+            self.rows.scroll_to(self.rank - 1)
+
+    def page_count(self) -> int:
+        return max(1, -(-len(self.board) // LEADERBOARD_PAGE_SIZE))
+
+    def current_page(self) -> int:
+        return min(self.page_count() - 1, self.rows.first_visible_index() // LEADERBOARD_PAGE_SIZE)
+
+    def turn_page(self, step: int) -> None:
+        page = min(self.page_count() - 1, max(0, self.current_page() + step))
+        self.rows.scroll_to(page * LEADERBOARD_PAGE_SIZE)
+
+    def update_page_label(self, first_index: int) -> None:
+        page = min(self.page_count() - 1, first_index // LEADERBOARD_PAGE_SIZE)
+        self.page_var.set(f"Page {page + 1} of {self.page_count()}")
+
+    def render_row(self, row: LeaderboardRow, index: int) -> None:
+        entry = self.board.entry_at(index + 1)
+        row.show(index + 1, entry, self.spec.score(entry), mine=entry["slot"] == self.active_slot)
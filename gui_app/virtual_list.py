@@ -0,0 +1,151 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Tuple
+
+
+class VirtualList(ttk.Frame):
+    # Only rows inside the viewport (plus ``overscan`` on each side) own a
+    # widget. Rows that scroll out are hidden and handed to the next row that
+    # scrolls in, so per-frame work depends on the viewport, not row_count.
+    def __init__(
+        self,
+        master: tk.Misc,
+        row_height: int,
+        create_row: Callable[[tk.Misc], tk.Widget],
+        render_row: Callable[[tk.Widget, int], None],
+        overscan: int = 2,
+        background: str = "#1f1f2e",
+        on_scroll: Callable[[int], None] | None = None,
+    ) -> None:
+        super().__init__(master)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.render_row = render_row
+        self.overscan = overscan
+        self.on_scroll = on_scroll
+        self.row_count = 0
+        self.row_width = 1
+        self.visible_rows: Dict[int, Tuple[tk.Widget, int]] = {}
+        self.spare_rows: List[Tuple[tk.Widget, int]] = []
+        self.mousewheel_bound = False
+
+        self.canvas = tk.Canvas(
+            self,
+            background=background,
+            highlightthickness=0,
+            yscrollincrement=max(1, row_height // 4),
+        )
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_view_changed)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.bind("<Enter>", self.bind_mousewheel)
+        self.bind("<Leave>", self.handle_leave)
+        self.bind("<Destroy>", self.unbind_mousewheel)
+
+    def set_row_count(self, count: int) -> None:
+        self.row_count = max(0, count)
+        self.canvas.configure(scrollregion=(0, 0, self.row_width, self.row_count * self.row_height))
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        for index, (widget, _item) in list(self.visible_rows.items()):
+            if index >= self.row_count:
+                self.recycle(index)
+            else:
+                self.render_row(widget, index)
+        self.refresh()
+
+    def scroll_to(self, index: int) -> None:
+        total = self.row_count * self.row_height
+        if total <= 0:
+            return
+        self.canvas.yview_moveto(max(0, index) * self.row_height / total)
+
+    def first_visible_index(self) -> int:
+        return int(self.canvas.canvasy(0) // self.row_height)
+
+    def visible_range(self) -> range:
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.row_height)
+        first = max(0, int(top // self.row_height) - self.overscan)
+        last = min(self.row_count, int((top + height) // self.row_height) + 1 + self.overscan)
+        return range(first, last)
+
+    def refresh(self) -> None:
+        wanted = self.visible_range()
+        for index in list(self.visible_rows):
+            if index not in wanted:
+                self.recycle(index)
+        for index in wanted:
+            if index in self.visible_rows:
+                continue
+            widget, item = self.spare_rows.pop() if self.spare_rows else self.new_row()
+            self.canvas.coords(item, 0, index * self.row_height)
+            self.canvas.itemconfigure(item, state="normal")
+            self.render_row(widget, index)
+            self.visible_rows[index] = (widget, item)
+        if self.on_scroll is not None:
+            self.on_scroll(self.first_visible_index())
+
+    def new_row(self) -> Tuple[tk.Widget, int]:
+        widget = self.create_row(self.canvas)
+        item = self.canvas.create_window(
+            (0, 0),
+            window=widget,
+            anchor="nw",
+            width=self.row_width,
+            height=self.row_height,
+        )
+        return widget, item
+
+    def recycle(self, index: int) -> None:
+        widget, item = self.visible_rows.pop(index)
+        self.canvas.itemconfigure(item, state="hidden")
+        self.spare_rows.append((widget, item))
+
+    def on_view_changed(self, first: str, last: str) -> None:
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def on_resize(self, event: tk.Event) -> None:
+        self.row_width = event.width
+        for _widget, item in list(self.visible_rows.values()) + self.spare_rows:
+            self.canvas.itemconfigure(item, width=event.width)
+        self.canvas.configure(scrollregion=(0, 0, self.row_width, self.row_count * self.row_height))
+        self.refresh()
+
+    def on_mousewheel(self, event: tk.Event) -> None:
+        if event.delta:
+            steps = int(event.delta / 120)
+            if steps == 0:
+                steps = 1 if event.delta > 0 else -1
+            self.canvas.yview_scroll(-steps, "units")
+        elif getattr(event, "num", None) in (4, 5):
+            self.canvas.yview_scroll(-1 if event.num == 4 else 1, "units")
+
+    def bind_mousewheel(self, _event: tk.Event | None = None) -> None:
+        if self.mousewheel_bound:
+            return
+        self.canvas.bind_all("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind_all("<Button-4>", self.on_mousewheel)
+        self.canvas.bind_all("<Button-5>", self.on_mousewheel)
+        self.mousewheel_bound = True
+
+    def handle_leave(self, event: tk.Event) -> None:
+        # Moving onto a row widget also reports <Leave>; keep the wheel bound
+        # while the pointer is still over one of our descendants.
+        hovered = self.winfo_containing(event.x_root, event.y_root)
+        if hovered is not None and str(hovered).startswith(str(self)):
+            return
+        self.unbind_mousewheel()
+
+    def unbind_mousewheel(self, _event: tk.Event | None = None) -> None:
+        if not self.mousewheel_bound:
+            return
+        self.canvas.unbind_all("<MouseWheel>")
+        self.canvas.unbind_all("<Button-4>")
+        self.canvas.unbind_all("<Button-5>")
+        self.mousewheel_bound = False
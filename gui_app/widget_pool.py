@@ -0,0 +1,33 @@
+import tkinter as tk
+from typing import Callable, Generic, List, TypeVar
+
+W = TypeVar("W", bound=tk.Widget)
+
+
+# Visible widgets are always a prefix of the pool: hiding from the tail and
+# re-showing in index order keeps the pack order stable without repacking.
+class WidgetPool(Generic[W]):
+    def __init__(
+        self,
+        factory: Callable[[int], W],
+        show: Callable[[W], None],
+        hide: Callable[[W], None],
+    ) -> None:
+        self.factory = factory
+        self.show = show
+        self.hide = hide
+        self.widgets: List[W] = []
+        self.active = 0
+
+    def acquire(self, count: int) -> List[W]:
+        while len(self.widgets) < count:
+            self.widgets.append(self.factory(len(self.widgets)))
+        for index in range(self.active, count):
+            self.show(self.widgets[index])
+        for index in range(count, self.active):
+            self.hide(self.widgets[index])
+        self.active = count
+        return self.widgets[:count]
+
+    def release_all(self) -> None:
+        self.acquire(0)
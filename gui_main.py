@@ -1,8 +1,12 @@
-from gui_app.app import MathQuestApp
+from time import perf_counter
+
+STARTED_AT = perf_counter()
+
+from gui_app.app import MathQuestApp  # noqa: E402 - start the clock before the GUI imports
 
 
 def main() -> None:
-    app = MathQuestApp()
+    app = MathQuestApp(started_at=STARTED_AT)
     app.run()
 
 
@@ -0,0 +1,228 @@
+import gzip
+import heapq
+import json
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from durable_io import commit_path
+from file_locks import FileLock
+from game_utils import (
+    SECONDS_PER_DAY,
+    XP_LEVEL_THRESHOLD,
+    iso_to_day,
+    leaderboard_entry,
+    leaderboard_sort_key,
+    utc_epoch,
+)
+
+LEADERBOARD_HISTORY_DIR = Path("leaderboard_history")
+KEYFRAME_INTERVAL = 48
+SNAPSHOT_MIN_SECONDS = 15 * 60
+
+# Fields kept per slot; ranks are derived from these at query time, because
+# one player moving up shifts the rank of everyone they pass.
+SNAPSHOT_FIELDS = ("level", "xp", "streak_best", "total_dailies", "player_name")
+
+State = Dict[str, Tuple]
+
+
+def entry_values(entry: Dict) -> Tuple:
+    return tuple(entry[field] for field in SNAPSHOT_FIELDS)
+
+
+def total_xp(values: Tuple) -> int:
+    # Profile XP wraps at each level-up, so gains are measured on the total.
+    level, xp = values[0], values[1]
+    return (level - 1) * XP_LEVEL_THRESHOLD + xp
+
+
+def store_state(store: Dict) -> State:
+    return {
+        slot: entry_values(leaderboard_entry(slot, profile))
+        for slot, profile in store.get("slots", {}).items()
+        if profile
+    }
+
+
+def segment_start(path: Path) -> int:
+    return int(path.name[len("segment-") :].split(".", 1)[0])
+
+
+def iter_frames(path: Path) -> Iterator[Dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def apply_frame(state: State, frame: Dict) -> None:
+    if "k" in frame:
+        state.clear()
+        state.update((slot, tuple(values)) for slot, values in frame["k"].items())
+        return
+    for slot, values in frame.get("d", {}).items():
+        state[slot] = tuple(values)
+    for slot in frame.get("r", []):
+        state.pop(slot, None)
+
+
+def rank_state(state: State) -> Dict[str, int]:
+    ordered = sorted(
+        state,
+        key=lambda slot: leaderboard_sort_key({"slot": slot, **dict(zip(SNAPSHOT_FIELDS, state[slot]))}),
+    )
+    return {slot: rank for rank, slot in enumerate(ordered, start=1)}
+
+
+def to_epoch(when) -> int:
+    # Dates mean the end of that UTC day, so "rank at 2025-11-03" includes
+    # everything recorded on the 3rd.
+    if isinstance(when, int):
+        return when
+    day = iso_to_day(str(when))
+    if day is None:
+        raise ValueError(f"Expected an epoch or YYYY-MM-DD date, got {when!r}")
+    return (day + 1) * SECONDS_PER_DAY - 1
+
+
+class LeaderboardHistory:
+    # Append-only series of leaderboard states in gzip JSON Lines segments.
+    # Each segment opens with a keyframe holding every slot; later frames
+    # carry only slots that changed or disappeared. A new segment starts
+    # every KEYFRAME_INTERVAL frames, so reconstructing any moment reads one
+    # segment: a keyframe plus at most KEYFRAME_INTERVAL - 1 deltas.
+    # Several programs may record into one directory. Writes hold a lock
+    # on it and first replay any frames another program appended, so every
+    # delta is taken against the state actually on disk.
+    def __init__(
+        self,
+        directory: Path = LEADERBOARD_HISTORY_DIR,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+        min_seconds: int = SNAPSHOT_MIN_SECONDS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.keyframe_interval = keyframe_interval
+        self.min_seconds = min_seconds
+        self.state: State = {}
+        self.segment: Path | None = None
+        self.segment_size = 0
+        self.frames_in_segment = 0
+        self.last_time: int | None = None
+        self.loaded = False
+
+    def load(self) -> None:
+        # Deferred until the first write so constructing a history is free;
+        # resuming costs one segment replay at most.
+        self.loaded = True
+        self.state = {}
+        self.segment = None
+        self.frames_in_segment = 0
+        self.last_time = None
+        segments = self.segments()
+        if segments:
+            self.segment = segments[-1]
+            self.segment_size = self.segment.stat().st_size
+            for frame in iter_frames(self.segment):
+                apply_frame(self.state, frame)
+                self.frames_in_segment += 1
+                self.last_time = frame["t"]
+
+    def catch_up(self) -> None:
+        # Reloads when the newest segment is not the one this object last
+        # wrote, or has grown since: another program appended to the series.
+        segments = self.segments()
+        latest = segments[-1] if segments else None
+        if not self.loaded or latest != self.segment or (latest is not None and latest.stat().st_size != self.segment_size):
+            self.load()
+
+    def segments(self) -> List[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("segment-*.jsonl.gz"))
+
+    def due(self, now: int) -> bool:
+        if not self.loaded:
+            self.load()
+        return self.last_time is None or now - self.last_time >= self.min_seconds
+
+    def record(self, state: State, now: int | None = None, force: bool = False) -> bool:
+        now = utc_epoch() if now is None else now
+        with FileLock(self.directory / "segments.lock"):
+            self.catch_up()
+            return self._record(state, now, force)
+
+    def _record(self, state: State, now: int, force: bool) -> bool:
+        if not self.due(now) and not force:
+            return False
+        changed = {slot: values for slot, values in state.items() if self.state.get(slot) != values}
+        removed = [slot for slot in self.state if slot not in state]
+        if self.segment is not None and not changed and not removed:
+            return False
+        if self.segment is None or self.frames_in_segment >= self.keyframe_interval:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.segment = self.directory / f"segment-{now:012d}.jsonl.gz"
+            self.frames_in_segment = 0
+            frame = {"t": now, "k": state}
+        else:
+            frame = {"t": now, "d": changed}
+            if removed:
+                frame["r"] = removed
+        with gzip.open(self.segment, "at", encoding="utf-8") as handle:
+            handle.write(json.dumps(frame, separators=(",", ":")) + "\n")
+        commit_path(self.segment)
+        self.segment_size = self.segment.stat().st_size
+        self.state = dict(state)
+        self.frames_in_segment += 1
+        self.last_time = now
+        return True
+
+    def record_store(self, store: Dict, now: int | None = None, force: bool = False) -> bool:
+        now = utc_epoch() if now is None else now
+        if not self.due(now) and not force:
+            return False
+        # record checks again once it holds the lock, in case another
+        # program recorded in the meantime.
+        return self.record(store_state(store), now, force=force)
+
+    def state_at(self, when) -> State:
+        moment = to_epoch(when)
+        segments = self.segments()
+        starts = [segment_start(path) for path in segments]
+        position = bisect_right(starts, moment)
+        state: State = {}
+        if not position:
+            return state
+        for frame in iter_frames(segments[position - 1]):
+            if frame["t"] > moment:
+                break
+            apply_frame(state, frame)
+        return state
+
+    def ranks_at(self, when) -> Dict[str, int]:
+        return rank_state(self.state_at(when))
+
+    def rank_at(self, slot: str, when) -> int | None:
+        return self.ranks_at(when).get(slot)
+
+    def gainers(self, start, end, limit: int = 10, by: str = "xp") -> List[Dict]:
+        if by not in ("xp", "rank"):
+            raise ValueError("by must be 'xp' or 'rank'")
+        before, after = self.state_at(start), self.state_at(end)
+        ranks_before, ranks_after = rank_state(before), rank_state(after)
+        rows = []
+        for slot, values in after.items():
+            previous = before.get(slot)
+            rank_before = ranks_before.get(slot)
+            rows.append(
+                {
+                    "slot": slot,
+                    "player_name": values[SNAPSHOT_FIELDS.index("player_name")],
+                    "xp_gain": total_xp(values) - (total_xp(previous) if previous else 0),
+                    "rank_before": rank_before,
+                    "rank_after": ranks_after[slot],
+                    "rank_gain": (rank_before - ranks_after[slot]) if rank_before else len(ranks_after) - ranks_after[slot],
+                }
+            )
+        field = "xp_gain" if by == "xp" else "rank_gain"
+        return heapq.nlargest(limit, rows, key=lambda row: (row[field], -row["rank_after"]))
@@ -0,0 +1,203 @@
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from game_utils import leaderboard_entry, leaderboard_sort_key
+
+
+class RankedKeys:
+    # Sorted keys stored as a list of short sorted buckets, with a Fenwick
+    # tree over bucket sizes. Locating a key is a bisect over bucket maxima
+    # plus one inside a bucket; converting between a key and its position is
+    # a Fenwick prefix sum or descent. Buckets split at 2 * LOAD, which is
+    # the only time the tree is rebuilt.
+    LOAD = 256
+
+    def __init__(self) -> None:
+        self.buckets: List[List[Tuple]] = []
+        self.maxes: List[Tuple] = []
+        self.tree: List[int] = [0]
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _rebuild_tree(self) -> None:
+        tree = [0] * (len(self.buckets) + 1)
+        for index, bucket in enumerate(self.buckets, start=1):
+            tree[index] += len(bucket)
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def _tree_add(self, bucket: int, delta: int) -> None:
+        index = bucket + 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def _prefix(self, bucket: int) -> int:
+        total = 0
+        while bucket > 0:
+            total += self.tree[bucket]
+            bucket -= bucket & -bucket
+        return total
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        bucket = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            probe = bucket + step
+            if probe < len(self.tree) and self.tree[probe] <= position:
+                bucket = probe
+                position -= self.tree[probe]
+            step >>= 1
+        return bucket, position
+
+    @classmethod
+    def from_sorted(cls, keys: List[Tuple]) -> "RankedKeys":
+        ranked = cls()
+        ranked.buckets = [keys[start : start + cls.LOAD] for start in range(0, len(keys), cls.LOAD)]
+        ranked.maxes = [bucket[-1] for bucket in ranked.buckets]
+        ranked.size = len(keys)
+        ranked._rebuild_tree()
+        return ranked
+
+    def insert(self, key: Tuple) -> None:
+        self.size += 1
+        if not self.buckets:
+            self.buckets.append([key])
+            self.maxes.append(key)
+            self._rebuild_tree()
+            return
+        index = min(bisect_left(self.maxes, key), len(self.buckets) - 1)
+        bucket = self.buckets[index]
+        insort(bucket, key)
+        self.maxes[index] = bucket[-1]
+        if len(bucket) > 2 * self.LOAD:
+            self.buckets[index : index + 1] = [bucket[: self.LOAD], bucket[self.LOAD :]]
+            self.maxes[index : index + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(index, 1)
+
+    def remove(self, key: Tuple) -> None:
+        index = bisect_left(self.maxes, key)
+        bucket = self.buckets[index] if index < len(self.buckets) else []
+        inner = bisect_left(bucket, key)
+        if inner >= len(bucket) or bucket[inner] != key:
+            raise KeyError(key)
+        del bucket[inner]
+        self.size -= 1
+        if bucket:
+            self.maxes[index] = bucket[-1]
+            self._tree_add(index, -1)
+        else:
+            del self.buckets[index]
+            del self.maxes[index]
+            self._rebuild_tree()
+
+    def position(self, key: Tuple) -> int:
+        index = bisect_left(self.maxes, key)
+        return self._prefix(index) + bisect_left(self.buckets[index], key)
+
+    def at(self, position: int) -> Tuple:
+        if not 0 <= position < self.size:
+            raise IndexError(position)
+        bucket, inner = self._locate(position)
+        return self.buckets[bucket][inner]
+
+    def slice(self, start: int, stop: int) -> Iterator[Tuple]:
+        start = max(0, start)
+        stop = min(self.size, stop)
+        if start >= stop:
+            return
+        bucket, inner = self._locate(start)
+        remaining = stop - start
+        while remaining:
+            chunk = self.buckets[bucket][inner : inner + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            bucket += 1
+            inner = 0
+
+
+class LeaderboardIndex:
+    # Every eligible slot in leaderboard order, not just the saved top
+    # LEADERBOARD_MAX_ENTRIES. update() re-keys one slot in O(log n), so it
+    # can run on every save. ``key`` maps an entry to its sort key, or to
+    # None when the slot does not qualify for this board.
+    def __init__(self, key: Callable[[Dict], Tuple | None] = leaderboard_sort_key) -> None:
+        self.key = key
+        self.keys = RankedKeys()
+        self.slot_keys: Dict[str, Tuple] = {}
+        self.entries: Dict[Tuple, Dict] = {}
+
+    @classmethod
+    def from_store(cls, store: Dict) -> "LeaderboardIndex":
+        return cls.from_entries(
+            leaderboard_entry(slot, profile) for slot, profile in store.get("slots", {}).items() if profile
+        )
+
+    @classmethod
+    def from_entries(cls, entries, key: Callable[[Dict], Tuple | None] = leaderboard_sort_key) -> "LeaderboardIndex":
+        index = cls(key)
+        for entry in entries:
+            sort_key = key(entry)
+            if sort_key is not None:
+                index.slot_keys[entry["slot"]] = sort_key
+                index.entries[sort_key] = entry
+        index.keys = RankedKeys.from_sorted(sorted(index.entries))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, slot: str) -> bool:
+        return slot in self.slot_keys
+
+    def update(self, slot: str, profile: Dict | None) -> None:
+        self.update_entry(slot, leaderboard_entry(slot, profile) if profile else None)
+
+    def update_entry(self, slot: str, entry: Dict | None) -> None:
+        key = self.key(entry) if entry is not None else None
+        if key is None:
+            self.remove(slot)
+            return
+        old_key = self.slot_keys.get(slot)
+        if old_key == key:
+            self.entries[key] = entry
+            return
+        if old_key is not None:
+            self.keys.remove(old_key)
+            del self.entries[old_key]
+        self.keys.insert(key)
+        self.slot_keys[slot] = key
+        self.entries[key] = entry
+
+    def remove(self, slot: str) -> None:
+        key = self.slot_keys.pop(slot, None)
+        if key is not None:
+            self.keys.remove(key)
+            del self.entries[key]
+
+    def rank_of(self, slot: str) -> int | None:
+        key = self.slot_keys.get(slot)
+        return None if key is None else self.keys.position(key) + 1
+
+    def entry_at(self, rank: int) -> Dict:
+        return self.entries[self.keys.at(rank - 1)]
+
+    def page(self, offset: int, limit: int) -> List[Tuple[int, Dict]]:
+        offset = max(0, offset)
+        return [
+            (rank, self.entries[key])
+            for rank, key in enumerate(self.keys.slice(offset, offset + limit), start=offset + 1)
+        ]
+
+    def around(self, slot: str, radius: int = 2) -> List[Tuple[int, Dict]]:
+        rank = self.rank_of(slot)
+        if rank is None:
+            return []
+        start = max(0, rank - 1 - radius)
+        return self.page(start, rank + radius - start)
@@ -0,0 +1,134 @@
+import argparse
+import heapq
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from durable_io import atomic_open
+from game_utils import LEADERBOARD_MAX_ENTRIES, PLAYER_DATA_PATH, leaderboard_entry, leaderboard_sort_key, utc_now_iso
+from report_export import iter_store_profiles
+
+MATCH_MODES = ("auto", "id", "name")
+MERGED_LEADERBOARD_PATH = Path("merged_leaderboard.json")
+
+
+def identity(entry: Dict, student_id: str, match: str) -> Tuple[str, str]:
+    # Students carry the same ID or display name across machines, but slot
+    # names ("Slot 1") repeat on every machine and never identify anyone.
+    # Under "id", slots without an ID stay distinct per machine and slot.
+    student_id = student_id.strip().casefold()
+    if match in ("auto", "id") and student_id:
+        return ("id", student_id)
+    if match == "id":
+        return ("slot", f"{entry['machine']}\0{entry['slot']}")
+    return ("name", entry["player_name"].strip().casefold())
+
+
+def merge_sort_key(entry: Dict) -> Tuple:
+    # sync_leaderboard order, with the machine as the last tie-breaker since
+    # slot names are only unique within one machine.
+    return leaderboard_sort_key(entry) + (entry["machine"],)
+
+
+def machine_partial(directory: str, machine: str, limit: int, match: str) -> Tuple[List[Tuple[Tuple, Dict]], int]:
+    # Map step, run in a worker process: stream one machine's store, keep
+    # each student's best entry, and return the local top ``limit`` with
+    # their identities. Any student in the global top ``limit`` is also in
+    # the top ``limit`` of the machine holding their best entry, because
+    # everyone ahead of them there is a different student ranked higher
+    # globally too.
+    best: Dict[Tuple[str, str], Dict] = {}
+    slots = 0
+    for slot, profile in iter_store_profiles(Path(directory) / PLAYER_DATA_PATH.name):
+        if not profile:
+            continue
+        slots += 1
+        entry = leaderboard_entry(slot, profile)
+        entry["machine"] = machine
+        if profile.get("student_id"):
+            entry["student_id"] = profile["student_id"]
+        who = identity(entry, profile.get("student_id") or "", match)
+        current = best.get(who)
+        if current is None or merge_sort_key(entry) < merge_sort_key(current):
+            best[who] = entry
+    top = heapq.nsmallest(limit, best.items(), key=lambda item: merge_sort_key(item[1]))
+    return top, slots
+
+
+def machine_labels(directories: Sequence[Path]) -> List[str]:
+    names = [Path(directory).resolve().name or str(directory) for directory in directories]
+    if len(set(names)) == len(names):
+        return names
+    return [str(directory) for directory in directories]
+
+
+def reduce_partials(partials: Iterable[List[Tuple[Tuple, Dict]]], limit: int) -> List[Dict]:
+    # Reduce step: walk the sorted partials in global order and keep the
+    # first (best) entry per student until the board is full.
+    merged = heapq.merge(*partials, key=lambda item: merge_sort_key(item[1]))
+    seen = set()
+    entries: List[Dict] = []
+    for who, entry in merged:
+        if who in seen:
+            continue
+        seen.add(who)
+        entries.append(entry)
+        if len(entries) == limit:
+            break
+    return entries
+
+
+def merge_leaderboards(
+    directories: Sequence[Path],
+    limit: int = LEADERBOARD_MAX_ENTRIES,
+    match: str = "auto",
+    jobs: int | None = None,
+) -> Dict:
+    if match not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode {match!r}; expected one of {', '.join(MATCH_MODES)}")
+    labels = machine_labels(directories)
+    args = [(str(directory), label, limit, match) for directory, label in zip(directories, labels)]
+    jobs = min(jobs or os.cpu_count() or 1, len(args)) or 1
+    if jobs == 1:
+        results = [machine_partial(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(machine_partial, *zip(*args)))
+    return {
+        "updated_at": utc_now_iso(),
+        "machines": {label: slots for label, (_top, slots) in zip(labels, results)},
+        "entries": reduce_partials((top for top, _slots in results), limit),
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge MathQuest6 save folders from several machines into one leaderboard.")
+    parser.add_argument("directories", nargs="+", type=Path, help=f"folders each holding a {PLAYER_DATA_PATH.name}")
+    parser.add_argument("--top", type=int, default=LEADERBOARD_MAX_ENTRIES)
+    parser.add_argument(
+        "--match",
+        choices=MATCH_MODES,
+        default="auto",
+        help="how duplicate students are found: student ID, else name (auto); ID only; or name only",
+    )
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per core, at most one per folder)")
+    parser.add_argument("--output", type=Path, default=MERGED_LEADERBOARD_PATH)
+    args = parser.parse_args(argv)
+
+    missing = [str(directory) for directory in args.directories if not (directory / PLAYER_DATA_PATH.name).exists()]
+    if missing:
+        parser.error(f"no {PLAYER_DATA_PATH.name} in: {', '.join(missing)}")
+    board = merge_leaderboards(args.directories, args.top, args.match, args.jobs)
+    with atomic_open(args.output) as handle:
+        json.dump(board, handle, indent=2)
+    for rank, entry in enumerate(board["entries"], start=1):
+        print(f"{rank:>3}. {entry['player_name'][:20]:<20} Lv {entry['level']:>2} {entry['xp']:>3} XP  ({entry['machine']})")
+    print(f"Merged {sum(board['machines'].values())} slots from {len(board['machines'])} machines into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+from typing import Callable, Dict, List, Tuple
+
+from analytics import MASTERY_MIN_ATTEMPTS, AnalyticsRollups
+from game_utils import LANDS, leaderboard_entry, leaderboard_sort_key
+from leaderboard_index import LeaderboardIndex
+
+DEFAULT_BOARD = "xp"
+LAND_BOARD_PREFIX = "land:"
+
+
+class BoardSpec:
+    __slots__ = ("name", "title", "key", "score")
+
+    def __init__(
+        self,
+        name: str,
+        title: str,
+        key: Callable[[Dict], Tuple | None],
+        score: Callable[[Dict], str],
+    ) -> None:
+        self.name = name
+        self.title = title
+        self.key = key
+        self.score = score
+
+
+def format_seconds(seconds: int) -> str:
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _streak_key(entry: Dict) -> Tuple | None:
+    if not entry["streak_best"]:
+        return None
+    return (-entry["streak_best"], -entry["total_dailies"], entry["player_name"].lower(), entry["slot"])
+
+
+def _fastest_key(entry: Dict) -> Tuple | None:
+    seconds = entry["fastest_daily_seconds"]
+    if seconds is None:
+        return None
+    return (seconds, entry["player_name"].lower(), entry["slot"])
+
+
+def _land_key(land: str) -> Callable[[Dict], Tuple | None]:
+    def key(entry: Dict) -> Tuple | None:
+        accuracy, attempts = entry["land_accuracy"].get(land, (0.0, 0))
+        if attempts < MASTERY_MIN_ATTEMPTS:
+            return None
+        return (-accuracy, -attempts, entry["player_name"].lower(), entry["slot"])
+
+    return key
+
+
+def _land_score(land: str) -> Callable[[Dict], str]:
+    def score(entry: Dict) -> str:
+        accuracy, attempts = entry["land_accuracy"].get(land, (0.0, 0))
+        return f"{accuracy * 100:.0f}% of {attempts}"
+
+    return score
+
+
+def build_board_specs(lands: List[str] = LANDS) -> Dict[str, BoardSpec]:
+    specs = [
+        BoardSpec("xp", "Top Adventurers", leaderboard_sort_key, lambda entry: f"Lv {entry['level']} · {entry['xp']} XP"),
+        BoardSpec("streak", "Best Streaks", _streak_key, lambda entry: f"{entry['streak_best']} days"),
+        BoardSpec(
+            "fastest",
+            "Fastest Daily",
+            _fastest_key,
+            lambda entry: format_seconds(entry["fastest_daily_seconds"]),
+        ),
+    ]
+    specs.extend(
+        BoardSpec(f"{LAND_BOARD_PREFIX}{land}", f"{land} Accuracy", _land_key(land), _land_score(land))
+        for land in lands
+    )
+    return {spec.name: spec for spec in specs}
+
+
+BOARD_SPECS = build_board_specs()
+
+
+def board_entry(slot: str, profile: Dict, rollups: AnalyticsRollups | None = None) -> Dict:
+    # One entry carries every field any board ranks on, so a profile change
+    # is summarised once and then re-keyed on each board.
+    entry = leaderboard_entry(slot, profile)
+    entry["fastest_daily_seconds"] = (profile.get("daily_stats") or {}).get("fastest_completion_seconds")
+    lands = rollups.land_summary(slot) if rollups is not None else {}
+    entry["land_accuracy"] = {land: (tally.accuracy, tally.attempts) for land, tally in lands.items()}
+    return entry
+
+
+class Leaderboards:
+    # A LeaderboardIndex per BoardSpec, all fed from the same profile stream.
+    def __init__(self, specs: Dict[str, BoardSpec] | None = None, rollups: AnalyticsRollups | None = None) -> None:
+        self.specs = specs if specs is not None else BOARD_SPECS
+        self.rollups = rollups
+        self.boards: Dict[str, LeaderboardIndex] = {name: LeaderboardIndex(spec.key) for name, spec in self.specs.items()}
+
+    @classmethod
+    def from_store(
+        cls,
+        store: Dict,
+        specs: Dict[str, BoardSpec] | None = None,
+        rollups: AnalyticsRollups | None = None,
+    ) -> "Leaderboards":
+        leaderboards = cls(specs, rollups)
+        entries = [
+            board_entry(slot, profile, rollups) for slot, profile in store.get("slots", {}).items() if profile
+        ]
+        leaderboards.boards = {
+            name: LeaderboardIndex.from_entries(entries, spec.key) for name, spec in leaderboards.specs.items()
+        }
+        return leaderboards
+
+    def names(self) -> List[str]:
+        return list(self.specs)
+
+    def board(self, name: str) -> LeaderboardIndex:
+        if name not in self.boards:
+            raise KeyError(f"Unknown leaderboard {name!r}; choose from {', '.join(self.specs)}")
+        return self.boards[name]
+
+    def update(self, slot: str, profile: Dict | None) -> None:
+        entry = board_entry(slot, profile, self.rollups) if profile else None
+        for board in self.boards.values():
+            board.update_entry(slot, entry)
+
+    def remove(self, slot: str) -> None:
+        for board in self.boards.values():
+            board.remove(slot)
+
+    def resolve(self, text: str) -> str | None:
+        # Accepts a board name, a land name, or any unambiguous prefix of
+        # either, case-insensitively.
+        text = text.strip().lower()
+        if not text:
+            return None
+        candidates = {name.lower(): name for name in self.specs}
+        candidates.update(
+            {name[len(LAND_BOARD_PREFIX) :].lower(): name for name in self.specs if name.startswith(LAND_BOARD_PREFIX)}
+        )
+        if text in candidates:
+            return candidates[text]
+        matches = {name for alias, name in candidates.items() if alias.startswith(text)}
+        return matches.pop() if len(matches) == 1 else None
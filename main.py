@@ -1,6 +1,5 @@
 import os
 import sys
-from pathlib import Path
 from time import perf_counter
 
 from art_assets import (
@@ -24,8 +23,12 @@ from art_assets import (
 from game_utils import (
     LESSON_DATA_PATH,
     QUIZ_DATA_PATH,
+    StoreConflictError,
+    collect_history_overflow,
     ensure_player_profile,
     save_profiles,
+    reload_slot,
+    resolve_store_conflict,
     load_json,
     reset_hint_tokens,
     spend_hint,
@@ -49,129 +52,224 @@ from game_utils import (
     get_retry_hearts,
     consume_retry_heart,
     retry_cooldown_remaining,
-    load_leaderboard,
-    sync_leaderboard,
+    SECONDS_PER_DAY,
+    SYNC_URL_ENV,
+    utc_epoch,
 )
+from analytics import AnswerRecorder, mastery_level
+from leaderboard_history import LeaderboardHistory
+from leaderboards import DEFAULT_BOARD, Leaderboards
+from scheduler import ProfileTimers
+from terminal import ask, clear_screen, current_terminal, echo, run_blocking
 
 LAND_ORDER = LANDS
 
 HP_PER_QUIZ = 3
 
+CLIMBER_WINDOW_DAYS = 7
+
+LEADERBOARD_PAGE_SIZE = 10
+
 
 def clear_console():
-    os.system("cls" if os.name == "nt" else "clear")
+    clear_screen()
 
 
-def press_enter():
-    input("\nPress Enter to continue...")
+async def press_enter():
+    await ask("\nPress Enter to continue...")
 
 
 def display_title():
     clear_console()
     render_title_banner()
-    print("Welcome to MathQuest6: The Adventure of Numbers!\n")
+    echo("Welcome to MathQuest6: The Adventure of Numbers!\n")
 
 
-def show_leaderboard(store):
-    sync_leaderboard(store)
-    board = load_leaderboard()
-    entries = board.get("entries", [])
+async def show_climbers(history, slot, days=CLIMBER_WINDOW_DAYS):
+    now = utc_epoch()
+    rows = history.gainers(now - days * SECONDS_PER_DAY, now, LEADERBOARD_PAGE_SIZE)
     clear_console()
-    print("🏆 MathQuest6 Leaderboard 🏆\n")
-    if not entries:
-        print("No adventurers recorded yet. Complete quests to claim a spot!\n")
-        press_enter()
+    echo(f"📈 Biggest Climbers — last {days} days 📈\n")
+    if not rows:
+        echo("No leaderboard history yet. Check back after a few adventures!\n")
+        await press_enter()
         return
-    print(f"Updated: {board.get('updated_at', 'N/A')}\n")
-    print("Rank | Adventurer       | Lv | XP  | Badges | Best Streak | Daily Clears")
-    print("-----+-------------------+----+-----+--------+-------------+--------------")
-    for index, entry in enumerate(entries, start=1):
-        name = entry.get("player_name", "Hero")[:17].ljust(17)
-        level = str(entry.get("level", 1)).rjust(2)
-        xp = str(entry.get("xp", 0)).rjust(4)
-        badges = str(entry.get("badge_count", 0)).rjust(6)
-        streak = str(entry.get("streak_best", 0)).rjust(11)
-        clears = str(entry.get("total_dailies", 0)).rjust(12)
-        print(f"{index:>4} | {name} | {level} | {xp} | {badges} | {streak} | {clears}")
-    press_enter()
-
-
-def attempt_daily_challenge(store, profile, quiz_bank):
+    echo("  Adventurer        | XP gained | Rank then → now")
+    echo("--------------------+-----------+----------------")
+    for row in rows:
+        marker = "▶" if row["slot"] == slot else " "
+        name = row["player_name"][:17].ljust(17)
+        before = f"#{row['rank_before']}" if row["rank_before"] else "new"
+        echo(f"{marker} {name} | {row['xp_gain']:>9} | {before} → #{row['rank_after']}")
+    await press_enter()
+
+
+async def show_leaderboard(leaderboards, slot, board_name=DEFAULT_BOARD, history=None):
+    offset = 0
+    while True:
+        board = leaderboards.board(board_name)
+        spec = leaderboards.specs[board_name]
+        rank = board.rank_of(slot)
+        clear_console()
+        echo(f"🏆 {spec.title} 🏆\n")
+        if not len(board):
+            echo("No adventurers qualify for this board yet. Complete quests to claim a spot!\n")
+        else:
+            page_count = -(-len(board) // LEADERBOARD_PAGE_SIZE)
+            echo(f"Page {offset // LEADERBOARD_PAGE_SIZE + 1} of {page_count}", end="")
+            echo(f" — your rank: #{rank} of {len(board)}\n" if rank else "\n")
+            echo("  Rank | Adventurer        | Score          | Lv | Badges")
+            echo("-------+-------------------+----------------+----+--------")
+            for position, entry in board.page(offset, LEADERBOARD_PAGE_SIZE):
+                marker = "▶" if entry["slot"] == slot else " "
+                name = entry.get("player_name", "Hero")[:17].ljust(17)
+                score = spec.score(entry)[:14].ljust(14)
+                level = str(entry.get("level", 1)).rjust(2)
+                badges = str(entry.get("badge_count", 0)).rjust(6)
+                echo(f"{marker}{position:>5} | {name} | {score} | {level} | {badges}")
+        echo("\nBoards: xp, streak, fastest, or a land name for accuracy (e.g. 'fractions').")
+        if history is not None:
+            echo("Type 'climbers' to see who climbed most this week.")
+        choice = await ask("'n' next page, 'p' previous, 'me' to find yourself, a board to switch, Enter to return: ")
+        choice = choice.strip().lower()
+        if choice == "n" and offset + LEADERBOARD_PAGE_SIZE < len(board):
+            offset += LEADERBOARD_PAGE_SIZE
+        elif choice == "p":
+            offset = max(0, offset - LEADERBOARD_PAGE_SIZE)
+        elif choice == "me" and rank:
+            offset = (rank - 1) // LEADERBOARD_PAGE_SIZE * LEADERBOARD_PAGE_SIZE
+        elif not choice:
+            return
+        elif choice == "climbers" and history is not None:
+            await show_climbers(history, slot)
+        elif leaderboards.resolve(choice):
+            board_name = leaderboards.resolve(choice)
+            offset = 0
+
+
+async def show_class_analytics(rollups):
+    clear_console()
+    echo("📊 Class Analytics 📊\n")
+    matrix = rollups.mastery_matrix()
+    if not matrix:
+        echo("No answers recorded yet. Battle a few creatures first!\n")
+        await press_enter()
+        return
+    lands = [land for land in LAND_ORDER if land in rollups.lands]
+    echo("Mastery by land:")
+    echo("Adventurer slot".ljust(16) + "".join(land[:12].ljust(14) for land in lands))
+    for slot, row in matrix.items():
+        cells = []
+        for land in lands:
+            tally = row.get(land)
+            cells.append((f"{tally.accuracy * 100:.0f}% {mastery_level(tally)}" if tally else "—")[:13].ljust(14))
+        echo((slot or "Unknown")[:15].ljust(16) + "".join(cells))
+
+    echo("\nMost missed questions:")
+    echo("Misses | Tries | Hints | Avg s | Land         | Prompt")
+    echo("-------+-------+-------+-------+--------------+-------------------------")
+    for item in rollups.top_missed_questions(10):
+        echo(
+            f"{item['misses']:>6} | {item['attempts']:>5} | {item['hint_rate'] * 100:>4.0f}% | "
+            f"{item['average_seconds']:>5.1f} | {item['land'][:12].ljust(12)} | {item['prompt'][:40]}"
+        )
+    await press_enter()
+
+
+async def attempt_daily_challenge(store, slot, profile, quiz_bank, timers=None, answer_log=None):
     hearts = get_retry_hearts(profile)
     cooldown_seconds = retry_cooldown_remaining(profile) if hearts <= 0 else 0
     if hearts <= 0 and cooldown_seconds > 0:
         minutes = cooldown_seconds // 60
         seconds = cooldown_seconds % 60
-        print(
+        echo(
             "\nDaily challenge unavailable. All retry hearts are depleted."
             f" Rest for {minutes:02d}:{seconds:02d} before trying again.\n"
         )
-        press_enter()
+        await press_enter()
         return None
     refresh_daily_challenge(profile, quiz_bank)
     land, questions = get_daily_challenge_questions(profile, quiz_bank)
     if not land:
-        print("\nDaily challenge is not ready yet. Come back later!\n")
-        press_enter()
+        echo("\nDaily challenge is not ready yet. Come back later!\n")
+        await press_enter()
         return None
     if not questions:
-        print("\nDaily challenge has no questions configured right now. Try again after updating quiz data.\n")
-        press_enter()
+        echo("\nDaily challenge has no questions configured right now. Try again after updating quiz data.\n")
+        await press_enter()
         return None
-    print("\nEmbarking on today's daily challenge!\n")
+    echo("\nEmbarking on today's daily challenge!\n")
     start_time = perf_counter()
-    success = battle_quiz(profile, land, questions)
+    success = await battle_quiz(profile, land, questions, answer_log, slot)
     elapsed_seconds = int(perf_counter() - start_time)
     if success:
         newly_completed = mark_daily_completion(profile, elapsed_seconds)
-        save_profiles(store)
+        save_session(store)
         if newly_completed:
-            print("\nDaily challenge complete! Visit the map to claim your reward.\n")
+            echo("\nDaily challenge complete! Visit the map to claim your reward.\n")
         else:
-            print("\nDaily challenge already marked as complete for today.\n")
+            echo("\nDaily challenge already marked as complete for today.\n")
     else:
-        print("\nDaily challenge attempt ended early. Regroup and try again!\n")
+        echo("\nDaily challenge attempt ended early. Regroup and try again!\n")
         remaining_hearts = consume_retry_heart(profile)
-        save_profiles(store)
+        if timers is not None:
+            timers.watch_hearts(slot)
+        save_session(store)
         if remaining_hearts > 0:
-            print(f"Retry hearts remaining: {remaining_hearts}/{RETRY_MAX_HEARTS}.")
+            echo(f"Retry hearts remaining: {remaining_hearts}/{RETRY_MAX_HEARTS}.")
         else:
             cooldown_seconds = retry_cooldown_remaining(profile)
             minutes = cooldown_seconds // 60
             seconds = cooldown_seconds % 60
-            print(
+            echo(
                 "All retry hearts spent. Rest for "
                 f"{minutes:02d}:{seconds:02d} before your next attempt."
             )
-    press_enter()
+    await press_enter()
     return success
 
 
-def claim_daily_reward_console(store, profile):
+async def claim_daily_reward_console(store, profile):
     reward = claim_daily_reward(profile)
     if reward is None:
-        print("\nNo reward available to claim. Complete the daily challenge first.\n")
-        press_enter()
+        echo("\nNo reward available to claim. Complete the daily challenge first.\n")
+        await press_enter()
         return
     bonus, badge = reward
     if bonus:
-        print(f"\n{XP_EMOJI} Bonus XP awarded: +{bonus}!")
+        echo(f"\n{XP_EMOJI} Bonus XP awarded: +{bonus}!")
     if badge:
-        print(f"{BADGE_EMOJI} Special badge earned: {badge}!")
+        echo(f"{BADGE_EMOJI} Special badge earned: {badge}!")
     if not bonus and not badge:
-        print("\nReward claimed! (No additional bonus configured today.)")
+        echo("\nReward claimed! (No additional bonus configured today.)")
     else:
-        print("Reward claimed! Keep the streak going.")
-    save_profiles(store)
-    press_enter()
+        echo("Reward claimed! Keep the streak going.")
+    save_session(store)
+    await press_enter()
 
 
-def select_profile_slot(store):
+def save_session(store, keep=()):
+    # Slots claimed at this terminal keep the local copy if another program
+    # changed them too; any other slot it touched takes the disk version.
+    keep = set(current_terminal.get().claims.held) | set(keep)
+    overflow = collect_history_overflow(store)
+    try:
+        save_profiles(store, overflow)
+    except StoreConflictError as conflict:
+        refreshed = resolve_store_conflict(store, conflict.slots, keep)
+        # Nothing was archived; slots just replaced from disk drop theirs.
+        save_profiles(store, {slot: entries for slot, entries in overflow.items() if slot not in refreshed})
+
+
+async def select_profile_slot(store):
+    # Slot locks belong to the player at this terminal, so sessions sharing
+    # one daemon process exclude each other like separate consoles do.
+    claims = current_terminal.get().claims
     while True:
         slots = list_slots(store)
         clear_console()
         render_title_banner()
-        print("Choose a save slot:\n")
+        echo("Choose a save slot:\n")
         for idx, slot in enumerate(slots, start=1):
             profile = store["slots"][slot]
             if profile:
@@ -179,60 +277,68 @@ def select_profile_slot(store):
                 summary = f"{name} (Lv {profile.get('level', 1)})"
             else:
                 summary = "Empty"
-            print(f"{idx}. {slot} - {summary}")
-        print("\nEnter a number to load a slot.")
-        print("Type 'reset <number>' to clear a slot.")
-        choice = input("\nSelection: ").strip().lower()
+            echo(f"{idx}. {slot} - {summary}")
+        echo("\nEnter a number to load a slot.")
+        echo("Type 'reset <number>' to clear a slot.")
+        choice = (await ask("\nSelection: ")).strip().lower()
         if choice.startswith("reset"):
             parts = choice.split()
             if len(parts) == 2 and parts[1].isdigit():
                 index = int(parts[1]) - 1
                 if 0 <= index < len(slots):
                     target = slots[index]
-                    store["slots"][target] = default_profile()
-                    save_profiles(store)
-                    print(f"{target} reset.")
+                    if claims.in_use(target):
+                        echo(f"{target} is open in another MathQuest6 window; close it there first.")
+                    else:
+                        store["slots"][target] = default_profile()
+                        save_session(store, keep=(target,))
+                        echo(f"{target} reset.")
                 else:
-                    print("Select a valid slot to reset.")
+                    echo("Select a valid slot to reset.")
             else:
-                print("Use 'reset <number>'.")
-            press_enter()
+                echo("Use 'reset <number>'.")
+            await press_enter()
             continue
         if choice.isdigit():
             index = int(choice) - 1
             if 0 <= index < len(slots):
+                if not claims.claim(slots[index]):
+                    echo(f"{slots[index]} is open in another MathQuest6 window. Pick another slot or close it there.")
+                    await press_enter()
+                    continue
+                reload_slot(store, slots[index])
                 profile = set_active_slot(store, slots[index])
-                save_profiles(store)
-                return profile
-        print("Please enter a valid option.")
-        press_enter()
+                save_session(store)
+                return slots[index], profile
+        echo("Please enter a valid option.")
+        await press_enter()
 
 
-def pick_avatar(profile):
+async def pick_avatar(profile):
     picked = profile.get("avatar")
     if picked:
         return
-    print("Choose an avatar to represent your math hero:\n")
+    echo("Choose an avatar to represent your math hero:\n")
     for idx, avatar in enumerate(AVATAR_OPTIONS, start=1):
-        print(f"{idx}. {avatar}")
+        echo(f"{idx}. {avatar}")
     while True:
-        choice = input("\nEnter the number for your favorite avatar: ")
+        choice = await ask("\nEnter the number for your favorite avatar: ")
         if choice.isdigit() and 1 <= int(choice) <= len(AVATAR_OPTIONS):
             profile["avatar"] = AVATAR_OPTIONS[int(choice) - 1]
             break
-        print("Please choose a valid option.")
+        echo("Please choose a valid option.")
 
 
-def show_profile(profile):
+async def show_profile(profile):
     clear_console()
-    print("🧭 Adventurer Profile 🧭\n")
-    print(f"Name     : {profile['player_name']}")
-    print(f"Avatar   : {profile.get('avatar', 'Unassigned')}")
-    print(f"Level    : {profile['level']}")
-    print(f"XP       : {profile['xp']} / {XP_LEVEL_THRESHOLD}")
-    print(f"Badges   : {', '.join(profile['badges']) if profile['badges'] else 'None yet'}")
-    print(f"Lands    : {', '.join(profile['unlocked_lands'])}")
-    press_enter()
+    echo("🧭 Adventurer Profile 🧭\n")
+    echo(f"Name     : {profile['player_name']}")
+    echo(f"Avatar   : {profile.get('avatar', 'Unassigned')}")
+    echo(f"Level    : {profile['level']}")
+    echo(f"XP       : {profile['xp']} / {XP_LEVEL_THRESHOLD}")
+    echo(f"Badges   : {', '.join(profile['badges']) if profile['badges'] else 'None yet'}")
+    echo(f"Lands    : {', '.join(profile['unlocked_lands'])}")
+    await press_enter()
 
 
 def render_map(profile):
@@ -248,63 +354,75 @@ def render_map(profile):
 
 def list_options(options):
     for key, value in options.items():
-        print(f"  {key}) {value}")
+        echo(f"  {key}) {value}")
 
 
-def get_player_answer(options):
+async def get_player_answer(options):
     valid = set(options.keys())
     while True:
-        choice = input("Your answer: ").lower().strip()
+        choice = (await ask("Your answer: ")).lower().strip()
         if choice in valid:
             return choice
-        print("Choose one of the given options.")
+        echo("Choose one of the given options.")
 
 
-def maybe_use_hint(profile, land, question):
+async def maybe_use_hint(profile, land, question):
     if profile["hint_tokens"].get(land, 0) <= 0:
-        print("No hint tokens left for this land today!\n")
-        return
-    use_hint = input("Need a hint? (y/n): ").strip().lower()
+        echo("No hint tokens left for this land today!\n")
+        return False
+    use_hint = (await ask("Need a hint? (y/n): ")).strip().lower()
     if use_hint == "y":
         if spend_hint(profile, land):
-            print(f"{HINT_EMOJI} Hint: {question['hint']}\n")
-        else:
-            print("No hint tokens remaining.\n")
+            echo(f"{HINT_EMOJI} Hint: {question['hint']}\n")
+            return True
+        echo("No hint tokens remaining.\n")
+    return False
 
 
-def battle_quiz(profile, land, questions):
+async def battle_quiz(profile, land, questions, answer_log=None, slot=None):
     clear_console()
     render_battle_header()
-    print(f"You face the challenges of {land}!\n")
+    echo(f"You face the challenges of {land}!\n")
 
     hp = HP_PER_QUIZ
     correct_answers = 0
     for number, question in enumerate(questions, start=1):
-        print(f"Challenge {number}: {question['creature']} appears!\n")
-        print(question["prompt"])
+        echo(f"Challenge {number}: {question['creature']} appears!\n")
+        echo(question["prompt"])
         list_options(question["options"])
-        maybe_use_hint(profile, land, question)
-        answer = get_player_answer(question["options"])
+        asked_at = perf_counter()
+        hint_used = await maybe_use_hint(profile, land, question)
+        answer = await get_player_answer(question["options"])
+        if answer_log is not None:
+            answer_log.record(
+                slot,
+                land,
+                question,
+                answer,
+                answer == question["answer"],
+                hint_used,
+                int((perf_counter() - asked_at) * 1000),
+            )
 
         if answer == question["answer"]:
             correct_answers += 1
-            print(f"\n{pick_feedback(True, SUCCESS_EMOJIS, FAILURE_EMOJIS)} {question['explanation']}")
+            echo(f"\n{pick_feedback(True, SUCCESS_EMOJIS, FAILURE_EMOJIS)} {question['explanation']}")
             current_xp, leveled = apply_xp_change(profile, XP_CORRECT)
-            print(f"{XP_EMOJI} +{XP_CORRECT} XP (XP: {current_xp}/{XP_LEVEL_THRESHOLD})")
+            echo(f"{XP_EMOJI} +{XP_CORRECT} XP (XP: {current_xp}/{XP_LEVEL_THRESHOLD})")
             if leveled:
-                print(f"{LEVEL_EMOJI} Level up! You reached level {profile['level']}!\n")
+                echo(f"{LEVEL_EMOJI} Level up! You reached level {profile['level']}!\n")
         else:
             hp -= 1
-            print(f"\n{pick_feedback(False, SUCCESS_EMOJIS, FAILURE_EMOJIS)} The correct answer was {question['options'][question['answer']]}. {question['explanation']}")
+            echo(f"\n{pick_feedback(False, SUCCESS_EMOJIS, FAILURE_EMOJIS)} The correct answer was {question['options'][question['answer']]}. {question['explanation']}")
             current_xp, leveled = apply_xp_change(profile, XP_INCORRECT)
-            print(f"{XP_EMOJI} {XP_INCORRECT} XP (XP: {current_xp}/{XP_LEVEL_THRESHOLD})")
+            echo(f"{XP_EMOJI} {XP_INCORRECT} XP (XP: {current_xp}/{XP_LEVEL_THRESHOLD})")
             if leveled:
-                print(f"{LEVEL_EMOJI} Level up! You reached level {profile['level']}!\n")
-            print(f"{HP_EMOJI} Remaining hearts: {hp}\n")
+                echo(f"{LEVEL_EMOJI} Level up! You reached level {profile['level']}!\n")
+            echo(f"{HP_EMOJI} Remaining hearts: {hp}\n")
             if hp <= 0:
-                print("Your hearts are depleted! Retreat to the map and regain strength.\n")
+                echo("Your hearts are depleted! Retreat to the map and regain strength.\n")
                 break
-        press_enter()
+        await press_enter()
         clear_console()
         render_battle_header()
 
@@ -320,45 +438,70 @@ def battle_quiz(profile, land, questions):
 
     badge_awarded = award_badge(profile, land, accuracy)
     if badge_awarded:
-        print(f"{BADGE_EMOJI} New Badge Earned: {badge_awarded}!")
+        echo(f"{BADGE_EMOJI} New Badge Earned: {badge_awarded}!")
 
     next_land = None
     if accuracy >= 0.6 and hp > 0:
         next_land = unlock_next_land(profile, LAND_ORDER, land)
         if next_land:
-            print(f"\nYou unlocked {next_land}! 🎉")
+            echo(f"\nYou unlocked {next_land}! 🎉")
 
-    press_enter()
+    await press_enter()
     return hp > 0
 
 
-def read_lessons_and_quizzes():
-    lessons = load_json(LESSON_DATA_PATH)
-    quiz_bank = load_json(QUIZ_DATA_PATH)
-    return lessons, quiz_bank
+# Content is only read when a land or the daily challenge is first chosen, so
+# the title and slot menu never wait on lesson or quiz JSON. When a
+# content_host.py is running on this machine, sessions read from its shared
+# segment instead of each loading their own copy.
+_content_cache = {}
+
+
+def get_shared_content():
+    if "shared" not in _content_cache:
+        from content_host import SharedContent
+
+        _content_cache["shared"] = SharedContent.attach()
+    return _content_cache["shared"]
+
+
+def get_lessons():
+    if "lessons" not in _content_cache:
+        shared = get_shared_content()
+        _content_cache["lessons"] = shared.lessons if shared else load_json(LESSON_DATA_PATH)
+    return _content_cache["lessons"]
 
 
-def show_lesson(lessons, land):
+def get_quiz_bank():
+    if "quizzes" not in _content_cache:
+        shared = get_shared_content()
+        _content_cache["quizzes"] = shared.quiz_bank if shared else load_json(QUIZ_DATA_PATH)
+    return _content_cache["quizzes"]
+
+
+async def show_lesson(lessons, land):
     lesson = lessons.get(land)
     if not lesson:
-        print("No lesson data available for this land.\n")
+        echo("No lesson data available for this land.\n")
         return
     clear_console()
     render_lesson_header()
     palette = COLOR_PALETTES[land]
-    print(f"{palette['emoji']} {land} Story")
-    print("==============================")
-    print(f"{lesson['story']}\n")
-    print("Learning Objectives:")
+    echo(f"{palette['emoji']} {land} Story")
+    echo("==============================")
+    echo(f"{lesson['story']}\n")
+    echo("Learning Objectives:")
     for objective in lesson["learning_objectives"]:
-        print(f" - {objective}")
-    print("\nExample Walkthrough:")
-    print(lesson["example_walkthrough"])
-    press_enter()
+        echo(f" - {objective}")
+    echo("\nExample Walkthrough:")
+    echo(lesson["example_walkthrough"])
+    await press_enter()
 
 
-def choose_land(profile):
+async def choose_land(profile, timers=None):
     while True:
+        if timers is not None:
+            timers.tick()
         render_map(profile)
         challenge = profile.get("daily_challenge") or {}
         stats = profile.get("daily_stats") or {}
@@ -381,29 +524,30 @@ def choose_land(profile):
         bonus = challenge.get("bonus_xp", 0)
         streak_current = stats.get("streak_current", 0)
         streak_best = stats.get("streak_best", 0)
-        print(
+        echo(
             "\nDaily Challenge: "
             f"{emoji} {land or 'TBD'} — {status_text} | Bonus XP {bonus}"
             f" | Streak {streak_current} (best {streak_best})"
         )
-        print(f"Retry Hearts: {hearts_available}/{RETRY_MAX_HEARTS} — {cooldown_text}")
-        print("Commands: number to enter land, 'daily' to attempt, 'claim' to collect reward, 'profile' to review, 'quit' to exit.")
-        print("\nSelect a land to explore or choose a command:")
+        echo(f"Retry Hearts: {hearts_available}/{RETRY_MAX_HEARTS} — {cooldown_text}")
+        echo("Commands: number to enter land, 'daily' to attempt, 'claim' to collect reward, 'profile' to review, 'leaderboard' for rankings, 'stats' for class analytics, 'quit' to exit.")
+        echo("\nSelect a land to explore or choose a command:")
         for idx, land in enumerate(LAND_ORDER, start=1):
             locked = land not in profile["unlocked_lands"]
             label = f"{idx}. {land}{' (locked)' if locked else ''}"
-            print(label)
-        choice = input("\nEnter number or command: ").strip().lower()
+            echo(label)
+        choice = (await ask("\nEnter number or command: ")).strip().lower()
         if choice == "profile":
-            show_profile(profile)
+            await show_profile(profile)
             continue
         if choice == "daily":
             return "daily", None
         if choice == "claim":
             return "claim", None
+        if choice == "stats":
+            return "stats", None
         if choice == "leaderboard":
-            show_leaderboard(store)
-            continue
+            return "leaderboard", None
         if choice == "quit":
             return "quit", None
         if choice.isdigit():
@@ -412,54 +556,107 @@ def choose_land(profile):
                 land_name = LAND_ORDER[index]
                 if land_name in profile["unlocked_lands"]:
                     return "land", land_name
-                print("That land is still locked. Complete earlier quests first!\n")
+                echo("That land is still locked. Complete earlier quests first!\n")
             else:
-                print("Please choose a valid land number.\n")
+                echo("Please choose a valid land number.\n")
         else:
-            print("Type a number or 'profile'.\n")
-        press_enter()
+            echo("Type a number or 'profile'.\n")
+        await press_enter()
 
 
-def main():
-    display_title()
-    store, profile = ensure_player_profile()
-    profile = select_profile_slot(store)
+def open_sync_client():
+    # profile_sync pulls in urllib and friends; only pay for that when sync
+    # is switched on.
+    if not os.environ.get(SYNC_URL_ENV):
+        return None
+    from profile_sync import SyncClient
+
+    return SyncClient.from_environment()
+
+
+def sync_profiles(sync, store):
+    claims = current_terminal.get().claims
+    result = sync.sync(store, lambda slot: slot in claims.held)
+    if result["pulled"]:
+        save_session(store)
+    if result["offline"]:
+        echo(f"(Sync server unreachable; {sync.pending()} change(s) will be sent next time.)")
+
+
+async def start_session(store):
+    slot, profile = await select_profile_slot(store)
     reset_hint_tokens(profile)
-    save_profiles(store)
+    save_session(store)
 
     if not profile.get("player_name"):
-        profile["player_name"] = input("Adventurer, what is your name? ").strip() or "Hero"
-    pick_avatar(profile)
-    save_profiles(store)
+        profile["player_name"] = (await ask("Adventurer, what is your name? ")).strip() or "Hero"
+    await pick_avatar(profile)
+    save_session(store)
+    return slot, profile
+
+
+async def play(store):
+    slot, profile = await start_session(store)
+    sync = open_sync_client()
+    if sync is not None:
+        sync_profiles(sync, store)
+
+    timers = ProfileTimers()
+    timers.track(slot, profile)
+    answer_log = AnswerRecorder()
+    leaderboard = Leaderboards.from_store(store, rollups=answer_log.rollups)
+    history = LeaderboardHistory()
+    try:
+        await run_adventure(store, slot, profile, timers, answer_log, leaderboard, history)
+    finally:
+        answer_log.flush()
+        if sync is not None:
+            sync_profiles(sync, store)
+
+    echo("\nThanks for playing MathQuest6! Keep your adventurous spirit alive!\n")
+
+
+def main():
+    display_title()
+    store, _profile = ensure_player_profile()
+    run_blocking(play(store))
 
-    lessons, quizzes = read_lessons_and_quizzes()
 
+async def run_adventure(store, slot, profile, timers, answer_log, leaderboard, history):
     while True:
-        action, payload = choose_land(profile)
+        # Every action below can change XP, level or streaks; re-keying one
+        # slot is cheap, so do it unconditionally. Snapshots are throttled.
+        leaderboard.update(slot, profile)
+        history.record_store(store)
+        action, payload = await choose_land(profile, timers)
         if action == "land" and payload:
             land = payload
-            show_lesson(lessons, land)
-            success = battle_quiz(profile, land, quizzes[land])
-            save_profiles(store)
+            await show_lesson(get_lessons(), land)
+            success = await battle_quiz(profile, land, get_quiz_bank()[land], answer_log, slot)
+            save_session(store)
             if not success:
-                print("Take a break, review lessons, and return stronger!\n")
-                press_enter()
+                echo("Take a break, review lessons, and return stronger!\n")
+                await press_enter()
             continue
         if action == "daily":
-            attempt_daily_challenge(store, profile, quizzes)
+            await attempt_daily_challenge(store, slot, profile, get_quiz_bank(), timers, answer_log)
             continue
         if action == "claim":
-            claim_daily_reward_console(store, profile)
+            await claim_daily_reward_console(store, profile)
+            continue
+        if action == "stats":
+            await show_class_analytics(answer_log.rollups)
+            continue
+        if action == "leaderboard":
+            await show_leaderboard(leaderboard, slot, history=history)
             continue
         if action == "quit":
             break
 
-    print("\nThanks for playing MathQuest6! Keep your adventurous spirit alive!\n")
-
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        print("\nFarewell, adventurer!")
+        echo("\nFarewell, adventurer!")
         sys.exit(0)
@@ -0,0 +1,389 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import urllib.parse
+import urllib.request
+import uuid
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from durable_io import atomic_write_text
+from file_locks import FileLock
+from game_utils import (
+    HISTORY_INLINE_LIMIT,
+    LANDS,
+    Profile,
+    Record,
+    SYNC_URL_ENV,
+    default_profile,
+    ensure_daily_structures,
+    ensure_profile_store,
+    load_json,
+    sanitize_profile,
+    save_profiles,
+    slot_lock_path,
+    utc_epoch,
+)
+
+SYNC_STATE_PATH = Path("sync_state.json")
+SYNC_TIMEOUT_SECONDS = 10
+PUSH_BATCH_CHANGES = 500
+PULL_PAGE_CHANGES = 1000
+
+# Profiles sync as units of related fields, each with its own version vector,
+# so a badge earned on one machine and a rename on another never conflict.
+# daily_aggregates is not synced: it is rebuilt locally from merged history,
+# and its archived_count indexes this machine's own archive files.
+SYNC_UNITS: Dict[str, Tuple[str, ...]] = {
+    "identity": ("player_name", "student_id", "avatar"),
+    "progress": ("level", "xp"),
+    "badges": ("badges",),
+    "unlocked_lands": ("unlocked_lands",),
+    "hints": ("hint_tokens", "last_hint_reset"),
+    "daily_challenge": ("daily_challenge",),
+    "daily_stats": ("daily_stats",),
+    "daily_history": ("daily_history",),
+    "retry_status": ("retry_status",),
+}
+
+VersionVector = Dict[str, int]
+
+
+def unit_values(profile) -> Dict[str, Dict]:
+    data = profile.to_dict() if isinstance(profile, Record) else sanitize_profile(profile).to_dict()
+    return {unit: {field: data[field] for field in fields} for unit, fields in SYNC_UNITS.items()}
+
+
+def digest(value: Dict) -> str:
+    return hashlib.blake2b(json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def compare_versions(a: VersionVector, b: VersionVector) -> str:
+    a_ahead = any(count > b.get(device, 0) for device, count in a.items())
+    b_ahead = any(count > a.get(device, 0) for device, count in b.items())
+    if a_ahead and b_ahead:
+        return "concurrent"
+    if a_ahead:
+        return "newer"
+    return "older" if b_ahead else "equal"
+
+
+def stamp(change: Dict) -> Tuple[int, str]:
+    return (change["at"], change["by"])
+
+
+# Merge rules for concurrent edits. Each gets the two versions ordered by
+# (timestamp, device), so both ends of a sync compute the same result.
+
+
+def merge_last_writer(older: Dict, newer: Dict) -> Dict:
+    return newer["value"]
+
+
+def merge_progress(older: Dict, newer: Dict) -> Dict:
+    return max(newer["value"], older["value"], key=lambda value: (value["level"], value["xp"]))
+
+
+def merge_badges(older: Dict, newer: Dict) -> Dict:
+    badges = list(dict.fromkeys(newer["value"]["badges"] + older["value"]["badges"]))
+    return {"badges": badges}
+
+
+def merge_unlocked_lands(older: Dict, newer: Dict) -> Dict:
+    unlocked = set(newer["value"]["unlocked_lands"]) | set(older["value"]["unlocked_lands"])
+    return {"unlocked_lands": [land for land in LANDS if land in unlocked]}
+
+
+def merge_daily_challenge(older: Dict, newer: Dict) -> Dict:
+    a, b = older["value"]["daily_challenge"], newer["value"]["daily_challenge"]
+    if a.get("date_generated") != b.get("date_generated"):
+        return max(newer["value"], older["value"], key=lambda value: value["daily_challenge"].get("date_generated") or "")
+    # Same day on both machines: once finished or claimed anywhere it stays
+    # so, which also stops the bonus being claimed twice.
+    merged = dict(b)
+    done = b if b.get("completed") else a
+    for field in ("completed", "completion_timestamp", "completion_time_seconds"):
+        merged[field] = done.get(field)
+    merged["reward_claimed"] = bool(a.get("reward_claimed") or b.get("reward_claimed"))
+    return {"daily_challenge": merged}
+
+
+def merge_daily_stats(older: Dict, newer: Dict) -> Dict:
+    a, b = older["value"]["daily_stats"], newer["value"]["daily_stats"]
+    fastest = [value for value in (a.get("fastest_completion_seconds"), b.get("fastest_completion_seconds")) if value is not None]
+    # The current streak belongs to whichever machine saw the latest completion.
+    latest = max((b, a), key=lambda stats: (stats.get("last_completion_date") or "", stats.get("streak_current", 0)))
+    return {
+        "daily_stats": {
+            "streak_current": latest.get("streak_current", 0),
+            "streak_best": max(a.get("streak_best", 0), b.get("streak_best", 0)),
+            "last_completion_date": latest.get("last_completion_date"),
+            "fastest_completion_seconds": min(fastest) if fastest else None,
+            "total_completions": max(a.get("total_completions", 0), b.get("total_completions", 0)),
+        }
+    }
+
+
+def history_key(entry: Dict) -> Tuple[str, str]:
+    return (entry.get("date") or "", entry.get("land") or "")
+
+
+def history_window_start(history: List[Dict]) -> str:
+    # A full inline history may already have rolled older entries into the
+    # archive; anything before its oldest entry is not re-added.
+    return min(history_key(entry)[0] for entry in history) if len(history) >= HISTORY_INLINE_LIMIT else ""
+
+
+def merge_daily_history(older: Dict, newer: Dict) -> Dict:
+    a, b = older["value"]["daily_history"], newer["value"]["daily_history"]
+    floor = max(history_window_start(a), history_window_start(b))
+    entries = {history_key(entry): entry for entry in a}
+    entries.update((history_key(entry), entry) for entry in b)
+    return {"daily_history": [entries[key] for key in sorted(entries) if key[0] >= floor]}
+
+
+MERGE_RULES: Dict[str, Callable[[Dict, Dict], Dict]] = {
+    "identity": merge_last_writer,
+    "progress": merge_progress,
+    "badges": merge_badges,
+    "unlocked_lands": merge_unlocked_lands,
+    "hints": merge_last_writer,
+    "daily_challenge": merge_daily_challenge,
+    "daily_stats": merge_daily_stats,
+    "daily_history": merge_daily_history,
+    "retry_status": merge_last_writer,
+}
+
+
+def resolve_change(unit: str, current: Dict | None, incoming: Dict) -> Dict | None:
+    # Returns the version to keep, or None when ``current`` already covers
+    # ``incoming``. Concurrent versions merge and take the pointwise-max
+    # vector without a new tick, so every replica lands on the same record.
+    if current is None:
+        return incoming
+    order = compare_versions(incoming["vv"], current["vv"])
+    if order in ("equal", "older"):
+        return None
+    if order == "newer":
+        return incoming
+    older, newer = sorted((current, incoming), key=stamp)
+    versions = dict(current["vv"])
+    for device, count in incoming["vv"].items():
+        versions[device] = max(versions.get(device, 0), count)
+    return {"vv": versions, "at": newer["at"], "by": newer["by"], "value": MERGE_RULES[unit](older, newer)}
+
+
+def apply_unit(profile: Profile, unit: str, value: Dict) -> None:
+    if unit == "daily_history":
+        ensure_daily_structures(profile)
+        known = {history_key(entry) for entry in profile["daily_history"]}
+        for entry in value["daily_history"]:
+            if history_key(entry) not in known:
+                profile["daily_aggregates"].add(entry)
+    for field, field_value in value.items():
+        profile[field] = field_value
+
+
+def encode_body(payload: Dict) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_body(body: bytes) -> Dict:
+    return json.loads(zlib.decompress(body).decode("utf-8")) if body else {}
+
+
+class SyncClient:
+    # Tracks local edits per slot and unit and exchanges them with a sync
+    # server. Edits are found by digest, so game code needs no hooks beyond
+    # calling track(); pending units persist in SYNC_STATE_PATH and go out on
+    # the next successful sync, which is the offline queue. A sync touches
+    # only the slots its caller owns: pulled changes for any other slot are
+    # deferred, also in SYNC_STATE_PATH, until a program holding it syncs,
+    # since a write into a slot open elsewhere would be undone by that
+    # program's next save while its version vector stayed advanced.
+    def __init__(self, url: str, state_path: Path = SYNC_STATE_PATH) -> None:
+        self.url = url.rstrip("/")
+        self.state_path = Path(state_path)
+        state = load_json(self.state_path) if self.state_path.exists() else {}
+        self.device: str = state.get("device") or uuid.uuid4().hex[:12]
+        self.seq: int = state.get("seq", 0)
+        self.units: Dict[str, Dict[str, Dict]] = state.get("units", {})
+        self.dirty: Dict[str, List[str]] = state.get("dirty", {})
+        self.deferred: Dict[str, List[Dict]] = state.get("deferred", {})
+
+    @classmethod
+    def from_environment(cls) -> "SyncClient | None":
+        # Opt-in: set MATHQUEST_SYNC_URL to a sync server such as
+        # http://localhost:8765 to keep this machine's profiles in sync.
+        url = os.environ.get(SYNC_URL_ENV)
+        return cls(url) if url else None
+
+    def save_state(self) -> None:
+        # Compact single-shot dumps: the unit table has one entry per slot and
+        # unit, and an indented streaming dump of it dominated sync time.
+        state = {"device": self.device, "seq": self.seq, "units": self.units, "dirty": self.dirty, "deferred": self.deferred}
+        atomic_write_text(self.state_path, json.dumps(state, separators=(",", ":")))
+
+    def pending(self) -> int:
+        return sum(len(units) for units in self.dirty.values())
+
+    def track(self, store: Dict, slots: Iterable[str] | None = None) -> int:
+        now = utc_epoch()
+        changed = 0
+        for slot in slots if slots is not None else list(store["slots"]):
+            profile = store["slots"].get(slot)
+            if profile is None:
+                continue
+            known = self.units.setdefault(slot, {})
+            for unit, value in unit_values(profile).items():
+                value_digest = digest(value)
+                meta = known.get(unit)
+                if meta is not None and meta["h"] == value_digest:
+                    continue
+                versions = dict(meta["vv"]) if meta else {}
+                versions[self.device] = versions.get(self.device, 0) + 1
+                known[unit] = {"vv": versions, "at": now, "by": self.device, "h": value_digest}
+                pending = self.dirty.setdefault(slot, [])
+                if unit not in pending:
+                    pending.append(unit)
+                changed += 1
+        return changed
+
+    def request(self, path: str, payload: Dict | None = None) -> Dict:
+        request = urllib.request.Request(
+            self.url + path,
+            data=encode_body(payload) if payload is not None else None,
+            headers={"Content-Type": "application/json", "Content-Encoding": "deflate", "Accept-Encoding": "deflate"},
+        )
+        with urllib.request.urlopen(request, timeout=SYNC_TIMEOUT_SECONDS) as response:
+            return decode_body(response.read())
+
+    def push(self, store: Dict) -> int:
+        pushed = 0
+        queue = [(slot, unit) for slot, units in self.dirty.items() for unit in units]
+        for start in range(0, len(queue), PUSH_BATCH_CHANGES):
+            batch = queue[start : start + PUSH_BATCH_CHANGES]
+            changes = []
+            for slot, unit in batch:
+                # Deleted slots are not synced; their queued edits are dropped.
+                profile = store["slots"].get(slot)
+                if profile is None:
+                    continue
+                meta = self.units[slot][unit]
+                value = unit_values(profile)[unit]
+                changes.append({"slot": slot, "unit": unit, "vv": meta["vv"], "at": meta["at"], "by": meta["by"], "value": value})
+            self.request("/push", {"device": self.device, "changes": changes})
+            for slot, unit in batch:
+                self.dirty[slot].remove(unit)
+                if not self.dirty[slot]:
+                    del self.dirty[slot]
+            pushed += len(batch)
+        return pushed
+
+    def pull(self, store: Dict, owns: Callable[[str], bool]) -> int:
+        applied = 0
+        while True:
+            query = urllib.parse.urlencode({"since": self.seq, "limit": PULL_PAGE_CHANGES})
+            page = self.request(f"/pull?{query}")
+            for change in page["changes"]:
+                if owns(change["slot"]):
+                    applied += self.apply(store, change)
+                else:
+                    self.defer(change)
+            self.seq = page["seq"]
+            if not page.get("more"):
+                return applied
+
+    def apply(self, store: Dict, change: Dict) -> int:
+        slot, unit = change["slot"], change["unit"]
+        profile = store["slots"].get(slot)
+        if profile is None:
+            profile = store["slots"][slot] = default_profile()
+        meta = self.units.setdefault(slot, {}).get(unit)
+        current = {**meta, "value": unit_values(profile)[unit]} if meta else None
+        resolved = resolve_change(unit, current, change)
+        if resolved is None:
+            return 0
+        apply_unit(profile, unit, resolved["value"])
+        self.units[slot][unit] = {
+            "vv": resolved["vv"],
+            "at": resolved["at"],
+            "by": resolved["by"],
+            "h": digest(unit_values(profile)[unit]),
+        }
+        if resolved["value"] != change["value"]:
+            # Merged locally from a concurrent edit: send the result back.
+            pending = self.dirty.setdefault(slot, [])
+            if unit not in pending:
+                pending.append(unit)
+        return 1
+
+    def defer(self, change: Dict) -> None:
+        # A later change that covers a deferred one for the same unit
+        # replaces it; concurrent ones are all kept and merge when applied.
+        pending = self.deferred.setdefault(change["slot"], [])
+        pending[:] = [
+            old for old in pending if old["unit"] != change["unit"] or compare_versions(change["vv"], old["vv"]) != "newer"
+        ]
+        pending.append(change)
+
+    def sync(self, store: Dict, owns: Callable[[str], bool] | None = None) -> Dict:
+        # ``owns`` says which slots the caller holds; None means all of them.
+        # Local edits are tracked before deferred changes are applied, so the
+        # two meet as concurrent versions and merge. Push first so the server
+        # merges our edits before we read its view. A network failure leaves
+        # everything queued for the next attempt.
+        owns = owns or (lambda slot: True)
+        self.track(store, [slot for slot in store["slots"] if owns(slot)])
+        result = {"pushed": 0, "pulled": 0, "offline": False}
+        for slot in [slot for slot in self.deferred if owns(slot)]:
+            for change in self.deferred.pop(slot):
+                result["pulled"] += self.apply(store, change)
+        try:
+            result["pushed"] = self.push(store)
+            result["pulled"] += self.pull(store, owns)
+        except OSError:
+            result["offline"] = True
+        self.save_state()
+        return result
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Sync this folder's MathQuest6 profiles with a sync server.")
+    parser.add_argument("--url", default=os.environ.get(SYNC_URL_ENV), help=f"server URL (default: ${SYNC_URL_ENV})")
+    args = parser.parse_args(argv)
+    if not args.url:
+        parser.error(f"pass --url or set {SYNC_URL_ENV}")
+
+    store = ensure_profile_store()
+    client = SyncClient(args.url)
+    # Every slot no game has open, including new ones the server sends, is
+    # locked for the sync; the others get their changes when next opened.
+    locks: Dict[str, FileLock | None] = {}
+
+    def owns(slot: str) -> bool:
+        if slot not in locks:
+            lock = FileLock(slot_lock_path(slot))
+            locks[slot] = lock if lock.acquire(blocking=False) else None
+        return locks[slot] is not None
+
+    try:
+        result = client.sync(store, owns)
+        if result["pulled"]:
+            save_profiles(store)
+    finally:
+        for lock in locks.values():
+            if lock is not None:
+                lock.release()
+    if result["offline"]:
+        print(f"Server unreachable; {client.pending()} change(s) queued for next time.")
+        return 1
+    print(f"Pushed {result['pushed']} and pulled {result['pulled']} change(s); device {client.device}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
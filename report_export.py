@@ -0,0 +1,285 @@
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+from durable_io import atomic_open
+from game_utils import HISTORY_ARCHIVE_DIR, PLAYER_DATA_PATH, iter_daily_history, sanitize_profile
+
+READ_CHUNK_CHARS = 1 << 16
+
+REPORT_FORMATS = ("csv", "jsonl")
+
+
+class StreamingObjectReader:
+    # Walks a JSON document one member at a time. Only the value being decoded
+    # and an unread tail of at most one read chunk are held in memory, so
+    # iterating a store's slots costs the same for 10 slots or 100k.
+    def __init__(self, handle: TextIO, chunk_chars: int = READ_CHUNK_CHARS) -> None:
+        self.handle = handle
+        self.chunk_chars = chunk_chars
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.dropped = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        if self.position > self.chunk_chars:
+            self.buffer = self.buffer[self.position :]
+            self.dropped += self.position
+            self.position = 0
+        chunk = self.handle.read(self.chunk_chars)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.position}, found {self.buffer[self.position]!r}")
+        self.position += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut by the buffer edge ("1" of "1.5e3", or "1." when
+            # raw_decode stops short) may continue in the next chunk.
+            truncated = end == len(self.buffer) or (
+                isinstance(value, (int, float)) and self.buffer[end] in ".eE+-"
+            )
+            if truncated and self._fill():
+                continue
+            self.position = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        # Yields each key with the reader positioned at its value. The caller
+        # may decode it with value(), stream it with a nested members(), or
+        # ignore it, in which case it is skipped before the next key.
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            self.peek()
+            start = self.dropped + self.position
+            yield key
+            if self.dropped + self.position == start:
+                self.value()
+            if self.peek() == ",":
+                self.position += 1
+                continue
+            self.expect("}")
+            return
+
+
+def iter_store_profiles(path: Path = PLAYER_DATA_PATH) -> Iterator[Tuple[str, Dict | None]]:
+    with Path(path).open("r", encoding="utf-8") as handle:
+        reader = StreamingObjectReader(handle)
+        for key in reader.members():
+            if key != "slots":
+                continue
+            for slot in reader.members():
+                profile = reader.value()
+                yield slot, sanitize_profile(profile) if profile is not None else None
+            return
+
+
+def _student_row(slot: str, profile: Dict) -> Dict:
+    stats = profile["daily_stats"]
+    aggregates = profile["daily_aggregates"]
+    average = aggregates.average_seconds()
+    return {
+        "slot": slot,
+        "player_name": profile.get("player_name") or "",
+        "student_id": profile.get("student_id") or "",
+        "level": profile.get("level", 1),
+        "xp": profile.get("xp", 0),
+        "badge_count": len(profile.get("badges", [])),
+        "badges": ";".join(profile.get("badges", [])),
+        "unlocked_lands": len(profile.get("unlocked_lands", [])),
+        "streak_current": stats.get("streak_current", 0),
+        "streak_best": stats.get("streak_best", 0),
+        "total_dailies": stats.get("total_completions", 0),
+        "fastest_daily_seconds": stats.get("fastest_completion_seconds"),
+        "last_daily_date": stats.last_completion_date,
+        "average_daily_seconds": round(average, 1) if average is not None else None,
+    }
+
+
+STUDENT_COLUMNS = tuple(_student_row("", sanitize_profile(None)))
+DAILY_COLUMNS = ("slot", "player_name", "date", "land", "seconds", "bonus_xp", "badge_reward")
+REPORT_COLUMNS = {"students": STUDENT_COLUMNS, "dailies": DAILY_COLUMNS}
+
+
+class ReportFilter:
+    __slots__ = ("slots", "lands", "min_level", "since", "until")
+
+    def __init__(
+        self,
+        slots: Iterable[str] | None = None,
+        lands: Iterable[str] | None = None,
+        min_level: int | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> None:
+        self.slots = set(slots) if slots else None
+        self.lands = set(lands) if lands else None
+        self.min_level = min_level
+        # ISO dates compare correctly as strings.
+        self.since = since
+        self.until = until
+
+    def accepts_profile(self, slot: str, profile: Dict) -> bool:
+        if self.slots is not None and slot not in self.slots:
+            return False
+        if self.min_level is not None and profile.get("level", 1) < self.min_level:
+            return False
+        return True
+
+    def accepts_daily(self, entry: Dict) -> bool:
+        if self.lands is not None and entry.get("land") not in self.lands:
+            return False
+        day = entry.get("date") or ""
+        if self.since is not None and day < self.since:
+            return False
+        if self.until is not None and day > self.until:
+            return False
+        return True
+
+
+def iter_report_rows(
+    kind: str,
+    profiles: Iterable[Tuple[str, Dict | None]],
+    filters: ReportFilter | None = None,
+    archive_dir: Path = HISTORY_ARCHIVE_DIR,
+) -> Iterator[Dict]:
+    filters = filters or ReportFilter()
+    for slot, profile in profiles:
+        if profile is None or not filters.accepts_profile(slot, profile):
+            continue
+        if kind == "students":
+            yield _student_row(slot, profile)
+            continue
+        name = profile.get("player_name") or ""
+        for entry in iter_daily_history(slot, profile, archive_dir):
+            if filters.accepts_daily(entry):
+                yield {"slot": slot, "player_name": name, **{column: entry.get(column) for column in DAILY_COLUMNS[2:]}}
+
+
+def resolve_columns(kind: str, columns: Sequence[str] | None) -> List[str]:
+    if kind not in REPORT_COLUMNS:
+        raise ValueError(f"Unknown report kind {kind!r}; expected one of {', '.join(REPORT_COLUMNS)}")
+    available = REPORT_COLUMNS[kind]
+    if not columns:
+        return list(available)
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise ValueError(f"Unknown {kind} columns: {', '.join(unknown)}")
+    return list(columns)
+
+
+def write_csv(rows: Iterable[Dict], columns: Sequence[str], handle: TextIO) -> int:
+    writer = csv.DictWriter(handle, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[Dict], columns: Sequence[str], handle: TextIO) -> int:
+    count = 0
+    for row in rows:
+        handle.write(json.dumps({column: row.get(column) for column in columns}, separators=(",", ":")))
+        handle.write("\n")
+        count += 1
+    return count
+
+
+REPORT_WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+def export_report(
+    destination: Path,
+    kind: str = "students",
+    fmt: str | None = None,
+    columns: Sequence[str] | None = None,
+    filters: ReportFilter | None = None,
+    source: Path = PLAYER_DATA_PATH,
+) -> int:
+    destination = Path(destination)
+    fmt = fmt or ("jsonl" if destination.suffix in (".jsonl", ".json") else "csv")
+    if fmt not in REPORT_WRITERS:
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {', '.join(REPORT_FORMATS)}")
+    selected = resolve_columns(kind, columns)
+    # The archive sits next to the store it belongs to, which need not be
+    # the one in the working directory.
+    archive_dir = Path(source).parent / HISTORY_ARCHIVE_DIR
+    rows = iter_report_rows(kind, iter_store_profiles(source), filters, archive_dir)
+    with atomic_open(destination, newline="") as handle:
+        count = REPORT_WRITERS[fmt](rows, selected, handle)
+    return count
+
+
+def split_list(text: str | None) -> List[str] | None:
+    if not text:
+        return None
+    return [part.strip() for part in text.split(",") if part.strip()]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export a classroom report from the MathQuest6 save file.")
+    parser.add_argument("destination", type=Path, help="output file; .jsonl selects JSON Lines, anything else CSV")
+    parser.add_argument("--kind", choices=sorted(REPORT_COLUMNS), default="students")
+    parser.add_argument("--format", dest="fmt", choices=REPORT_FORMATS)
+    parser.add_argument("--columns", help="comma-separated subset of columns, in output order")
+    parser.add_argument("--slots", help="comma-separated slot names to include")
+    parser.add_argument("--lands", help="comma-separated lands to include (dailies only)")
+    parser.add_argument("--min-level", type=int)
+    parser.add_argument("--since", help="earliest daily date, YYYY-MM-DD (dailies only)")
+    parser.add_argument("--until", help="latest daily date, YYYY-MM-DD (dailies only)")
+    parser.add_argument("--source", type=Path, default=PLAYER_DATA_PATH)
+    args = parser.parse_args(argv)
+
+    filters = ReportFilter(
+        slots=split_list(args.slots),
+        lands=split_list(args.lands),
+        min_level=args.min_level,
+        since=args.since,
+        until=args.until,
+    )
+    try:
+        count = export_report(args.destination, args.kind, args.fmt, split_list(args.columns), filters, args.source)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"Wrote {count} {args.kind} rows to {args.destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+import argparse
+import csv
+import io
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from art_assets import AVATAR_OPTIONS
+from file_locks import FileLock
+from game_utils import (
+    HISTORY_ARCHIVE_DIR,
+    PLAYER_DATA_PATH,
+    STORE_LOCK_PATH,
+    SlotBase,
+    StoreConflictError,
+    default_profile,
+    ensure_profile_store,
+    history_slot_dir,
+    load_json,
+    profile_digest,
+    sanitize_profile,
+    save_json,
+    save_profiles,
+    slot_lock_path,
+    snapshot_store,
+    store_bases,
+)
+
+ROSTER_ACTIONS = ("create", "update", "rename", "reset")
+ROSTER_ACTION_LABELS = {"create": "created", "update": "updated", "rename": "renamed", "reset": "reset"}
+ROSTER_FIELDS = ("action", "slot", "new_slot", "player_name", "avatar", "student_id")
+MAX_NAME_LENGTH = 40
+MAX_SLOT_LENGTH = 40
+
+TRASH_DIR = HISTORY_ARCHIVE_DIR / ".roster-trash"
+
+
+class RosterError(ValueError):
+    def __init__(self, errors: List[str]) -> None:
+        super().__init__(f"{len(errors)} roster problem(s):\n" + "\n".join(errors))
+        self.errors = errors
+
+
+class RosterRow:
+    __slots__ = ("line", "action", "slot", "new_slot", "player_name", "avatar", "student_id", "error")
+
+    def __init__(self, line: int, data: Dict, error: str | None = None) -> None:
+        # ``error`` marks a line that could not be read; plan_roster reports
+        # it with the other problems instead of stopping at it.
+        self.line = line
+        self.error = error
+        clean = {field: str(data.get(field) or "").strip() for field in ROSTER_FIELDS}
+        self.action = clean["action"].lower()
+        self.slot = clean["slot"]
+        self.new_slot = clean["new_slot"]
+        self.player_name = clean["player_name"]
+        self.avatar = clean["avatar"]
+        self.student_id = clean["student_id"]
+
+
+def read_roster(path: Path) -> Iterator[RosterRow]:
+    path = Path(path)
+    # Decoded in one go so a bad byte is reported at its own line; a class
+    # roster is small.
+    raw = path.read_bytes()
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        yield RosterRow(raw.count(b"\n", 0, exc.start) + 1, {}, "not valid UTF-8 text")
+        return
+    handle = io.StringIO(text, newline="")
+    if path.suffix in (".jsonl", ".json"):
+        for line, text in enumerate(handle, start=1):
+            if not text.strip():
+                continue
+            try:
+                data = json.loads(text)
+            except ValueError as exc:
+                yield RosterRow(line, {}, f"not valid JSON ({exc})")
+                continue
+            if not isinstance(data, dict):
+                yield RosterRow(line, {}, "expected a JSON object")
+                continue
+            yield RosterRow(line, data)
+    else:
+        rows = csv.DictReader(handle)
+        while True:
+            try:
+                data = next(rows)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                yield RosterRow(rows.line_num, {}, f"unreadable CSV ({exc})")
+                return
+            yield RosterRow(rows.line_num, data)
+
+
+def resolve_avatar(text: str) -> str | None:
+    if not text:
+        return None
+    if text.isdigit() and 1 <= int(text) <= len(AVATAR_OPTIONS):
+        return AVATAR_OPTIONS[int(text) - 1]
+    if text in AVATAR_OPTIONS:
+        return text
+    matches = [option for option in AVATAR_OPTIONS if text.lower() in option.lower()]
+    if len(matches) == 1:
+        return matches[0]
+    raise ValueError(f"unknown avatar {text!r}; use 1-{len(AVATAR_OPTIONS)} or part of its name")
+
+
+class RosterPlan:
+    # The complete post-import slot table, built without touching the live
+    # store, plus the archive directory moves the renames and resets need.
+    def __init__(self, store: Dict) -> None:
+        self.store = store
+        self.slots: Dict[str, Dict | None] = dict(store["slots"])
+        self.active_slot = store.get("active_slot")
+        self.archive_moves: List[Tuple[Path, Path]] = []
+        self.archive_discards: List[Path] = []
+        self.touched: List[str] = []
+        self.counts = {action: 0 for action in ROSTER_ACTIONS}
+
+    def copy_profile(self, slot: str) -> Dict:
+        # Updated profiles are copies so a failed import leaves the live
+        # store exactly as it was.
+        profile = self.slots[slot]
+        if profile is self.store["slots"].get(slot):
+            profile = sanitize_profile(profile.to_dict() if hasattr(profile, "to_dict") else profile)
+            self.slots[slot] = profile
+        return profile
+
+
+def apply_fields(profile: Dict, row: RosterRow, avatar: str | None) -> None:
+    if row.player_name:
+        profile["player_name"] = row.player_name
+    if avatar:
+        profile["avatar"] = avatar
+    if row.student_id:
+        profile["student_id"] = row.student_id
+
+
+def plan_roster(store: Dict, rows: Iterable[RosterRow]) -> RosterPlan:
+    plan = RosterPlan(store)
+    errors: List[str] = []
+    touched: Dict[str, int] = {}
+    created: List[str] = []
+
+    def claim(slot: str, row: RosterRow) -> bool:
+        if slot in touched:
+            errors.append(f"line {row.line}: slot {slot!r} already used on line {touched[slot]}")
+            return False
+        touched[slot] = row.line
+        return True
+
+    for row in rows:
+        if row.error:
+            errors.append(f"line {row.line}: {row.error}")
+            continue
+        problems = []
+        action = row.action or ("update" if plan.slots.get(row.slot) is not None else "create")
+        if action not in ROSTER_ACTIONS:
+            problems.append(f"unknown action {row.action!r}; expected one of {', '.join(ROSTER_ACTIONS)}")
+        if not row.slot:
+            problems.append("slot is required")
+        elif len(row.slot) > MAX_SLOT_LENGTH:
+            problems.append(f"slot name longer than {MAX_SLOT_LENGTH} characters")
+        if len(row.player_name) > MAX_NAME_LENGTH:
+            problems.append(f"player_name longer than {MAX_NAME_LENGTH} characters")
+        try:
+            avatar = resolve_avatar(row.avatar)
+        except ValueError as exc:
+            avatar = None
+            problems.append(str(exc))
+        if action == "rename":
+            if not row.new_slot:
+                problems.append("rename needs new_slot")
+            elif len(row.new_slot) > MAX_SLOT_LENGTH:
+                problems.append(f"new_slot longer than {MAX_SLOT_LENGTH} characters")
+        if problems:
+            errors.extend(f"line {row.line}: {problem}" for problem in problems)
+            continue
+        if not claim(row.slot, row):
+            continue
+
+        exists = plan.slots.get(row.slot) is not None
+        if action == "create":
+            if exists:
+                errors.append(f"line {row.line}: slot {row.slot!r} already has a profile")
+                continue
+            profile = default_profile()
+            apply_fields(profile, row, avatar)
+            plan.slots[row.slot] = profile
+            created.append(row.slot)
+        elif action in ("update", "reset"):
+            if not exists:
+                errors.append(f"line {row.line}: slot {row.slot!r} has no profile to {action}")
+                continue
+            if action == "reset":
+                previous = plan.slots[row.slot]
+                profile = default_profile()
+                profile["player_name"] = previous.get("player_name")
+                profile["avatar"] = previous.get("avatar")
+                profile["student_id"] = previous.get("student_id")
+                plan.slots[row.slot] = profile
+                plan.archive_discards.append(history_slot_dir(row.slot))
+            else:
+                profile = plan.copy_profile(row.slot)
+            apply_fields(profile, row, avatar)
+        else:
+            if not exists:
+                errors.append(f"line {row.line}: slot {row.slot!r} has no profile to rename")
+                continue
+            if plan.slots.get(row.new_slot) is not None:
+                errors.append(f"line {row.line}: slot {row.new_slot!r} already has a profile")
+                continue
+            if not claim(row.new_slot, row):
+                continue
+            profile = plan.copy_profile(row.slot)
+            apply_fields(profile, row, avatar)
+            del plan.slots[row.slot]
+            plan.slots[row.new_slot] = profile
+            if history_slot_dir(row.slot) != history_slot_dir(row.new_slot):
+                plan.archive_moves.append((history_slot_dir(row.slot), history_slot_dir(row.new_slot)))
+            if plan.active_slot == row.slot:
+                plan.active_slot = row.new_slot
+        plan.counts[action] += 1
+
+    owners: Dict[str, str] = {}
+    for slot, profile in plan.slots.items():
+        student_id = profile.get("student_id") if profile is not None else None
+        if not student_id:
+            continue
+        if student_id in owners:
+            errors.append(f"student_id {student_id!r} would belong to both {owners[student_id]!r} and {slot!r}")
+        owners[student_id] = slot
+    for _source, target in plan.archive_moves:
+        if target.exists() and target not in plan.archive_discards:
+            errors.append(f"history archive {target} already exists; move it aside before renaming into it")
+    # A new profile must start with no archived history: whatever a deleted
+    # slot left behind would otherwise be read back as this student's.
+    vacated = set(plan.archive_discards) | {source for source, _target in plan.archive_moves}
+    for slot in created:
+        directory = history_slot_dir(slot)
+        if directory.exists() and directory not in vacated:
+            errors.append(f"history archive {directory} already exists; move it aside before creating {slot!r}")
+
+    if errors:
+        raise RosterError(errors)
+    plan.touched = list(touched)
+    return plan
+
+
+def claim_slots(slots: List[str]) -> List[FileLock]:
+    # Every touched slot's session lock, so no running game has one open
+    # while the import rewrites it.
+    locks: List[FileLock] = []
+    busy: List[str] = []
+    for slot in slots:
+        lock = FileLock(slot_lock_path(slot))
+        if lock.acquire(blocking=False):
+            locks.append(lock)
+        else:
+            busy.append(f"slot {slot!r} is open in a running game; close it there first")
+    if busy:
+        for lock in locks:
+            lock.release()
+        raise RosterError(busy)
+    return locks
+
+
+def commit_plan(plan: RosterPlan) -> None:
+    locks = claim_slots(plan.touched)
+    try:
+        _commit_plan(plan)
+    finally:
+        for lock in locks:
+            lock.release()
+
+
+def rollback_slots(original: Dict, new_store: Dict, slots: List[str]) -> None:
+    # Puts back the touched slots whose disk copy is still the one this
+    # import wrote, as a new revision; slots other programs saved since,
+    # and every slot the import did not touch, are left as they are.
+    written = new_store.get("revision")
+    if written is None:
+        return  # the merge failed, so nothing was written
+    with FileLock(STORE_LOCK_PATH):
+        if not PLAYER_DATA_PATH.exists():
+            return
+        disk = load_json(PLAYER_DATA_PATH)
+        disk_slots = disk.setdefault("slots", {})
+        disk_revisions = disk.setdefault("revisions", {})
+        revision = disk.get("revision", 0) + 1
+        bases = store_bases()
+        restored = False
+        for slot in slots:
+            # A slot the import removed (a rename's old name) is still ours
+            # while nobody has recreated it.
+            ours = disk_revisions.get(slot) == written if slot in new_store["slots"] else slot not in disk_slots
+            if not ours:
+                continue
+            restored = True
+            if slot in original["slots"]:
+                disk_slots[slot] = original["slots"][slot]
+                disk_revisions[slot] = revision
+                profile = disk_slots[slot]
+                bases[slot] = SlotBase(revision, profile_digest(sanitize_profile(profile) if profile is not None else None))
+            else:
+                disk_slots.pop(slot, None)
+                disk_revisions.pop(slot, None)
+                bases.pop(slot, None)
+        if not restored:
+            return
+        if disk.get("active_slot") == new_store.get("active_slot") and original.get("active_slot") in disk_slots:
+            disk["active_slot"] = original["active_slot"]
+        disk["revision"] = revision
+        save_json(PLAYER_DATA_PATH, disk)
+
+
+def _commit_plan(plan: RosterPlan) -> None:
+    # Archive directories move first and the store is written once; if the
+    # write fails, the directories go back and the touched slots are rolled
+    # back. A version conflict is raised before anything is written, so
+    # only the directories need undoing.
+    done: List[Tuple[Path, Path]] = []
+    TRASH_DIR.mkdir(parents=True, exist_ok=True)
+    staged = [(path, TRASH_DIR / f"{index:05d}-{path.name}") for index, path in enumerate(plan.archive_discards)]
+    staged.extend(plan.archive_moves)
+    new_store = dict(plan.store)
+    new_store["slots"] = plan.slots
+    new_store["active_slot"] = plan.active_slot
+    # Set again by the merge, so rollback_slots can tell whether it ran.
+    new_store.pop("revision", None)
+    original = snapshot_store(plan.store)
+    writing = False
+    try:
+        for source, target in staged:
+            if source.exists():
+                source.rename(target)
+                done.append((source, target))
+        writing = True
+        save_profiles(new_store)
+    except BaseException as exc:
+        for source, target in reversed(done):
+            target.rename(source)
+        if writing and not isinstance(exc, StoreConflictError):
+            rollback_slots(original, new_store, plan.touched)
+        raise
+    shutil.rmtree(TRASH_DIR, ignore_errors=True)
+    # save_profiles merged in any slots other programs saved meanwhile.
+    for key in ("slots", "active_slot", "revisions", "revision"):
+        plan.store[key] = new_store[key]
+
+
+def import_roster(store: Dict, rows: Iterable[RosterRow], dry_run: bool = False) -> Dict[str, int]:
+    plan = plan_roster(store, rows)
+    if not dry_run:
+        commit_plan(plan)
+    return plan.counts
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Create, update, rename or reset MathQuest6 slots from a roster file.")
+    parser.add_argument("roster", type=Path, help=f"CSV with a header row, or JSON Lines; fields: {', '.join(ROSTER_FIELDS)}")
+    parser.add_argument("--dry-run", action="store_true", help="validate the roster without writing anything")
+    args = parser.parse_args(argv)
+
+    store = ensure_profile_store()
+    try:
+        counts = import_roster(store, read_roster(args.roster), dry_run=args.dry_run)
+    except (RosterError, StoreConflictError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    summary = ", ".join(f"{count} {ROSTER_ACTION_LABELS[action]}" for action, count in counts.items())
+    print(f"{'Validated' if args.dry_run else 'Imported'} roster: {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
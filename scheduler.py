@@ -0,0 +1,130 @@
+import heapq
+import itertools
+from typing import Callable, Dict, Hashable, List, Tuple
+
+from game_utils import (
+    SECONDS_PER_DAY,
+    precompute_daily_challenges,
+    refresh_retry_status,
+    reset_hint_tokens,
+    retry_cooldown_deadline,
+    utc_day_number,
+    utc_epoch,
+)
+
+ROLLOVER_KEY = "utc-rollover"
+
+
+def next_utc_midnight(now: int) -> int:
+    return (utc_day_number(now) + 1) * SECONDS_PER_DAY
+
+
+class DeadlineScheduler:
+    # Min-heap of (deadline, sequence, key). Rescheduling or cancelling a key
+    # leaves its old heap entry behind; stale entries are skipped when they
+    # reach the top, so every operation stays O(log n).
+    def __init__(self, clock: Callable[[], int] = utc_epoch) -> None:
+        self.clock = clock
+        self.heap: List[Tuple[int, int, Hashable]] = []
+        self.entries: Dict[Hashable, Tuple[int, int, Callable[[int], None]]] = {}
+        self.sequence = itertools.count()
+
+    def schedule(self, key: Hashable, deadline: int, callback: Callable[[int], None]) -> None:
+        sequence = next(self.sequence)
+        self.entries[key] = (deadline, sequence, callback)
+        heapq.heappush(self.heap, (deadline, sequence, key))
+
+    def cancel(self, key: Hashable) -> None:
+        self.entries.pop(key, None)
+
+    def deadline_of(self, key: Hashable) -> int | None:
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def _discard_stale(self) -> None:
+        while self.heap:
+            deadline, sequence, key = self.heap[0]
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == sequence:
+                return
+            heapq.heappop(self.heap)
+
+    def next_deadline(self) -> int | None:
+        self._discard_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def run_due(self, now: int | None = None) -> int:
+        now = self.clock() if now is None else now
+        fired = 0
+        while True:
+            self._discard_stale()
+            if not self.heap or self.heap[0][0] > now:
+                return fired
+            _deadline, _sequence, key = heapq.heappop(self.heap)
+            _deadline, _sequence, callback = self.entries.pop(key)
+            callback(now)
+            fired += 1
+
+
+class ProfileTimers:
+    # Registers each tracked profile's heart refill and one shared UTC
+    # midnight rollover, so time-driven state changes exactly once per
+    # deadline instead of being re-derived on every render. The rollover
+    # also starts every tracked profile's daily challenge in one batch.
+    # Track only slots this process has claimed: the timers write into the
+    # profiles they hold, and a write to a slot open elsewhere would collide
+    # with that program's save. Unclaimed slots catch up when claimed.
+    def __init__(
+        self,
+        scheduler: DeadlineScheduler | None = None,
+        on_heart_refill: Callable[[str, Dict], None] | None = None,
+        on_rollover: Callable[[int], None] | None = None,
+    ) -> None:
+        self.scheduler = scheduler or DeadlineScheduler()
+        self.on_heart_refill = on_heart_refill
+        self.on_rollover = on_rollover
+        self.profiles: Dict[str, Dict] = {}
+        self.scheduler.schedule(ROLLOVER_KEY, next_utc_midnight(self.scheduler.clock()), self._rollover)
+
+    def track(self, slot: str, profile: Dict | None) -> None:
+        if profile is None:
+            self.untrack(slot)
+            return
+        self.profiles[slot] = profile
+        self.watch_hearts(slot)
+
+    def untrack(self, slot: str) -> None:
+        self.profiles.pop(slot, None)
+        self.scheduler.cancel((slot, "hearts"))
+
+    def watch_hearts(self, slot: str) -> None:
+        profile = self.profiles.get(slot)
+        deadline = retry_cooldown_deadline(profile) if profile is not None else None
+        if deadline is None:
+            self.scheduler.cancel((slot, "hearts"))
+        else:
+            self.scheduler.schedule((slot, "hearts"), deadline, lambda now, name=slot: self._refill(name, now))
+
+    def heart_deadline(self, slot: str) -> int | None:
+        return self.scheduler.deadline_of((slot, "hearts"))
+
+    def tick(self, now: int | None = None) -> int:
+        return self.scheduler.run_due(now)
+
+    def _refill(self, slot: str, now: int) -> None:
+        profile = self.profiles.get(slot)
+        if profile is None:
+            return
+        refresh_retry_status(profile, now)
+        if self.on_heart_refill is not None:
+            self.on_heart_refill(slot, profile)
+
+    def _rollover(self, now: int) -> None:
+        # Tracked profiles are the claimed ones, so the batch stays out of
+        # slots other programs have open.
+        for profile in self.profiles.values():
+            reset_hint_tokens(profile)
+        precompute_daily_challenges(self.profiles.values(), day=utc_day_number(now))
+        self.scheduler.schedule(ROLLOVER_KEY, next_utc_midnight(now), self._rollover)
+        if self.on_rollover is not None:
+            self.on_rollover(now)
@@ -0,0 +1,171 @@
+import argparse
+import json
+import signal
+import sys
+import threading
+import urllib.parse
+from bisect import bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from durable_io import atomic_write_text
+from profile_sync import PULL_PAGE_CHANGES, SYNC_UNITS, decode_body, encode_body, resolve_change
+
+SYNC_SERVER_PORT = 8765
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class SyncHub:
+    # Server-side replica: the latest record per (slot, unit) plus a change
+    # log ordered by sequence number. Pulls bisect the log, so a client that
+    # is caught up costs O(log n) regardless of how many profiles exist.
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.records: Dict[Tuple[str, str], Dict] = {}
+        self.log_seqs: List[int] = []
+        self.log_keys: List[Tuple[str, str]] = []
+        self.seq = 0
+
+    def push(self, changes: List[Dict]) -> int:
+        accepted = 0
+        with self.lock:
+            for change in changes:
+                key = (change["slot"], change["unit"])
+                if change["unit"] not in SYNC_UNITS:
+                    continue
+                current = self.records.get(key)
+                resolved = resolve_change(change["unit"], current, change)
+                if resolved is None:
+                    continue
+                self.seq += 1
+                self.records[key] = {"slot": key[0], "unit": key[1], **resolved, "seq": self.seq}
+                self.log_seqs.append(self.seq)
+                self.log_keys.append(key)
+                accepted += 1
+            if len(self.log_seqs) > 2 * len(self.records) + 1024:
+                self.compact()
+        return accepted
+
+    def compact(self) -> None:
+        # Drops log entries for records that have since been superseded.
+        ordered = sorted(self.records.items(), key=lambda item: item[1]["seq"])
+        self.log_seqs = [record["seq"] for _key, record in ordered]
+        self.log_keys = [key for key, _record in ordered]
+
+    def pull(self, since: int, limit: int = PULL_PAGE_CHANGES) -> Dict:
+        changes = []
+        with self.lock:
+            position = bisect_right(self.log_seqs, since)
+            last = since
+            while position < len(self.log_seqs) and len(changes) < limit:
+                seq, key = self.log_seqs[position], self.log_keys[position]
+                position += 1
+                record = self.records[key]
+                if record["seq"] == seq:
+                    changes.append({field: value for field, value in record.items() if field != "seq"})
+                last = seq
+            more = position < len(self.log_seqs)
+            # The last page reports the server's position, so a client skips
+            # straight past superseded log entries next time.
+            return {"changes": changes, "seq": last if more else self.seq, "more": more}
+
+    def to_dict(self) -> Dict:
+        with self.lock:
+            return {"seq": self.seq, "records": sorted(self.records.values(), key=lambda record: record["seq"])}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SyncHub":
+        hub = cls()
+        hub.seq = data.get("seq", 0)
+        for record in data.get("records", []):
+            key = (record["slot"], record["unit"])
+            hub.records[key] = record
+            hub.log_seqs.append(record["seq"])
+            hub.log_keys.append(key)
+        return hub
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hub: SyncHub
+
+    def send_payload(self, payload: Dict, status: int = 200) -> None:
+        body = encode_body(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "deflate")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        if url.path == "/pull":
+            try:
+                since = int(query.get("since", ["0"])[0])
+                limit = max(1, min(PULL_PAGE_CHANGES, int(query.get("limit", [PULL_PAGE_CHANGES])[0])))
+            except ValueError:
+                self.send_payload({"error": "since and limit must be integers"}, 400)
+                return
+            self.send_payload(self.hub.pull(since, limit))
+        elif url.path == "/health":
+            self.send_payload({"seq": self.hub.seq, "records": len(self.hub.records)})
+        else:
+            self.send_payload({"error": "not found"}, 404)
+
+    def do_POST(self) -> None:
+        if self.path != "/push":
+            self.send_payload({"error": "not found"}, 404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_payload({"error": "body too large"}, 413)
+            return
+        try:
+            payload = decode_body(self.rfile.read(length))
+            changes = payload["changes"]
+        except (ValueError, KeyError, TypeError):
+            self.send_payload({"error": "expected a deflate-compressed JSON body with changes"}, 400)
+            return
+        accepted = self.hub.push(changes)
+        self.send_payload({"accepted": accepted, "seq": self.hub.seq})
+
+    def log_message(self, format: str, *args) -> None:
+        # Load tests would otherwise print one line per request.
+        pass
+
+
+def make_server(hub: SyncHub, host: str = "127.0.0.1", port: int = SYNC_SERVER_PORT) -> ThreadingHTTPServer:
+    handler = type("BoundSyncRequestHandler", (SyncRequestHandler,), {"hub": hub})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Reference MathQuest6 profile sync server (for local testing).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SYNC_SERVER_PORT)
+    parser.add_argument("--data", type=Path, help="JSON file to load records from and save them to on exit")
+    args = parser.parse_args(argv)
+
+    hub = SyncHub.from_dict(json.loads(args.data.read_text(encoding="utf-8"))) if args.data and args.data.exists() else SyncHub()
+    server = make_server(hub, args.host, args.port)
+    print(f"Sync server listening on http://{args.host}:{server.server_address[1]} ({len(hub.records)} records)")
+    # SIGTERM unwinds like Ctrl-C so the records are saved either way.
+    signal.signal(signal.SIGTERM, lambda *_args: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.data:
+            atomic_write_text(args.data, json.dumps(hub.to_dict()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
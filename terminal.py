@@ -0,0 +1,57 @@
+import os
+import sys
+from contextvars import ContextVar
+
+from game_utils import PROCESS_SLOT_CLAIMS, SlotClaims
+
+
+class Terminal:
+    # Where one player's console flow reads and writes. This one is the
+    # process's own stdin/stdout; blocking in input() is fine when the
+    # process serves a single player. console_daemon.py provides socket
+    # terminals for many players on one event loop.
+    def __init__(self, claims: SlotClaims = PROCESS_SLOT_CLAIMS) -> None:
+        self.claims = claims
+
+    def write(self, text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    async def readline(self, prompt: str = "") -> str:
+        return input(prompt)
+
+    def clear(self) -> None:
+        os.system("cls" if os.name == "nt" else "clear")
+
+    def rich_console(self, rich):
+        return rich.console
+
+
+# Each asyncio task runs with a copy of the context, so a daemon sets this
+# once per connection and every flow it awaits talks to that player.
+current_terminal: ContextVar[Terminal] = ContextVar("current_terminal", default=Terminal())
+
+
+def echo(*values, sep: str = " ", end: str = "\n") -> None:
+    current_terminal.get().write(sep.join(str(value) for value in values) + end)
+
+
+async def ask(prompt: str = "") -> str:
+    return await current_terminal.get().readline(prompt)
+
+
+def clear_screen() -> None:
+    current_terminal.get().clear()
+
+
+def run_blocking(flow):
+    # Drives a console flow on the stdin terminal without an event loop:
+    # its readline never suspends, so the coroutine finishes on the first
+    # send. This keeps asyncio off the single-player startup path; only
+    # console_daemon.py needs a real loop.
+    try:
+        flow.send(None)
+    except StopIteration as finished:
+        return finished.value
+    flow.close()
+    raise RuntimeError("console flow suspended; run it on an event loop instead")